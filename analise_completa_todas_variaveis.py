@@ -1,299 +1,95 @@
 import pandas as pd
-import pingouin as pg
 import numpy as np
+import argparse
+import math
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
-from scipy.stats import shapiro, normaltest
 import warnings
+from dados_longos import grupos_por_sufixo, criar_cubo, colunas_existentes
+from estatisticas_lote import (normalidade_lote, outliers_lote, calcular_rm_anova, anova_lote, residuos_lote,
+                               esfericidade_lote, posthoc_lote)
+from cache_resultados import CacheResultados, VERSAO_CACHE, versao_codigo, hash_dados, formatar_estatisticas_cache
+from indice_variaveis import IndiceVariaveis, selecionar_variaveis
+from checkpoints import CheckpointAnalise, assinatura_execucao
+from relatorios import FORMATOS_SAIDA, EscritorRelatorio, verificar_formato_saida
+from base_resultados import (salvar_base_resultados, caminho_base_resultados, POSTHOC_REALIZADO, POSTHOC_OMITIDO,
+                              POSTHOC_NAO_EXECUTADO)
+from graficos import FORMATOS_GRAFICOS, paineis_boxplot, renderizar_boxplots
+# Importada com outro nome: 'etapa' é o nome usado para as etapas da bateria neste módulo
+from perfil_execucao import AJUDA_PERFIL, ativar_perfil, gravar_relatorio_perfil, etapa as etapa_perfil
+from telemetria import contar, registrar_cache
 warnings.filterwarnings('ignore')
 
-def identificar_variaveis_unicas(df):
+# Etapas da bateria, na ordem de execução e de impressão
+ETAPAS = ['normalidade', 'outliers', 'boxplot', 'anova', 'residuos', 'esfericidade', 'posthoc']
+
+def identificar_variaveis_unicas(df, indice=None):
     """
     Identifica todas as variáveis únicas que têm dados para T0, T1 e T2
+    
+    Args:
+        df (pd.DataFrame): Dados no formato largo
+        indice (IndiceVariaveis): Índice das variáveis já montado para `df` (opcional)
+    
+    Returns:
+        list: Variáveis em ordem alfabética
     """
-    # Obter todas as colunas exceto 'id'
-    colunas = [col for col in df.columns if col != 'id']
-    
-    # Identificar variáveis únicas (removendo sufixos T0, T1, T2)
-    variaveis_unicas = set()
-    
-    for col in colunas:
-        if col.endswith('_T0'):
-            variavel_base = col[:-3]  # Remove '_T0'
-            # Verificar se existe T1 e T2 para esta variável
-            col_t1 = variavel_base + '_T1'
-            col_t2 = variavel_base + '_T2'
-            if col_t1 in df.columns and col_t2 in df.columns:
-                variaveis_unicas.add(variavel_base)
-        elif col.endswith('_T1'):
-            variavel_base = col[:-3]  # Remove '_T1'
-            # Verificar se existe T0 e T2 para esta variável
-            col_t0 = variavel_base + '_T0'
-            col_t2 = variavel_base + '_T2'
-            if col_t0 in df.columns and col_t2 in df.columns:
-                variaveis_unicas.add(variavel_base)
-        elif col.endswith('_T2'):
-            variavel_base = col[:-3]  # Remove '_T2'
-            # Verificar se existe T0 e T1 para esta variável
-            col_t0 = variavel_base + '_T0'
-            col_t1 = variavel_base + '_T1'
-            if col_t0 in df.columns and col_t1 in df.columns:
-                variaveis_unicas.add(variavel_base)
-    
-    return sorted(list(variaveis_unicas))
+    if indice is None:
+        indice = IndiceVariaveis(df.columns)
+    return sorted(indice.variaveis())
 
 def testar_normalidade_variavel(df, variavel_base):
     """
     Testa normalidade para uma variável específica em cada tempo (T0, T1, T2)
-    """
-    resultados = []
-    
-    # Colunas da variável
-    colunas_variavel = [f'{variavel_base}_T0', f'{variavel_base}_T1', f'{variavel_base}_T2']
     
-    for col in colunas_variavel:
-        if col not in df.columns:
-            continue
-            
-        # Extrair tempo da coluna
-        if col.endswith('_T0'):
-            tempo = 'T0'
-        elif col.endswith('_T1'):
-            tempo = 'T1'
-        elif col.endswith('_T2'):
-            tempo = 'T2'
-        else:
-            continue
-            
-        dados_tempo = df[col].dropna()
-        
-        # Converter para numérico, ignorando strings
-        dados_tempo = pd.to_numeric(dados_tempo, errors='coerce').dropna()
-        
-        if len(dados_tempo) >= 3:  # Mínimo para Shapiro-Wilk
-            stat, p_value = shapiro(dados_tempo)
-            resultados.append({
-                'Variavel': variavel_base,
-                'Tempo': tempo,
-                'n': len(dados_tempo),
-                'Shapiro_Stat': stat,
-                'Shapiro_p': p_value,
-                'Normal': 'Sim' if p_value > 0.05 else 'Não'
-            })
-        else:
-            resultados.append({
-                'Variavel': variavel_base,
-                'Tempo': tempo,
-                'n': len(dados_tempo),
-                'Shapiro_Stat': np.nan,
-                'Shapiro_p': np.nan,
-                'Normal': 'Dados insuficientes'
-            })
-    
-    return pd.DataFrame(resultados)
+    Usa o motor vetorizado de normalidade_lote (Shapiro-Wilk e D'Agostino-Pearson)
+    """
+    grupos = grupos_por_sufixo([variavel_base])
+    return normalidade_lote(criar_cubo(df, grupos), [variavel_base], colunas_existentes(df, grupos))[variavel_base]
 
 def detectar_outliers_variavel(df, variavel_base):
     """
     Detecta outliers para uma variável específica usando IQR e Z-score
-    """
-    resultados = []
-    
-    # Colunas da variável
-    colunas_variavel = [f'{variavel_base}_T0', f'{variavel_base}_T1', f'{variavel_base}_T2']
     
-    for col in colunas_variavel:
-        if col not in df.columns:
-            continue
-            
-        # Extrair tempo da coluna
-        if col.endswith('_T0'):
-            tempo = 'T0'
-        elif col.endswith('_T1'):
-            tempo = 'T1'
-        elif col.endswith('_T2'):
-            tempo = 'T2'
-        else:
-            continue
-            
-        dados_tempo = df[col].dropna()
-        
-        # Converter para numérico, ignorando strings
-        dados_tempo = pd.to_numeric(dados_tempo, errors='coerce').dropna()
-        
-        if len(dados_tempo) > 0:
-            # Método IQR
-            Q1 = dados_tempo.quantile(0.25)
-            Q3 = dados_tempo.quantile(0.75)
-            IQR = Q3 - Q1
-            limite_inferior = Q1 - 1.5 * IQR
-            limite_superior = Q3 + 1.5 * IQR
-            
-            outliers_iqr = dados_tempo[(dados_tempo < limite_inferior) | (dados_tempo > limite_superior)]
-            
-            # Método Z-score
-            if len(dados_tempo) > 1:  # Precisa de pelo menos 2 valores para calcular z-score
-                z_scores = np.abs(stats.zscore(dados_tempo))
-                outliers_z = dados_tempo[z_scores > 3]
-            else:
-                outliers_z = pd.Series(dtype=float)
-            
-            resultados.append({
-                'Variavel': variavel_base,
-                'Tempo': tempo,
-                'n_total': len(dados_tempo),
-                'outliers_IQR': len(outliers_iqr),
-                'outliers_Zscore': len(outliers_z),
-                'percent_outliers_IQR': (len(outliers_iqr) / len(dados_tempo)) * 100,
-                'percent_outliers_Zscore': (len(outliers_z) / len(dados_tempo)) * 100,
-                'media': dados_tempo.mean(),
-                'desvio_padrao': dados_tempo.std(),
-                'min': dados_tempo.min(),
-                'max': dados_tempo.max()
-            })
-    
-    return pd.DataFrame(resultados)
+    Usa o motor vetorizado de outliers_lote
+    """
+    grupos = grupos_por_sufixo([variavel_base])
+    return outliers_lote(criar_cubo(df, grupos), [variavel_base], colunas_existentes(df, grupos))[variavel_base]
 
-def criar_boxplot_variavel(df, variavel_base, output_folder='graficos'):
+def criar_boxplot_variavel(df, variavel_base, output_folder='graficos', dpi=300, formato='png'):
     """
     Cria boxplot para visualizar outliers de uma variável específica
-    """
-    # Criar pasta de gráficos se não existir
-    Path(output_folder).mkdir(exist_ok=True)
-    
-    plt.figure(figsize=(12, 8))
     
-    # Preparar dados para boxplot
-    dados_boxplot = []
-    tempos = []
-    
-    colunas_variavel = [f'{variavel_base}_T0', f'{variavel_base}_T1', f'{variavel_base}_T2']
-    
-    for col in colunas_variavel:
-        if col not in df.columns:
-            continue
-            
-        # Extrair tempo da coluna
-        if col.endswith('_T0'):
-            tempo = 'T0'
-        elif col.endswith('_T1'):
-            tempo = 'T1'
-        elif col.endswith('_T2'):
-            tempo = 'T2'
-        else:
-            continue
-            
-        dados_tempo = df[col].dropna()
-        
-        # Converter para numérico, ignorando strings
-        dados_tempo = pd.to_numeric(dados_tempo, errors='coerce').dropna()
-        
-        if len(dados_tempo) > 0:
-            dados_boxplot.append(dados_tempo)
-            tempos.append(tempo)
-    
-    if dados_boxplot:
-        # Criar boxplot
-        bp = plt.boxplot(dados_boxplot, labels=tempos, patch_artist=True)
-        
-        # Colorir os boxes
-        colors = ['lightblue', 'lightgreen', 'lightcoral']
-        for patch, color in zip(bp['boxes'], colors):
-            patch.set_facecolor(color)
-        
-        plt.title(f'Boxplot - {variavel_base}', fontsize=16, fontweight='bold')
-        plt.xlabel('Tempo de Teste', fontsize=12)
-        plt.ylabel(variavel_base, fontsize=12)
-        plt.grid(True, alpha=0.3)
-        
-        # Adicionar estatísticas no gráfico
-        for i, (tempo, dados) in enumerate(zip(tempos, dados_boxplot)):
-            media = dados.mean()
-            plt.text(i+1, media, f'Média: {media:.3f}', 
-                    ha='center', va='bottom', fontweight='bold')
-        
-        # Salvar gráfico
-        filename = f"{output_folder}/boxplot_{variavel_base}.png"
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return filename
-    else:
-        plt.close()
-        return None
+    Para muitas variáveis, prefira renderizar_boxplots, que reaproveita a figura
+    entre variáveis e pode desenhar em paralelo e várias variáveis por página.
+    """
+    return renderizar_boxplots(paineis_boxplot(df, [variavel_base]), output_folder, dpi, formato)[variavel_base]
+
+def _cubo_variavel(df, variavel_base):
+    """
+    Cubo (1, participantes, tempos) de uma variável, ou None se ela não tiver nenhum valor válido
+    """
+    cubo = criar_cubo(df, grupos_por_sufixo([variavel_base]))
+    return None if np.isnan(cubo).all() else cubo
 
-def testar_esfericidade_variavel(df, variavel_base, id_column):
+def testar_esfericidade_variavel(df, variavel_base, id_column=None):
     """
     Testa esfericidade para uma variável específica usando Mauchly's test
+    
+    Usa o motor vetorizado de esfericidade_lote, que também retorna os epsilons
+    de Greenhouse-Geisser e Huynh-Feldt (Correcao_GG/Correcao_HF).
+    
+    `id_column` não é usado (cada linha de `df` já é um participante); é mantido
+    apenas para não quebrar chamadas com a assinatura anterior.
     """
     try:
-        # Preparar dados para pingouin (converter para formato longo)
-        anova_data = []
-        
-        colunas_variavel = [f'{variavel_base}_T0', f'{variavel_base}_T1', f'{variavel_base}_T2']
-        
-        for idx, row in df.iterrows():
-            participant_id = row[id_column]
-            
-            for col in colunas_variavel:
-                if col not in df.columns:
-                    continue
-                    
-                # Extrair tempo da coluna
-                if col.endswith('_T0'):
-                    tempo = 'T0'
-                elif col.endswith('_T1'):
-                    tempo = 'T1'
-                elif col.endswith('_T2'):
-                    tempo = 'T2'
-                else:
-                    continue
-                    
-                value = row[col]
-                
-                # Converter para numérico
-                try:
-                    value = pd.to_numeric(value, errors='coerce')
-                    if pd.notna(value):
-                        anova_data.append({
-                            'participant': participant_id,
-                            'time': tempo,
-                            'value': value
-                        })
-                except:
-                    continue
-        
-        anova_df = pd.DataFrame(anova_data)
-        
-        if len(anova_df) == 0:
+        cubo = _cubo_variavel(df, variavel_base)
+        if cubo is None:
             return {'Variavel': variavel_base, 'Erro': 'Sem dados válidos'}
         
-        # Verificar se temos dados suficientes para cada tempo
-        tempos_unicos = anova_df['time'].unique()
-        if len(tempos_unicos) < 3:
-            return {'Variavel': variavel_base, 'Erro': f'Apenas {len(tempos_unicos)} tempos encontrados. Necessário 3.'}
-        
-        # Verificar se cada participante tem dados para todos os tempos
-        participantes_por_tempo = anova_df.groupby('time')['participant'].nunique()
-        if participantes_por_tempo.min() < 3:
-            return {'Variavel': variavel_base, 'Erro': f'Mínimo de participantes insuficiente: {participantes_por_tempo.min()}'}
-        
-        # Verificar variabilidade
-        if anova_df['value'].std() == 0:
-            return {'Variavel': variavel_base, 'Erro': 'Sem variabilidade nos dados'}
-        
-        # Teste de esfericidade
-        sphericity = pg.sphericity(anova_df, dv='value', within='time', subject='participant')
-        
-        return {
-            'Variavel': variavel_base,
-            'Mauchly_W': sphericity.W,
-            'Mauchly_p': sphericity.pval,
-            'Esferico': 'Sim' if sphericity.pval > 0.05 else 'Não',
-            'Correcao_GG': 'N/A',
-            'Correcao_HF': 'N/A'
-        }
+        return esfericidade_lote(cubo, [variavel_base])[variavel_base]
             
     except Exception as e:
         return {
@@ -306,294 +102,406 @@ def testar_esfericidade_variavel(df, variavel_base, id_column):
             'Erro': str(e)
         }
 
-def comparacoes_post_hoc_variavel(df, variavel_base, id_column):
+def comparacoes_post_hoc_variavel(df, variavel_base, id_column=None):
     """
     Realiza comparações post-hoc para uma variável específica usando Bonferroni
+    
+    Usa o motor vetorizado de posthoc_lote sobre a matriz participante x tempo da variável.
+    
+    `id_column` não é usado (cada linha de `df` já é um participante); é mantido
+    apenas para não quebrar chamadas com a assinatura anterior.
     """
     try:
-        # Preparar dados (converter para formato longo)
-        anova_data = []
-        
-        colunas_variavel = [f'{variavel_base}_T0', f'{variavel_base}_T1', f'{variavel_base}_T2']
-        
-        for idx, row in df.iterrows():
-            participant_id = row[id_column]
-            
-            for col in colunas_variavel:
-                if col not in df.columns:
-                    continue
-                    
-                # Extrair tempo da coluna
-                if col.endswith('_T0'):
-                    tempo = 'T0'
-                elif col.endswith('_T1'):
-                    tempo = 'T1'
-                elif col.endswith('_T2'):
-                    tempo = 'T2'
-                else:
-                    continue
-                    
-                value = row[col]
-                
-                # Converter para numérico
-                try:
-                    value = pd.to_numeric(value, errors='coerce')
-                    if pd.notna(value):
-                        anova_data.append({
-                            'participant': participant_id,
-                            'time': tempo,
-                            'value': value
-                        })
-                except:
-                    continue
-        
-        anova_df = pd.DataFrame(anova_data)
-        
-        if len(anova_df) == 0:
+        cubo = _cubo_variavel(df, variavel_base)
+        if cubo is None:
             return pd.DataFrame([{'Variavel': variavel_base, 'Erro': 'Sem dados válidos'}])
         
-        # Verificar se há dados suficientes para comparações
-        tempos_unicos = anova_df['time'].unique()
-        if len(tempos_unicos) < 2:
-            return pd.DataFrame([{'Variavel': variavel_base, 'Erro': f'Apenas {len(tempos_unicos)} tempos encontrados. Necessário pelo menos 2.'}])
-        
-        # Tentar comparações post-hoc com pingouin primeiro
-        try:
-            posthoc = pg.pairwise_ttests(anova_df, dv='value', within='time', subject='participant', 
-                                       padjust='bonf')
-            
-            # Verificar se o resultado tem as colunas esperadas
-            if not posthoc.empty and all(col in posthoc.columns for col in ['A', 'B', 'T', 'p-unc', 'p-corr']):
-                # Organizar resultados do pingouin
-                resultados = []
-                for _, row in posthoc.iterrows():
-                    # Usar 'hedges' se disponível, senão calcular manualmente
-                    tamanho_efeito = row.get('hedges', np.nan)
-                    if pd.isna(tamanho_efeito):
-                        # Calcular Cohen's d aproximado
-                        tamanho_efeito = row['T'] / np.sqrt(row['dof'] + 1)
-                    
-                    # Calcular diferença de médias e IC para cada comparação
-                    tempo1, tempo2 = row['A'], row['B']
-                    
-                    # Encontrar participantes comuns para cálculo correto
-                    participantes_tempo1 = anova_df[anova_df['time'] == tempo1]['participant'].values
-                    participantes_tempo2 = anova_df[anova_df['time'] == tempo2]['participant'].values
-                    participantes_comuns = np.intersect1d(participantes_tempo1, participantes_tempo2)
-                    
-                    if len(participantes_comuns) >= 3:
-                        # Reorganizar dados para participantes comuns
-                        dados1_comuns = []
-                        dados2_comuns = []
-                        for p in participantes_comuns:
-                            val1 = anova_df[(anova_df['time'] == tempo1) & (anova_df['participant'] == p)]['value'].iloc[0]
-                            val2 = anova_df[(anova_df['time'] == tempo2) & (anova_df['participant'] == p)]['value'].iloc[0]
-                            dados1_comuns.append(val1)
-                            dados2_comuns.append(val2)
-                        
-                        dados1_comuns = np.array(dados1_comuns)
-                        dados2_comuns = np.array(dados2_comuns)
-                        
-                        # Diferença de médias (T1 - T2)
-                        diff_medias = np.mean(dados1_comuns) - np.mean(dados2_comuns)
-                        
-                        # Intervalo de confiança para diferença de médias
-                        diff_individual = dados1_comuns - dados2_comuns
-                        n = len(diff_individual)
-                        se_diff = np.std(diff_individual, ddof=1) / np.sqrt(n)
-                        
-                        # IC 95% usando distribuição t
-                        from scipy.stats import t
-                        t_critico = t.ppf(0.975, df=n-1)  # 95% CI
-                        ic_inferior = diff_medias - t_critico * se_diff
-                        ic_superior = diff_medias + t_critico * se_diff
-                    else:
-                        diff_medias = np.nan
-                        ic_inferior = np.nan
-                        ic_superior = np.nan
-                    
-                    resultados.append({
-                        'Variavel': variavel_base,
-                        'Comparacao': f"{row['A']} vs {row['B']}",
-                        'Diferenca_medias': diff_medias,
-                        'P_corrigido': row['p-corr'],
-                        'IC_inferior': ic_inferior,
-                        'IC_superior': ic_superior,
-                        'T_statistic': row['T'],
-                        'p_value': row['p-unc'],
-                        'Significativo': 'Sim' if row['p-corr'] < 0.05 else 'Não',
-                        'Tamanho_efeito': tamanho_efeito
-                    })
-                return pd.DataFrame(resultados)
-            else:
-                raise Exception("pingouin pairwise_ttests falhou")
-                
-        except Exception as e:
-            # Método manual usando scipy.stats
-            from scipy.stats import ttest_rel
-            
-            resultados = []
-            tempos = sorted(anova_df['time'].unique())
-            
-            # Fazer todas as comparações pareadas
-            for i in range(len(tempos)):
-                for j in range(i+1, len(tempos)):
-                    tempo1, tempo2 = tempos[i], tempos[j]
-                    
-                    # Obter dados para cada tempo
-                    dados_tempo1 = anova_df[anova_df['time'] == tempo1]['value'].values
-                    dados_tempo2 = anova_df[anova_df['time'] == tempo2]['value'].values
-                    
-                    # Garantir que temos os mesmos participantes
-                    participantes_tempo1 = anova_df[anova_df['time'] == tempo1]['participant'].values
-                    participantes_tempo2 = anova_df[anova_df['time'] == tempo2]['participant'].values
-                    
-                    # Encontrar participantes comuns
-                    participantes_comuns = np.intersect1d(participantes_tempo1, participantes_tempo2)
-                    
-                    if len(participantes_comuns) >= 3:  # Mínimo para t-test
-                        # Reorganizar dados para participantes comuns
-                        dados1_comuns = []
-                        dados2_comuns = []
-                        
-                        for p in participantes_comuns:
-                            val1 = anova_df[(anova_df['time'] == tempo1) & (anova_df['participant'] == p)]['value'].iloc[0]
-                            val2 = anova_df[(anova_df['time'] == tempo2) & (anova_df['participant'] == p)]['value'].iloc[0]
-                            dados1_comuns.append(val1)
-                            dados2_comuns.append(val2)
-                        
-                        dados1_comuns = np.array(dados1_comuns)
-                        dados2_comuns = np.array(dados2_comuns)
-                        
-                        # T-test pareado
-                        t_stat, p_value = ttest_rel(dados1_comuns, dados2_comuns)
-                        
-                        # Diferença de médias
-                        diff_medias = np.mean(dados1_comuns) - np.mean(dados2_comuns)
-                        
-                        # Intervalo de confiança para diferença de médias
-                        diff_individual = dados1_comuns - dados2_comuns
-                        n = len(diff_individual)
-                        se_diff = np.std(diff_individual, ddof=1) / np.sqrt(n)
-                        
-                        # IC 95% usando distribuição t
-                        from scipy.stats import t
-                        t_critico = t.ppf(0.975, df=n-1)  # 95% CI
-                        ic_inferior = diff_medias - t_critico * se_diff
-                        ic_superior = diff_medias + t_critico * se_diff
-                        
-                        # Cohen's d para dados pareados (d_z) - mais preciso
-                        diff = dados1_comuns - dados2_comuns
-                        
-                        # Verificar se há missing values nas diferenças
-                        diff_validos = diff[~np.isnan(diff)]
-                        
-                        if len(diff_validos) > 1 and np.std(diff_validos, ddof=1) > 0:
-                            cohens_d = np.mean(diff_validos) / np.std(diff_validos, ddof=1)
-                        else:
-                            cohens_d = 0
-                        
-                        # Correção de Bonferroni (número de comparações)
-                        num_comparacoes = len(tempos) * (len(tempos) - 1) // 2
-                        p_corrigido = min(p_value * num_comparacoes, 1.0)
-                        
-                        resultados.append({
-                            'Variavel': variavel_base,
-                            'Comparacao': f"{tempo1} vs {tempo2}",
-                            'Diferenca_medias': diff_medias,
-                            'P_corrigido': p_corrigido,
-                            'IC_inferior': ic_inferior,
-                            'IC_superior': ic_superior,
-                            'T_statistic': t_stat,
-                            'p_value': p_value,
-                            'Significativo': 'Sim' if p_corrigido < 0.05 else 'Não',
-                            'Tamanho_efeito': cohens_d
-                        })
-            
-            if resultados:
-                return pd.DataFrame(resultados)
-            else:
-                return pd.DataFrame([{'Variavel': variavel_base, 'Erro': 'Não foi possível realizar comparações manuais'}])
+        return posthoc_lote(cubo, [variavel_base])[variavel_base]
     except Exception as e:
         return pd.DataFrame([{'Variavel': variavel_base, 'Erro': str(e)}])
 
-def anova_variavel(df, variavel_base, id_column):
+def anova_variavel(df, variavel_base, id_column=None):
     """
     Realiza ANOVA de medidas repetidas para uma variável específica
+    
+    Usa o motor vetorizado de anova_lote; além do p sem correção, retorna os p
+    corrigidos por Greenhouse-Geisser (p_GG) e Huynh-Feldt (p_HF).
+    
+    `id_column` não é usado (cada linha de `df` já é um participante); é mantido
+    apenas para não quebrar chamadas com a assinatura anterior.
     """
     try:
-        # Preparar dados (converter para formato longo)
-        anova_data = []
-        
-        colunas_variavel = [f'{variavel_base}_T0', f'{variavel_base}_T1', f'{variavel_base}_T2']
-        
-        for idx, row in df.iterrows():
-            participant_id = row[id_column]
-            
-            for col in colunas_variavel:
-                if col not in df.columns:
-                    continue
-                    
-                # Extrair tempo da coluna
-                if col.endswith('_T0'):
-                    tempo = 'T0'
-                elif col.endswith('_T1'):
-                    tempo = 'T1'
-                elif col.endswith('_T2'):
-                    tempo = 'T2'
-                else:
-                    continue
-                    
-                value = row[col]
-                
-                # Converter para numérico
-                try:
-                    value = pd.to_numeric(value, errors='coerce')
-                    if pd.notna(value):
-                        anova_data.append({
-                            'participant': participant_id,
-                            'time': tempo,
-                            'value': value
-                        })
-                except:
-                    continue
-        
-        anova_df = pd.DataFrame(anova_data)
-        
-        if len(anova_df) == 0:
+        cubo = _cubo_variavel(df, variavel_base)
+        if cubo is None:
             return {'Variavel': variavel_base, 'Erro': 'Sem dados válidos'}
         
-        # ANOVA de medidas repetidas
-        aov = pg.rm_anova(data=anova_df, dv='value', within='time', subject='participant')
-        
-        # Extrair resultados
-        time_row = aov.loc[aov['Source'] == 'time']
-        if time_row.empty:
-            return {'Variavel': variavel_base, 'Erro': 'Não foi possível encontrar resultados para o fator time'}
-        
-        p_value = time_row['p-unc'].iloc[0]
-        f_value = time_row['F'].iloc[0]
-        
-        # Calcular partial eta squared
-        if 'ng2' in time_row.columns:
-            partial_eta_squared = time_row['ng2'].iloc[0]
-        else:
-            df1 = time_row['ddof1'].iloc[0]
-            df2 = time_row['ddof2'].iloc[0]
-            partial_eta_squared = (f_value * df1) / (f_value * df1 + df2)
-        
-        return {
-            'Variavel': variavel_base,
-            'F': f_value,
-            'p_value': p_value,
-            'partial_eta_squared': partial_eta_squared,
-            'significativo': 'Sim' if p_value < 0.05 else 'Não',
-            'tamanho_efeito': 'Grande' if partial_eta_squared >= 0.14 else 'Médio' if partial_eta_squared >= 0.06 else 'Pequeno'
-        }
+        return anova_lote(cubo, [variavel_base])[variavel_base]
     except Exception as e:
         return {'Variavel': variavel_base, 'Erro': str(e)}
 
-def analise_completa_todas_variaveis(csv_path, output_path=None, criar_graficos=True):
+def planejar_etapas(etapas=None):
+    """
+    Valida as etapas pedidas e as coloca na ordem de execução da bateria
+    
+    Args:
+        etapas (list ou str): Nomes das etapas (lista ou texto separado por vírgulas); None = todas
+    
+    Returns:
+        list: Etapas na ordem de ETAPAS
+    """
+    if etapas is None:
+        return list(ETAPAS)
+    if isinstance(etapas, str):
+        etapas = etapas.split(',')
+    pedidas = {etapa.strip().lower() for etapa in etapas if etapa.strip()}
+    invalidas = sorted(pedidas - set(ETAPAS))
+    if invalidas:
+        raise ValueError(f"Etapas desconhecidas: {', '.join(invalidas)}. Etapas válidas: {', '.join(ETAPAS)}")
+    return [etapa for etapa in ETAPAS if etapa in pedidas]
+
+def analisar_bloco(df, variaveis, id_column, cache=None, etapas=None, posthoc_apenas_significativas=False,
+                   indice=None):
+    """
+    Executa as etapas pedidas da bateria de testes para um bloco de variáveis, sem imprimir resultados
+    
+    Os testes são calculados de uma só vez, de forma vetorizada, para todas
+    as variáveis do bloco que não estão no cache. Etapas não pedidas não são
+    calculadas.
+    
+    Args:
+        df (pd.DataFrame): Dados no formato largo
+        variaveis (list): Variáveis do bloco (sem sufixo _T0/_T1/_T2)
+        id_column (str): Nome da coluna de ID
+        cache (CacheResultados): Cache de resultados dos testes (opcional)
+        etapas (list): Etapas a executar (ver planejar_etapas); None = todas.
+            A etapa 'boxplot' é tratada por renderizar_boxplots e ignorada aqui
+        posthoc_apenas_significativas (bool): Se, com a etapa 'anova' também
+            pedida, o post-hoc deve ser omitido (None) para ANOVAs não significativas
+        indice (IndiceVariaveis): Índice das variáveis de `df` (montado se não for informado)
+    
+    Returns:
+        list: Um dicionário por variável com os resultados de cada etapa executada
+        ('normalidade', 'outliers', 'anova', 'residuos', 'esfericidade' e/ou 'posthoc')
+    """
+    if cache is None:
+        cache = CacheResultados(ativo=False)
+    etapas = planejar_etapas(etapas)
+    if indice is None:
+        indice = IndiceVariaveis(df.columns)
+    
+    # Os testes só são recalculados se os dados da variável (ID + T0/T1/T2) mudarem
+    conteudos = {}
+    for variavel_base in variaveis:
+        conteudos[variavel_base] = None
+        if cache.ativo:
+            conteudos[variavel_base] = hash_dados(df[[id_column] + indice.colunas(variavel_base)])
+    
+    # Matriz participante x tempo das variáveis sem resultado no cache, montada uma vez por bloco
+    cubos = {}
+    def cubo_faltantes(faltantes):
+        if tuple(faltantes) not in cubos:
+            cubos[tuple(faltantes)] = indice.criar_cubo(df, faltantes)
+        return cubos[tuple(faltantes)]
+    
+    # Decomposição da ANOVA compartilhada pelas etapas 'anova' e 'residuos' (os resíduos saem das mesmas médias)
+    decomposicoes = {}
+    def anova_faltantes(faltantes):
+        if tuple(faltantes) not in decomposicoes:
+            decomposicoes[tuple(faltantes)] = calcular_rm_anova(cubo_faltantes(faltantes),
+                                                                residuos='residuos' in etapas)
+        return decomposicoes[tuple(faltantes)]
+    
+    # Etapa -> (nome do teste no cache, parâmetros, cálculo em lote)
+    testes = {
+        'normalidade': ('shapiro', {}, lambda faltantes: normalidade_lote(
+            cubo_faltantes(faltantes), faltantes, indice.colunas_existentes(faltantes))),
+        'outliers': ('outliers_iqr_zscore', {}, lambda faltantes: outliers_lote(
+            cubo_faltantes(faltantes), faltantes, indice.colunas_existentes(faltantes))),
+        'anova': ('rm_anova', {}, lambda faltantes: anova_lote(
+            cubo_faltantes(faltantes), faltantes, anova=anova_faltantes(faltantes))),
+        'residuos': ('residuos_rm_anova', {}, lambda faltantes: residuos_lote(
+            cubo_faltantes(faltantes), faltantes, anova=anova_faltantes(faltantes))),
+        'esfericidade': ('mauchly', {}, lambda faltantes: esfericidade_lote(cubo_faltantes(faltantes), faltantes)),
+        'posthoc': ('posthoc', {'padjust': 'bonf'}, lambda faltantes: posthoc_lote(cubo_faltantes(faltantes), faltantes))
+    }
+    
+    resultados = {variavel_base: {} for variavel_base in variaveis}
+    for etapa in etapas:
+        if etapa not in testes:
+            continue
+        nome_teste, parametros, calcular = testes[etapa]
+        selecionadas = conteudos
+        if etapa == 'posthoc' and posthoc_apenas_significativas and 'anova' in etapas:
+            selecionadas = {var: conteudo for var, conteudo in conteudos.items()
+                            if resultados[var]['anova'].get('significativo') == 'Sim'}
+            for variavel_base in conteudos:
+                if variavel_base not in selecionadas:
+                    resultados[variavel_base]['posthoc'] = None
+        if not selecionadas:
+            continue
+        with etapa_perfil(f'teste:{etapa}'):
+            calculados = cache.obter_ou_calcular_lote(nome_teste, selecionadas, parametros, calcular)
+        for variavel_base, resultado in calculados.items():
+            resultados[variavel_base][etapa] = resultado
+    
+    return [resultados[variavel_base] for variavel_base in variaveis]
+
+def analisar_variavel(df, variavel_base, id_column, cache=None, etapas=None):
+    """
+    Executa a bateria de testes (todas as etapas, por padrão) para uma única variável (ver analisar_bloco)
+    """
+    return analisar_bloco(df, [variavel_base], id_column, cache, etapas)[0]
+
+def imprimir_resultados_variavel(resultado):
+    """
+    Imprime o resumo de cada etapa executada da bateria de uma variável
+    """
+    # Teste de Normalidade
+    if 'normalidade' in resultado:
+        print("   Testando normalidade...")
+        normalidade = resultado['normalidade']
+        if not normalidade.empty:
+            for _, row in normalidade.iterrows():
+                print(f"     {row['Tempo']}: p = {row['Shapiro_p']:.4f} ({row['Normal']})")
+        else:
+            print("     AVISO: Não foi possível testar normalidade")
+    
+    # Detecção de Outliers
+    if 'outliers' in resultado:
+        print("   Detectando outliers...")
+        outliers = resultado['outliers']
+        if not outliers.empty:
+            for _, row in outliers.iterrows():
+                print(f"     {row['Tempo']}: {row['outliers_IQR']} outliers ({row['percent_outliers_IQR']:.1f}%)")
+        else:
+            print("     AVISO: Não foi possível detectar outliers")
+    
+    # Boxplot
+    if 'boxplot' in resultado:
+        print("   Criando boxplot...")
+        if resultado['boxplot']:
+            print(f"     Boxplot salvo: {resultado['boxplot']}")
+        else:
+            print("     AVISO: Não foi possível criar boxplot")
+    
+    # ANOVA de Medidas Repetidas
+    if 'anova' in resultado:
+        print("   Realizando ANOVA de medidas repetidas...")
+        anova_result = resultado['anova']
+        if 'Erro' not in anova_result:
+            print(f"     ANOVA: F = {anova_result['F']:.3f}, p = {anova_result['p_value']:.4f}")
+            print(f"     Tamanho de efeito (η²) = {anova_result['partial_eta_squared']:.4f} ({anova_result['tamanho_efeito']})")
+            print(f"     Resultado: {anova_result['significativo']}")
+        else:
+            print(f"     ERRO: {anova_result['Erro']}")
+    
+    # Normalidade dos resíduos da ANOVA
+    if 'residuos' in resultado:
+        print("   Testando normalidade dos resíduos da ANOVA...")
+        residuos = resultado['residuos']['normalidade']
+        if 'Erro' not in residuos:
+            print(f"     Resíduos: p = {residuos['Shapiro_p']:.4f} ({residuos['Normal']}), "
+                  f"r do Q-Q = {residuos['QQ_r']:.4f}")
+        else:
+            print(f"     ERRO: {residuos['Erro']}")
+    
+    # Teste de Esfericidade
+    if 'esfericidade' in resultado:
+        print("   Testando esfericidade...")
+        esfericidade = resultado['esfericidade']
+        if 'Erro' not in esfericidade:
+            print(f"     Esfericidade: p = {esfericidade['Mauchly_p']:.4f} ({esfericidade['Esferico']})")
+        else:
+            print(f"     ERRO: {esfericidade['Erro']}")
+    
+    # Comparações Post-hoc
+    if 'posthoc' in resultado:
+        print("   Realizando comparações post-hoc...")
+        posthoc = resultado['posthoc']
+        if posthoc is None:
+            print("     Omitidas: ANOVA não significativa")
+        elif not posthoc.empty and 'Comparacao' in posthoc.columns:
+            print("     Comparações post-hoc:")
+            for _, row in posthoc.iterrows():
+                print(f"       {row['Comparacao']}: p = {row['P_corrigido']:.3f} ({row['Significativo']})")
+        else:
+            print("     AVISO: Não foi possível realizar comparações post-hoc")
+
+# Dados compartilhados com os processos de trabalho. Com o método 'fork' eles são
+# herdados pela memória do processo principal, sem serem serializados a cada tarefa.
+_DADOS_TRABALHADOR = {}
+
+# Em execução sequencial, blocos pequenos o bastante para que os resultados (e
+# checkpoints) sejam gravados ao longo da execução, e não apenas no final
+TAMANHO_BLOCO_SEQUENCIAL = 25
+
+def _inicializar_trabalhador(df, id_column, cache, etapas, posthoc_apenas_significativas, indice):
+    _DADOS_TRABALHADOR.update(df=df, id_column=id_column, cache=cache, etapas=etapas,
+                              posthoc_apenas_significativas=posthoc_apenas_significativas, indice=indice)
+
+def _analisar_bloco_trabalhador(variaveis):
+    dados = _DADOS_TRABALHADOR
+    cache = dados['cache']
+    hits_antes, misses_antes = cache.hits, cache.misses
+    resultados = analisar_bloco(dados['df'], variaveis, dados['id_column'], cache, dados['etapas'],
+                                dados['posthoc_apenas_significativas'], dados['indice'])
+    # Contagens do cache devolvidas ao processo principal junto com o bloco
+    return resultados, cache.hits - hits_antes, cache.misses - misses_antes
+
+def executar_bateria(df, variaveis, id_column, n_processos=1, cache=None,
+                     tamanho_bloco=None, etapas=None, posthoc_apenas_significativas=False, indice=None):
+    """
+    Executa a bateria de testes em blocos de variáveis, opcionalmente em vários processos
+    
+    Os blocos são enviados aos processos e os resultados são devolvidos sempre
+    na ordem de `variaveis`, para que as planilhas finais sejam idênticas às
+    da execução sequencial. As contagens de uso do cache dos processos são
+    somadas ao objeto `cache` do processo principal.
+    
+    Args:
+        df (pd.DataFrame): Dados no formato largo
+        variaveis (list): Variáveis a analisar
+        id_column (str): Nome da coluna de ID
+        n_processos (int): Número de processos (1 = execução sequencial)
+        cache (CacheResultados): Cache de resultados dos testes (opcional)
+        tamanho_bloco (int): Variáveis por bloco (padrão: TAMANHO_BLOCO_SEQUENCIAL
+            em execução sequencial; ~4 blocos por processo em paralelo)
+        etapas (list): Etapas a executar (ver analisar_bloco); None = todas
+        posthoc_apenas_significativas (bool): Omitir o post-hoc de ANOVAs não significativas
+        indice (IndiceVariaveis): Índice das variáveis de `df` (montado uma vez se não for informado)
+    
+    Yields:
+        dict: Resultados de cada variável, na ordem de `variaveis`
+    """
+    if cache is None:
+        cache = CacheResultados(ativo=False)
+    if indice is None:
+        indice = IndiceVariaveis(df.columns)
+    
+    if tamanho_bloco is None:
+        tamanho_bloco = TAMANHO_BLOCO_SEQUENCIAL if n_processos <= 1 else math.ceil(len(variaveis) / (n_processos * 4))
+    tamanho_bloco = max(1, tamanho_bloco)
+    blocos = [variaveis[i:i + tamanho_bloco] for i in range(0, len(variaveis), tamanho_bloco)]
+    
+    if n_processos <= 1 or len(blocos) <= 1:
+        for bloco in blocos:
+            yield from analisar_bloco(df, bloco, id_column, cache, etapas, posthoc_apenas_significativas, indice)
+        return
+    
+    contexto = None
+    if 'fork' in multiprocessing.get_all_start_methods():
+        contexto = multiprocessing.get_context('fork')
+    
+    with ProcessPoolExecutor(max_workers=n_processos, mp_context=contexto,
+                             initializer=_inicializar_trabalhador,
+                             initargs=(df, id_column, cache, etapas,
+                                       posthoc_apenas_significativas, indice)) as executor:
+        for resultados_bloco, hits, misses in executor.map(_analisar_bloco_trabalhador, blocos):
+            cache.hits += hits
+            cache.misses += misses
+            yield from resultados_bloco
+
+def montar_tabelas(variaveis, resultados_por_variavel):
+    """
+    Consolida os resultados das variáveis nas tabelas do relatório
+    
+    Args:
+        variaveis (list): Variáveis analisadas, na ordem das linhas
+        resultados_por_variavel (dict): {variavel: resultado de analisar_bloco}
+    
+    Returns:
+        dict: {nome da planilha: DataFrame}, na ordem das planilhas; tabelas sem nenhuma
+        linha não são incluídas. A coluna PostHoc de Resumo_Geral indica as variáveis
+        cujo post-hoc foi omitido por a ANOVA não ser significativa
+    """
+    todos_normalidade = []
+    todos_outliers = []
+    todos_esfericidade = []
+    todos_posthoc = []
+    todos_anova = []
+    todos_residuos = []
+    todos_qq = []
+    situacao_posthoc = []
+    
+    for variavel_base in variaveis:
+        resultado = resultados_por_variavel[variavel_base]
+        if 'normalidade' in resultado and not resultado['normalidade'].empty:
+            todos_normalidade.append(resultado['normalidade'])
+        if 'outliers' in resultado and not resultado['outliers'].empty:
+            todos_outliers.append(resultado['outliers'])
+        if 'anova' in resultado and 'Erro' not in resultado['anova']:
+            todos_anova.append(pd.DataFrame([resultado['anova']]))
+        if 'residuos' in resultado and 'Erro' not in resultado['residuos']['normalidade']:
+            todos_residuos.append(pd.DataFrame([resultado['residuos']['normalidade']]))
+            todos_qq.append(resultado['residuos']['qq'])
+        if 'esfericidade' in resultado and 'Erro' not in resultado['esfericidade']:
+            todos_esfericidade.append(pd.DataFrame([resultado['esfericidade']]))
+        posthoc = resultado.get('posthoc')
+        if posthoc is not None and not posthoc.empty and 'Comparacao' in posthoc.columns:
+            todos_posthoc.append(posthoc)
+        if 'posthoc' not in resultado:
+            situacao_posthoc.append(POSTHOC_NAO_EXECUTADO)
+        else:
+            situacao_posthoc.append(POSTHOC_OMITIDO if posthoc is None else POSTHOC_REALIZADO)
+    
+    tabelas = {
+        'Resumo_Geral': pd.DataFrame({
+            'Variavel': variaveis,
+            'Total_Variaveis': len(variaveis),
+            'PostHoc': situacao_posthoc
+        })
+    }
+    for nome, partes in [('Normalidade', todos_normalidade), ('Outliers', todos_outliers), ('ANOVA', todos_anova),
+                         ('Normalidade_Residuos', todos_residuos), ('QQ_Residuos', todos_qq),
+                         ('Esfericidade', todos_esfericidade), ('PostHoc', todos_posthoc)]:
+        if partes:
+            tabelas[nome] = pd.concat(partes, ignore_index=True)
+    return tabelas
+
+def variaveis_com_erro(tabelas):
+    """
+    Variáveis em que algum teste não pôde ser feito (linhas com a coluna 'Erro' preenchida)
+    """
+    return sorted({variavel for tabela in tabelas.values() if 'Erro' in tabela.columns
+                   for variavel in tabela.loc[tabela['Erro'].notna(), 'Variavel']})
+
+def analisar_todas_variaveis(df, id_column='id', etapas=None, padroes_variaveis=None, n_processos=1, cache=None,
+                             posthoc_apenas_significativas=True):
+    """
+    Executa a bateria de testes em todas as variáveis de um DataFrame, sem ler nem gravar arquivos
+    
+    Args:
+        df (pd.DataFrame): Dados no formato largo (ex.: analises.calcular_metricas_dataset)
+        id_column (str): Coluna de ID dos participantes
+        etapas (list ou str): Etapas a executar (ver ETAPAS); 'boxplot' é ignorada (nenhum gráfico é desenhado)
+        padroes_variaveis (list ou str): Padrões no estilo do shell das variáveis a analisar; None = todas
+        n_processos (int): Número de processos para analisar as variáveis em paralelo
+        cache (CacheResultados): Cache dos testes (None = sem cache)
+        posthoc_apenas_significativas (bool): Ver analise_completa_todas_variaveis
+    
+    Returns:
+        dict: Tabelas do relatório, como em montar_tabelas
+    """
+    etapas = planejar_etapas(etapas)
+    if cache is None:
+        cache = CacheResultados(ativo=False)
+    
+    indice = IndiceVariaveis(df.columns)
+    variaveis = identificar_variaveis_unicas(df, indice)
+    if padroes_variaveis:
+        variaveis = selecionar_variaveis(variaveis, padroes_variaveis)
+        if not variaveis:
+            raise ValueError(f"Nenhuma variável corresponde a: {padroes_variaveis}")
+    
+    resultados = executar_bateria(df, variaveis, id_column, n_processos, cache, etapas=etapas,
+                                  posthoc_apenas_significativas=posthoc_apenas_significativas, indice=indice)
+    return montar_tabelas(variaveis, dict(zip(variaveis, resultados)))
+
+def analise_completa_todas_variaveis(csv_path, output_path=None, criar_graficos=True, n_processos=1,
+                                     usar_cache=True, dpi_graficos=300, formato_graficos='png',
+                                     variaveis_por_pagina=1, etapas=None, padroes_variaveis=None,
+                                     posthoc_apenas_significativas=True, usar_checkpoint=True,
+                                     formato_saida='xlsx', base_resultados=True):
     """
     Realiza análise completa para todas as variáveis dos 3 momentos
     
@@ -601,14 +509,40 @@ def analise_completa_todas_variaveis(csv_path, output_path=None, criar_graficos=
         csv_path (str): Caminho para o arquivo CSV
         output_path (str): Caminho para salvar resultados Excel
         criar_graficos (bool): Se deve criar boxplots
+        n_processos (int): Número de processos para analisar as variáveis em paralelo
+        usar_cache (bool): Se deve reaproveitar resultados (e boxplots) de variáveis cujos dados não mudaram
+        dpi_graficos (int): Resolução dos boxplots
+        formato_graficos (str): Formato dos boxplots ('png', 'svg' ou 'pdf')
+        variaveis_por_pagina (int): Número de variáveis por arquivo de boxplot
+        etapas (list ou str): Etapas a executar (ver ETAPAS); None = todas
+        padroes_variaveis (list ou str): Padrões no estilo do shell das variáveis a analisar
+            (ex.: 'accuracy_*'); None = todas
+        posthoc_apenas_significativas (bool): Se o post-hoc deve ser omitido para variáveis
+            cuja ANOVA não foi significativa (quando a etapa 'anova' também é executada)
+        usar_checkpoint (bool): Se deve gravar cada variável concluída em
+            <output_path>.checkpoint.sqlite e retomar uma execução interrompida
+        formato_saida (str): 'xlsx' (uma pasta de trabalho) ou 'csv'/'parquet'
+            (uma pasta com um arquivo por planilha)
+        base_resultados (bool): Se deve gravar também as tabelas em <output_path>.sqlite
+            (ver base_resultados.BaseResultados)
+    
+    Returns:
+        str: Caminho do arquivo Excel ou da pasta com os arquivos gerados
     """
+    etapas = planejar_etapas(etapas)
+    criar_graficos = criar_graficos and 'boxplot' in etapas
+    verificar_formato_saida(formato_saida)
     
     print("=== ANÁLISE COMPLETA DE TODAS AS VARIÁVEIS ===\n")
     
     # 1. Leitura dos dados
     print("1. CARREGANDO DADOS...")
-    df = pd.read_csv(csv_path)
+    with etapa_perfil('leitura'):
+        df = pd.read_csv(csv_path)
     print(f"Dados carregados: {df.shape[0]} participantes, {df.shape[1]} colunas")
+    contar('arquivos_lidos')
+    contar('linhas_lidas', len(df))
+    contar('participantes', len(df))
     
     # Identificar coluna de ID
     id_column = 'id'
@@ -623,7 +557,13 @@ def analise_completa_todas_variaveis(csv_path, output_path=None, criar_graficos=
     
     # 2. Identificar variáveis únicas
     print("\n2. IDENTIFICANDO VARIÁVEIS...")
-    variaveis_unicas = identificar_variaveis_unicas(df)
+    # Índice das variáveis T0/T1/T2, montado uma vez e consultado por todas as etapas
+    indice = IndiceVariaveis(df.columns)
+    variaveis_unicas = identificar_variaveis_unicas(df, indice)
+    if padroes_variaveis:
+        variaveis_unicas = selecionar_variaveis(variaveis_unicas, padroes_variaveis)
+        if not variaveis_unicas:
+            raise ValueError(f"Nenhuma variável corresponde a: {padroes_variaveis}")
     print(f"Encontradas {len(variaveis_unicas)} variáveis únicas com dados para T0, T1 e T2:")
     for i, var in enumerate(variaveis_unicas, 1):
         print(f"  {i:2d}. {var}")
@@ -633,125 +573,104 @@ def analise_completa_todas_variaveis(csv_path, output_path=None, criar_graficos=
         output_path = 'analise_completa_todas_variaveis.xlsx'
     
     # Criar pasta para gráficos
+    output_folder = None
     if criar_graficos:
         output_folder = 'graficos_todas_variaveis'
         Path(output_folder).mkdir(exist_ok=True)
         print(f"\nGr\u00e1ficos ser\u00e3o salvos em: {output_folder}/\n")
+        # Boxplots de todas as variáveis, desenhados antes dos testes (em paralelo se houver processos)
+        arquivos_boxplot = renderizar_boxplots(paineis_boxplot(df, variaveis_unicas, indice), output_folder,
+                                               dpi_graficos, formato_graficos, variaveis_por_pagina, n_processos,
+                                               usar_cache)
     
     # 3. ANÁLISE DE CADA VARIÁVEL
     print("3. ANALISANDO CADA VARIÁVEL")
+    print(f"Etapas: {', '.join(etapas)}")
     print("=" * 60)
     
-    # Listas para armazenar resultados de todas as variáveis
-    todos_normalidade = []
-    todos_outliers = []
-    todos_esfericidade = []
-    todos_posthoc = []
-    todos_anova = []
-    
-    for i, variavel_base in enumerate(variaveis_unicas, 1):
-        print(f"\n{i:2d}/{len(variaveis_unicas)} - Analisando: {variavel_base}")
+    cache = CacheResultados(ativo=usar_cache)
+    
+    # Checkpoint das variáveis concluídas: uma execução interrompida é retomada de onde parou
+    checkpoint = None
+    concluidas = set()
+    if usar_checkpoint:
+        assinatura = assinatura_execucao(hash_dados(df), {
+            'versao_cache': VERSAO_CACHE,
+            'versao_codigo': versao_codigo(),
+            'id_column': id_column,
+            'etapas': etapas,
+            'posthoc_apenas_significativas': posthoc_apenas_significativas
+        })
+        checkpoint = CheckpointAnalise(Path(output_path).with_suffix('.checkpoint.sqlite'), assinatura)
+        concluidas = checkpoint.variaveis_concluidas() & set(variaveis_unicas)
+        if concluidas:
+            print(f"Checkpoint encontrado: {len(concluidas)} de {len(variaveis_unicas)} variáveis já concluídas; "
+                  f"retomando a execução ({checkpoint.caminho})")
+    pendentes = [v for v in variaveis_unicas if v not in concluidas]
+    posicoes = {v: i for i, v in enumerate(variaveis_unicas, 1)}
+    
+    if n_processos > 1 and len(pendentes) > 1:
+        print(f"Distribuindo variáveis entre {n_processos} processos...")
+    
+    # Resultados chegam na ordem das variáveis, independentemente do número de processos
+    resultados_por_variavel = {}
+    resultados = executar_bateria(df, pendentes, id_column, n_processos, cache,
+                                  etapas=etapas, posthoc_apenas_significativas=posthoc_apenas_significativas,
+                                  indice=indice)
+    for variavel_base, resultado in zip(pendentes, resultados):
+        print(f"\n{posicoes[variavel_base]:2d}/{len(variaveis_unicas)} - Analisando: {variavel_base}")
         print("-" * 50)
-        
-        # 3.1 Teste de Normalidade
-        print("   Testando normalidade...")
-        normalidade = testar_normalidade_variavel(df, variavel_base)
-        if not normalidade.empty:
-            todos_normalidade.append(normalidade)
-            for _, row in normalidade.iterrows():
-                print(f"     {row['Tempo']}: p = {row['Shapiro_p']:.4f} ({row['Normal']})")
-        else:
-            print("     AVISO: Não foi possível testar normalidade")
-        
-        # 3.2 Detecção de Outliers
-        print("   Detectando outliers...")
-        outliers = detectar_outliers_variavel(df, variavel_base)
-        if not outliers.empty:
-            todos_outliers.append(outliers)
-            for _, row in outliers.iterrows():
-                print(f"     {row['Tempo']}: {row['outliers_IQR']} outliers ({row['percent_outliers_IQR']:.1f}%)")
+        if checkpoint is not None:
+            with etapa_perfil('checkpoint'):
+                checkpoint.salvar(variavel_base, resultado)
         else:
-            print("     AVISO: Não foi possível detectar outliers")
-        
-        # 3.3 Criar Boxplot
+            resultados_por_variavel[variavel_base] = resultado
         if criar_graficos:
-            print("   Criando boxplot...")
-            filename = criar_boxplot_variavel(df, variavel_base, output_folder)
-            if filename:
-                print(f"     Boxplot salvo: {filename}")
-            else:
-                print("     AVISO: Não foi possível criar boxplot")
-        
-        # 3.4 ANOVA de Medidas Repetidas
-        print("   Realizando ANOVA de medidas repetidas...")
-        anova_result = anova_variavel(df, variavel_base, id_column)
-        if 'Erro' not in anova_result:
-            todos_anova.append(pd.DataFrame([anova_result]))
-            print(f"     ANOVA: F = {anova_result['F']:.3f}, p = {anova_result['p_value']:.4f}")
-            print(f"     Tamanho de efeito (η²) = {anova_result['partial_eta_squared']:.4f} ({anova_result['tamanho_efeito']})")
-            print(f"     Resultado: {anova_result['significativo']}")
-        else:
-            print(f"     ERRO: {anova_result['Erro']}")
-        
-        # 3.5 Teste de Esfericidade
-        print("   Testando esfericidade...")
-        esfericidade = testar_esfericidade_variavel(df, variavel_base, id_column)
-        if 'Erro' not in esfericidade:
-            todos_esfericidade.append(pd.DataFrame([esfericidade]))
-            print(f"     Esfericidade: p = {esfericidade['Mauchly_p']:.4f} ({esfericidade['Esferico']})")
-        else:
-            print(f"     ERRO: {esfericidade['Erro']}")
-        
-        # 3.6 Comparações Post-hoc
-        print("   Realizando comparações post-hoc...")
-        posthoc = comparacoes_post_hoc_variavel(df, variavel_base, id_column)
-        if not posthoc.empty and 'Comparacao' in posthoc.columns:
-            todos_posthoc.append(posthoc)
-            print("     Comparações post-hoc:")
-            for _, row in posthoc.iterrows():
-                print(f"       {row['Comparacao']}: p = {row['P_corrigido']:.3f} ({row['Significativo']})")
-        else:
-            print("     AVISO: Não foi possível realizar comparações post-hoc")
+            resultado = dict(resultado, boxplot=arquivos_boxplot[variavel_base])
+        imprimir_resultados_variavel(resultado)
+    
+    # As planilhas são montadas a partir do checkpoint (variáveis retomadas + recém-analisadas)
+    if checkpoint is not None:
+        with etapa_perfil('checkpoint'):
+            resultados_por_variavel = checkpoint.carregar(variaveis_unicas)
     
     # 4. SALVAR RESULTADOS
     print("\n4. SALVANDO RESULTADOS...")
     
-    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-        # Resumo geral
-        resumo_geral = pd.DataFrame({
-            'Variavel': variaveis_unicas,
-            'Total_Variaveis': len(variaveis_unicas)
-        })
-        resumo_geral.to_excel(writer, sheet_name='Resumo_Geral', index=False)
-        
-        # Detalhes de normalidade
-        if todos_normalidade:
-            normalidade_completa = pd.concat(todos_normalidade, ignore_index=True)
-            normalidade_completa.to_excel(writer, sheet_name='Normalidade', index=False)
-        
-        # Detalhes de outliers
-        if todos_outliers:
-            outliers_completo = pd.concat(todos_outliers, ignore_index=True)
-            outliers_completo.to_excel(writer, sheet_name='Outliers', index=False)
-        
-        # Detalhes de ANOVA
-        if todos_anova:
-            anova_completa = pd.concat(todos_anova, ignore_index=True)
-            anova_completa.to_excel(writer, sheet_name='ANOVA', index=False)
-        
-        # Detalhes de esfericidade
-        if todos_esfericidade:
-            esfericidade_completa = pd.concat(todos_esfericidade, ignore_index=True)
-            esfericidade_completa.to_excel(writer, sheet_name='Esfericidade', index=False)
-        
-        # Comparações post-hoc
-        if todos_posthoc:
-            posthoc_completo = pd.concat(todos_posthoc, ignore_index=True)
-            posthoc_completo.to_excel(writer, sheet_name='PostHoc', index=False)
+    with etapa_perfil('montagem_tabelas'):
+        tabelas = montar_tabelas(variaveis_unicas, resultados_por_variavel)
+    contar('variaveis', len(variaveis_unicas))
+    contar('falhas', len(variaveis_com_erro(tabelas)))
+    
+    with EscritorRelatorio(output_path, formato_saida) as escritor:
+        for nome, tabela in tabelas.items():
+            escritor.adicionar_planilha(nome, tabela)
+    output_path = str(escritor.caminho)
+    
+    # As mesmas tabelas em uma base SQLite indexada, consultada por resumo_resultados.py
+    if base_resultados:
+        with etapa_perfil('base_resultados'):
+            caminho_base = salvar_base_resultados(caminho_base_resultados(output_path), tabelas,
+                                                  {'entrada': csv_path, 'relatorio': output_path,
+                                                   'etapas': ','.join(etapas),
+                                                   'posthoc_apenas_significativas':
+                                                       'Sim' if posthoc_apenas_significativas else 'Não'})
+        print(f"Base de resultados salva em: {caminho_base}")
+    
+    # Planilhas gravadas: o checkpoint desta execução não é mais necessário
+    if checkpoint is not None:
+        checkpoint.finalizar()
     
     print(f"\nAnálise completa salva em: {output_path}")
     if criar_graficos:
         print(f"Gráficos salvos em: {output_folder}/")
+    if usar_cache:
+        print(formatar_estatisticas_cache(cache.estatisticas()))
+        removidos = cache.limpar()
+        if removidos:
+            print(f"Cache de resultados: {removidos} arquivos antigos removidos de {cache.pasta}")
+    registrar_cache(cache)
+    gravar_relatorio_perfil(output_path)
     
     return output_path
 
@@ -759,6 +678,42 @@ def main():
     """
     Função principal
     """
+    parser = argparse.ArgumentParser(description="Análise completa de todas as variáveis Sternberg")
+    parser.add_argument('--processos', type=int, default=1,
+                        help="Número de processos para analisar variáveis em paralelo "
+                             "(0 = todos os núcleos; padrão: 1)")
+    parser.add_argument('--sem-cache', action='store_true',
+                        help="Recalcula todos os testes e redesenha todos os boxplots, ignorando os caches")
+    parser.add_argument('--sem-graficos', action='store_true',
+                        help="Não cria os boxplots")
+    parser.add_argument('--dpi', type=int, default=300,
+                        help="Resolução dos boxplots (padrão: 300)")
+    parser.add_argument('--formato-graficos', choices=FORMATOS_GRAFICOS, default='png',
+                        help="Formato dos boxplots; svg e pdf são vetoriais (padrão: png)")
+    parser.add_argument('--variaveis-por-pagina', type=int, default=1,
+                        help="Número de variáveis por arquivo de boxplot (padrão: 1)")
+    parser.add_argument('--etapas', '--stages', default=None,
+                        help=f"Etapas a executar, separadas por vírgula (padrão: todas: {','.join(ETAPAS)})")
+    parser.add_argument('--variaveis', '--variables', default=None,
+                        help="Padrões das variáveis a analisar, separados por vírgula (ex.: 'accuracy_*')")
+    parser.add_argument('--posthoc-todas', action='store_true',
+                        help="Realiza o post-hoc mesmo para variáveis cuja ANOVA não foi significativa. Por padrão, "
+                             "o post-hoc dessas variáveis é omitido: a planilha PostHoc (e a base usada por "
+                             "resumo_resultados.py e comparar_execucoes.py) só tem as comparações das ANOVAs "
+                             "significativas, e a coluna PostHoc de Resumo_Geral indica as variáveis omitidas")
+    parser.add_argument('--formato-saida', choices=FORMATOS_SAIDA, default='xlsx',
+                        help="Formato dos resultados: xlsx, ou csv/parquet em uma pasta com um arquivo "
+                             "por planilha (padrão: xlsx)")
+    parser.add_argument('--sem-checkpoint', action='store_true',
+                        help="Não grava checkpoints nem retoma uma execução interrompida")
+    parser.add_argument('--sem-base-resultados', action='store_true',
+                        help="Não grava a base SQLite de resultados usada por resumo_resultados.py")
+    parser.add_argument('--perfil', '--profile', nargs='?', const='tempo', default=None, help=AJUDA_PERFIL)
+    args = parser.parse_args()
+    if args.perfil:
+        ativar_perfil(args.perfil)
+    n_processos = args.processos if args.processos > 0 else (os.cpu_count() or 1)
+    
     csv_path = 'analises.csv'
     
     if not Path(csv_path).exists():
@@ -771,11 +726,20 @@ def main():
     print("- Detecção de outliers (IQR e Z-score)")
     print("- Boxplot para visualização")
     print("- ANOVA de medidas repetidas")
+    print("- Normalidade dos resíduos da ANOVA (Shapiro-Wilk e dados Q-Q)")
     print("- Teste de esfericidade (Mauchly)")
     print("- Comparações post-hoc (Bonferroni)")
     print()
     
-    analise_completa_todas_variaveis(csv_path, criar_graficos=True)
+    analise_completa_todas_variaveis(csv_path, criar_graficos=not args.sem_graficos, n_processos=n_processos,
+                                     usar_cache=not args.sem_cache, dpi_graficos=args.dpi,
+                                     formato_graficos=args.formato_graficos,
+                                     variaveis_por_pagina=args.variaveis_por_pagina,
+                                     etapas=args.etapas, padroes_variaveis=args.variaveis,
+                                     posthoc_apenas_significativas=not args.posthoc_todas,
+                                     usar_checkpoint=not args.sem_checkpoint,
+                                     base_resultados=not args.sem_base_resultados,
+                                     formato_saida=args.formato_saida)
 
 if __name__ == "__main__":
     main()
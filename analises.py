@@ -2,6 +2,149 @@ import pandas as pd
 import os
 import glob
 import numpy as np
+from perfil_execucao import etapa, secoes, gravar_relatorio_perfil
+from telemetria import contar
+from dados_longos import TEMPOS
+from dataset_sternberg import SternbergDataset, LENGTH_AUSENTE, CORR_OUTRO
+
+# Tamanhos do conjunto com entradas fixas (NaN quando ausentes) nas métricas por length
+TAMANHOS_FIXOS = [2, 4, 6]
+
+def _metricas_sessao(n_trials, n_rt, soma_rt, niveis, tempo):
+    """
+    Métricas de uma sessão a partir das contagens por length x corr x targetfoil
+
+    As chaves seguem a ordem das colunas de analises.csv (RT total, RT por
+    length, RT de acertos e erros, acurácias, slope, RT de acertos e erros
+    por length e acurácia de alvos e distratores), e cada métrica descarta
+    os trials sem os campos que usa: a última posição de cada eixo reúne os
+    trials sem aquele campo (length ausente, corr ausente, targetfoil
+    ausente ou diferente de T/F). O eixo de corr é
+    (0, 1, outro valor, ausente): trials com outro valor entram nos
+    denominadores das acurácias, mas não nas médias de respostas incorretas.
+
+    Args:
+        n_trials (np.ndarray): Trials por (length, corr, targetfoil)
+        n_rt (np.ndarray): Trials com rt válido, com os mesmos eixos
+        soma_rt (np.ndarray): Soma dos rt válidos, com os mesmos eixos
+        niveis (np.ndarray): Valor de length de cada posição do primeiro eixo (sem a de ausentes)
+        tempo (str): 'T0', 'T1' ou 'T2'
+
+    Returns:
+        dict: Métricas da sessão
+    """
+    metricas = {}
+    n_niveis = len(niveis)
+    total_rt = n_rt.sum()
+    metricas[f'mean_rt_total_{tempo}'] = soma_rt.sum() / total_rt if total_rt else np.nan
+
+    # Trials com rt e length
+    n_rt_length = n_rt[:n_niveis].sum(axis=(1, 2))
+    soma_rt_length = soma_rt[:n_niveis].sum(axis=(1, 2))
+    for i in np.flatnonzero(n_rt_length):
+        metricas[f'mean_rt_by_length_{int(niveis[i])}_{tempo}'] = soma_rt_length[i] / n_rt_length[i]
+
+    # Trials com rt e corr (0 = incorreta, 1 = correta, 2 = outro valor)
+    n_rt_corr = n_rt[:, :3].sum(axis=(0, 2))
+    soma_rt_corr = soma_rt[:, :3].sum(axis=(0, 2))
+    if n_rt_corr[1]:
+        metricas[f'mean_rt_correct_{tempo}'] = soma_rt_corr[1] / n_rt_corr[1]
+    if n_rt_corr[0]:
+        metricas[f'mean_rt_incorrect_{tempo}'] = soma_rt_corr[0] / n_rt_corr[0]
+    if n_rt_corr.sum():
+        metricas[f'accuracy_total_{tempo}'] = n_rt_corr[1] / n_rt_corr.sum()
+
+    # Trials com length e corr (com ou sem rt)
+    n_length_corr = n_trials[:n_niveis, :3].sum(axis=2)
+    n_length = n_length_corr.sum(axis=1)
+    for i in np.flatnonzero(n_length):
+        metricas[f'accuracy_by_length_{int(niveis[i])}_{tempo}'] = n_length_corr[i, 1] / n_length[i]
+
+    # Slope e RT por length: trials com rt, length e corr, apenas as respostas corretas (e depois as incorretas)
+    n_rt_length_corr = n_rt[:n_niveis, :2].sum(axis=2)
+    soma_rt_length_corr = soma_rt[:n_niveis, :2].sum(axis=2)
+    presentes = n_rt_length_corr[:, 1] > 0
+    if presentes.sum() > 1:
+        medias = soma_rt_length_corr[presentes, 1] / n_rt_length_corr[presentes, 1]
+        slope, intercept = np.polyfit(niveis[presentes].astype(float), medias, 1)
+        metricas[f'slope_rt_by_length_{tempo}'] = slope
+    else:
+        metricas[f'slope_rt_by_length_{tempo}'] = np.nan
+
+    for corr, nome in [(1, 'correct'), (0, 'incorrect')]:
+        if n_rt_length_corr[:, corr].sum():
+            for i in np.flatnonzero(n_rt_length_corr[:, corr]):
+                metricas[f'mean_rt_{nome}_by_length_{int(niveis[i])}_{tempo}'] = (
+                    soma_rt_length_corr[i, corr] / n_rt_length_corr[i, corr])
+        else:
+            for length_val in TAMANHOS_FIXOS:
+                metricas[f'mean_rt_{nome}_by_length_{length_val}_{tempo}'] = np.nan
+
+    # Acurácia de alvos (targetfoil = 1) e distratores (0): trials com targetfoil e corr
+    n_corr_alvo = n_trials[:, :3, :2].sum(axis=0)
+    for alvo, nome in [(1, 'target'), (0, 'foil')]:
+        n_tipo = n_corr_alvo[:, alvo].sum()
+        metricas[f'accuracy_{nome}_{tempo}'] = n_corr_alvo[1, alvo] / n_tipo if n_tipo else np.nan
+    for length_val in TAMANHOS_FIXOS:
+        posicao = np.flatnonzero(niveis == length_val)
+        for alvo, nome in [(1, 'target'), (0, 'foil')]:
+            n_tipo = n_trials[posicao[0], :3, alvo].sum() if len(posicao) else 0
+            metricas[f'accuracy_{nome}_by_length_{length_val}_{tempo}'] = (
+                n_trials[posicao[0], 1, alvo] / n_tipo if n_tipo else np.nan)
+
+    return metricas
+
+def calcular_metricas_dataset(dataset):
+    """
+    Calcula as métricas de todos os participantes a partir de um SternbergDataset
+
+    Conta os trials de todos os participantes e sessões de uma só vez
+    (np.bincount sobre os arrays do dataset) em vez de filtrar um DataFrame
+    por métrica.
+
+    Args:
+        dataset (SternbergDataset): Trials dos participantes (ver dataset_sternberg)
+
+    Returns:
+        pd.DataFrame: Uma linha por participante (o conteúdo de analises.csv), ou None se nenhum
+        participante pôde ser processado
+    """
+    cronometro = secoes('familias')
+    # Eixos de cada grupo participante x sessão: length (última posição = ausente),
+    # corr (0, 1, CORR_OUTRO, ausente) e targetfoil (F, T, ausente)
+    niveis, posicao_length = np.unique(dataset.length, return_inverse=True)
+    if len(niveis) and niveis[0] == LENGTH_AUSENTE:
+        niveis = niveis[1:]
+        posicao_length = np.where(posicao_length == 0, len(niveis), posicao_length - 1)
+    estado_corr = np.where(dataset.corr_valido, dataset.corr, CORR_OUTRO + 1)
+    estado_alvo = np.where(dataset.targetfoil_valido, dataset.targetfoil, 2)
+    forma = (len(dataset), len(TEMPOS), len(niveis) + 1, CORR_OUTRO + 2, 3)
+    chave = ((dataset.grupos() * (len(niveis) + 1) + posicao_length) * forma[3] + estado_corr) * 3 + estado_alvo
+    validos = ~np.isnan(dataset.rt)
+    tamanho = int(np.prod(forma))
+    n_trials = np.bincount(chave, minlength=tamanho).reshape(forma)
+    n_rt = np.bincount(chave[validos], minlength=tamanho).reshape(forma)
+    soma_rt = np.bincount(chave[validos], weights=dataset.rt[validos].astype(np.float64),
+                          minlength=tamanho).reshape(forma)
+    cronometro.marcar('contagem')
+
+    results = []
+    for i, participant_id in enumerate(dataset.participantes):
+        if not dataset.sessoes_presentes[i].all():
+            ausentes = [tempo for tempo, presente in zip(TEMPOS, dataset.sessoes_presentes[i]) if not presente]
+            print(f"Aviso: Sessões ausentes para o participante {participant_id}: {ausentes}")
+            contar('falhas')
+            continue
+        result_dict = {'id': participant_id}
+        for s, tempo in enumerate(TEMPOS):
+            result_dict.update(_metricas_sessao(n_trials[i, s], n_rt[i, s], soma_rt[i, s], niveis, tempo))
+        results.append(result_dict)
+        contar('participantes')
+    cronometro.marcar('montagem')
+
+    if not results:
+        return None
+    return pd.DataFrame(results)
 
 def process_rt_means():
     """
@@ -17,11 +160,12 @@ def process_rt_means():
     # Caminho para a pasta com os dados
     data_folder = "dados_sternberg_combinados"
     
-    # Lista para armazenar os resultados
-    results = []
+    # Dados combinados de cada participante
+    dados_combinados = {}
     
     # Encontrar todos os arquivos CSV na pasta
-    csv_files = glob.glob(os.path.join(data_folder, "*.csv"))
+    with etapa('varredura'):
+        csv_files = glob.glob(os.path.join(data_folder, "*.csv"))
     
     print(f"Encontrados {len(csv_files)} arquivos CSV para processar...")
     
@@ -31,495 +175,34 @@ def process_rt_means():
             file_name = os.path.basename(file_path)
             participant_id = file_name.replace("_sternberg_combined.csv", "")
             
-            print(f"Processando arquivo: {file_name}")
-            
             # Ler o arquivo CSV, pulando a primeira linha (cabeçalho)
-            df = pd.read_csv(file_path, skiprows=1)
-            
-            # Verificar se as colunas necessárias existem
-            required_columns = ['T0_rt', 'T1_rt', 'T2_rt']
-            length_columns = ['T0_length', 'T1_length', 'T2_length']
-            corr_columns = ['T0_corr', 'T1_corr', 'T2_corr']
-            targetfoil_columns = ['T0_targetfoil', 'T1_targetfoil', 'T2_targetfoil']
-            missing_columns = [col for col in required_columns + length_columns + corr_columns + targetfoil_columns if col not in df.columns]
-            
-            if missing_columns:
-                print(f"Aviso: Colunas ausentes no arquivo {file_name}: {missing_columns}")
-                continue
-            
-            # Converter colunas rt para numérico, tratando valores inválidos
-            for col in required_columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # Converter colunas length para numérico
-            for col in length_columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # Converter colunas corr para numérico
-            for col in corr_columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # Remover valores NaN
-            valid_data = {}
-            length_data = {}
-            correct_data = {}
-            incorrect_data = {}
-            accuracy_data = {}
-            accuracy_by_length_data = {}
-            
-            for i, col in enumerate(required_columns):
-                # Filtrar valores válidos (remover apenas NaN)
-                valid_values = df[col].dropna()
-                
-                if len(valid_values) == 0:
-                    print(f"  Aviso: Nenhum valor válido encontrado para {col}")
-                    valid_data[col] = np.nan
-                else:
-                    valid_data[col] = valid_values.mean()
-                    print(f"  - {col}: {valid_data[col]:.3f} (n={len(valid_values)} valores válidos)")
-                
-                # Calcular médias por length para este teste
-                length_col = length_columns[i]
-                test_prefix = col.replace('_rt', '')  # T0, T1, T2
-                
-                # Criar DataFrame temporário com rt e length válidos
-                temp_df = df[[col, length_col]].copy()
-                temp_df = temp_df.dropna()
-                
-                if len(temp_df) > 0:
-                    # Agrupar por length e calcular média
-                    length_means = temp_df.groupby(length_col)[col].mean()
-                    
-                    # Adicionar ao dicionário de resultados por length
-                    for length_val, mean_rt in length_means.items():
-                        key = f"mean_rt_by_length_{int(length_val)}_{test_prefix}"
-                        length_data[key] = mean_rt
-                        print(f"    - {key}: {mean_rt:.3f}")
-                else:
-                    print(f"    - Aviso: Nenhum valor válido encontrado para {test_prefix} por length")
-                
-                # Calcular médias para respostas corretas (corr = 1)
-                corr_col = corr_columns[i]
-                
-                # Criar DataFrame temporário com rt e corr válidos
-                temp_corr_df = df[[col, corr_col]].copy()
-                temp_corr_df = temp_corr_df.dropna()
-                
-                # Filtrar apenas respostas corretas (corr = 1)
-                correct_responses = temp_corr_df[temp_corr_df[corr_col] == 1]
-                
-                if len(correct_responses) > 0:
-                    correct_mean = correct_responses[col].mean()
-                    key = f"mean_rt_correct_{test_prefix}"
-                    correct_data[key] = correct_mean
-                    print(f"    - {key}: {correct_mean:.3f} (n={len(correct_responses)} respostas corretas)")
-                else:
-                    print(f"    - Aviso: Nenhuma resposta correta encontrada para {test_prefix}")
-                
-                # Calcular médias para respostas incorretas (corr = 0)
-                incorrect_responses = temp_corr_df[temp_corr_df[corr_col] == 0]
-                
-                if len(incorrect_responses) > 0:
-                    incorrect_mean = incorrect_responses[col].mean()
-                    key = f"mean_rt_incorrect_{test_prefix}"
-                    incorrect_data[key] = incorrect_mean
-                    print(f"    - {key}: {incorrect_mean:.3f} (n={len(incorrect_responses)} respostas incorretas)")
-                else:
-                    print(f"    - Aviso: Nenhuma resposta incorreta encontrada para {test_prefix}")
-                
-                # Calcular accuracy (proporção de trials com corr = 1)
-                if len(temp_corr_df) > 0:
-                    accuracy = len(correct_responses) / len(temp_corr_df)
-                    key = f"accuracy_total_{test_prefix}"
-                    accuracy_data[key] = accuracy
-                    print(f"    - {key}: {accuracy:.3f} ({len(correct_responses)}/{len(temp_corr_df)} respostas corretas)")
-                else:
-                    print(f"    - Aviso: Nenhum valor válido encontrado para accuracy de {test_prefix}")
-                
-                # Calcular accuracy por length para este teste
-                temp_length_corr_df = df[[length_col, corr_col]].copy()
-                temp_length_corr_df = temp_length_corr_df.dropna()
-                
-                if len(temp_length_corr_df) > 0:
-                    # Agrupar por length e calcular accuracy (proporção de corr == 1)
-                    length_accuracy = temp_length_corr_df.groupby(length_col)[corr_col].apply(
-                        lambda x: (x == 1).sum() / len(x)
-                    )
-                    
-                    # Adicionar ao dicionário de resultados por length
-                    for length_val, accuracy_val in length_accuracy.items():
-                        key = f"accuracy_by_length_{int(length_val)}_{test_prefix}"
-                        accuracy_by_length_data[key] = accuracy_val
-                        print(f"    - {key}: {accuracy_val:.3f}")
-                else:
-                    print(f"    - Aviso: Nenhum valor válido encontrado para accuracy por length de {test_prefix}")
-            
-            # Calcular slope do RT por length para T0, T1 e T2
-            slope_data = {}
-            for test_prefix in ['T0', 'T1', 'T2']:
-                rt_col = f'{test_prefix}_rt'
-                length_col = f'{test_prefix}_length'
-                corr_col = f'{test_prefix}_corr'
-                
-                if rt_col in df.columns and length_col in df.columns and corr_col in df.columns:
-                    # Criar DataFrame temporário com rt, length e corr válidos
-                    temp_slope_df = df[[rt_col, length_col, corr_col]].copy()
-                    temp_slope_df = temp_slope_df.dropna()
-                    
-                    if len(temp_slope_df) > 0:
-                        # Filtrar apenas respostas corretas (corr = 1)
-                        correct_trials = temp_slope_df[temp_slope_df[corr_col] == 1]
-                        
-                        if len(correct_trials) > 0:
-                            # Agrupar por length e calcular RT médio
-                            rt_by_length = correct_trials.groupby(length_col)[rt_col].mean().reset_index()
-                            
-                            if len(rt_by_length) > 1:  # Precisa de pelo menos 2 pontos para regressão
-                                # Calcular regressão linear: RT_médio = β₀ + β₁ · length
-                                # Usando numpy para calcular o slope
-                                x = rt_by_length[length_col].values
-                                y = rt_by_length[rt_col].values
-                                
-                                # Calcular slope usando numpy.polyfit (grau 1 = regressão linear)
-                                slope, intercept = np.polyfit(x, y, 1)
-                                
-                                slope_data[f'slope_rt_by_length_{test_prefix}'] = slope
-                                print(f"    - slope_rt_by_length_{test_prefix}: {slope:.3f} ms/item (n={len(rt_by_length)} pontos)")
-                            else:
-                                print(f"    - Aviso: Insuficientes pontos para calcular slope de {test_prefix} (apenas {len(rt_by_length)} ponto)")
-                                slope_data[f'slope_rt_by_length_{test_prefix}'] = np.nan
-                        else:
-                            print(f"    - Aviso: Nenhuma resposta correta encontrada para calcular slope de {test_prefix}")
-                            slope_data[f'slope_rt_by_length_{test_prefix}'] = np.nan
-                    else:
-                        print(f"    - Aviso: Nenhum valor válido encontrado para calcular slope de {test_prefix}")
-                        slope_data[f'slope_rt_by_length_{test_prefix}'] = np.nan
-                else:
-                    print(f"    - Aviso: Colunas {rt_col}, {length_col} ou {corr_col} não encontradas")
-                    slope_data[f'slope_rt_by_length_{test_prefix}'] = np.nan
-            
-            # Calcular RT médio por acerto por length para T0, T1 e T2
-            rt_correct_by_length_data = {}
-            for test_prefix in ['T0', 'T1', 'T2']:
-                rt_col = f'{test_prefix}_rt'
-                length_col = f'{test_prefix}_length'
-                corr_col = f'{test_prefix}_corr'
-                
-                if rt_col in df.columns and length_col in df.columns and corr_col in df.columns:
-                    # Criar DataFrame temporário com rt, length e corr válidos
-                    temp_rt_correct_df = df[[rt_col, length_col, corr_col]].copy()
-                    temp_rt_correct_df = temp_rt_correct_df.dropna()
-                    
-                    if len(temp_rt_correct_df) > 0:
-                        # Filtrar apenas respostas corretas (corr = 1)
-                        correct_trials = temp_rt_correct_df[temp_rt_correct_df[corr_col] == 1]
-                        
-                        if len(correct_trials) > 0:
-                            # Agrupar por length e calcular RT médio para respostas corretas
-                            rt_correct_by_length = correct_trials.groupby(length_col)[rt_col].mean()
-                            
-                            # Adicionar ao dicionário de resultados por length
-                            for length_val, mean_rt in rt_correct_by_length.items():
-                                key = f"mean_rt_correct_by_length_{int(length_val)}_{test_prefix}"
-                                rt_correct_by_length_data[key] = mean_rt
-                                print(f"    - {key}: {mean_rt:.3f} ms")
-                        else:
-                            print(f"    - Aviso: Nenhuma resposta correta encontrada para calcular RT por length de {test_prefix}")
-                            # Adicionar valores NaN para todos os lengths
-                            for length_val in [2, 4, 6]:
-                                key = f"mean_rt_correct_by_length_{length_val}_{test_prefix}"
-                                rt_correct_by_length_data[key] = np.nan
-                    else:
-                        print(f"    - Aviso: Nenhum valor válido encontrado para calcular RT por length de {test_prefix}")
-                        # Adicionar valores NaN para todos os lengths
-                        for length_val in [2, 4, 6]:
-                            key = f"mean_rt_correct_by_length_{length_val}_{test_prefix}"
-                            rt_correct_by_length_data[key] = np.nan
-                else:
-                    print(f"    - Aviso: Colunas {rt_col}, {length_col} ou {corr_col} não encontradas")
-                    # Adicionar valores NaN para todos os lengths
-                    for length_val in [2, 4, 6]:
-                        key = f"mean_rt_correct_by_length_{length_val}_{test_prefix}"
-                        rt_correct_by_length_data[key] = np.nan
-            
-            # Calcular RT médio por erro por length para T0, T1 e T2
-            rt_incorrect_by_length_data = {}
-            for test_prefix in ['T0', 'T1', 'T2']:
-                rt_col = f'{test_prefix}_rt'
-                length_col = f'{test_prefix}_length'
-                corr_col = f'{test_prefix}_corr'
-                
-                if rt_col in df.columns and length_col in df.columns and corr_col in df.columns:
-                    # Criar DataFrame temporário com rt, length e corr válidos
-                    temp_rt_incorrect_df = df[[rt_col, length_col, corr_col]].copy()
-                    temp_rt_incorrect_df = temp_rt_incorrect_df.dropna()
-                    
-                    if len(temp_rt_incorrect_df) > 0:
-                        # Filtrar apenas respostas incorretas (corr = 0)
-                        incorrect_trials = temp_rt_incorrect_df[temp_rt_incorrect_df[corr_col] == 0]
-                        
-                        if len(incorrect_trials) > 0:
-                            # Agrupar por length e calcular RT médio para respostas incorretas
-                            rt_incorrect_by_length = incorrect_trials.groupby(length_col)[rt_col].mean()
-                            
-                            # Adicionar ao dicionário de resultados por length
-                            for length_val, mean_rt in rt_incorrect_by_length.items():
-                                key = f"mean_rt_incorrect_by_length_{int(length_val)}_{test_prefix}"
-                                rt_incorrect_by_length_data[key] = mean_rt
-                                print(f"    - {key}: {mean_rt:.3f} ms")
-                        else:
-                            print(f"    - Aviso: Nenhuma resposta incorreta encontrada para calcular RT por length de {test_prefix}")
-                            # Adicionar valores NaN para todos os lengths
-                            for length_val in [2, 4, 6]:
-                                key = f"mean_rt_incorrect_by_length_{length_val}_{test_prefix}"
-                                rt_incorrect_by_length_data[key] = np.nan
-                    else:
-                        print(f"    - Aviso: Nenhum valor válido encontrado para calcular RT por length de {test_prefix}")
-                        # Adicionar valores NaN para todos os lengths
-                        for length_val in [2, 4, 6]:
-                            key = f"mean_rt_incorrect_by_length_{length_val}_{test_prefix}"
-                            rt_incorrect_by_length_data[key] = np.nan
-                else:
-                    print(f"    - Aviso: Colunas {rt_col}, {length_col} ou {corr_col} não encontradas")
-                    # Adicionar valores NaN para todos os lengths
-                    for length_val in [2, 4, 6]:
-                        key = f"mean_rt_incorrect_by_length_{length_val}_{test_prefix}"
-                        rt_incorrect_by_length_data[key] = np.nan
-            
-            # Calcular acurácia para alvos (T) e foils (F) por length para T0, T1 e T2
-            targetfoil_accuracy_by_length_data = {}
-            for test_prefix in ['T0', 'T1', 'T2']:
-                length_col = f'{test_prefix}_length'
-                targetfoil_col = f'{test_prefix}_targetfoil'
-                corr_col = f'{test_prefix}_corr'
-                
-                if length_col in df.columns and targetfoil_col in df.columns and corr_col in df.columns:
-                    # Criar DataFrame temporário com length, targetfoil e corr válidos
-                    temp_targetfoil_length_df = df[[length_col, targetfoil_col, corr_col]].copy()
-                    temp_targetfoil_length_df = temp_targetfoil_length_df.dropna()
-                    
-                    if len(temp_targetfoil_length_df) > 0:
-                        # Agrupar por length e targetfoil e calcular proporções de corr == 1
-                        for length_val in [2, 4, 6]:
-                            # Filtrar por length específico
-                            length_trials = temp_targetfoil_length_df[temp_targetfoil_length_df[length_col] == length_val]
-                            
-                            if len(length_trials) > 0:
-                                # Filtrar por target (T) e foil (F)
-                                target_trials = length_trials[length_trials[targetfoil_col] == 'T']
-                                foil_trials = length_trials[length_trials[targetfoil_col] == 'F']
-                                
-                                # Calcular accuracy para target trials deste length
-                                if len(target_trials) > 0:
-                                    target_accuracy = (target_trials[corr_col] == 1).sum() / len(target_trials)
-                                    key = f"accuracy_target_by_length_{int(length_val)}_{test_prefix}"
-                                    targetfoil_accuracy_by_length_data[key] = target_accuracy
-                                    print(f"    - {key}: {target_accuracy:.3f} ({len(target_trials)} trials target)")
-                                else:
-                                    key = f"accuracy_target_by_length_{int(length_val)}_{test_prefix}"
-                                    targetfoil_accuracy_by_length_data[key] = np.nan
-                                    print(f"    - {key}: NaN (sem trials target)")
-                                
-                                # Calcular accuracy para foil trials deste length
-                                if len(foil_trials) > 0:
-                                    foil_accuracy = (foil_trials[corr_col] == 1).sum() / len(foil_trials)
-                                    key = f"accuracy_foil_by_length_{int(length_val)}_{test_prefix}"
-                                    targetfoil_accuracy_by_length_data[key] = foil_accuracy
-                                    print(f"    - {key}: {foil_accuracy:.3f} ({len(foil_trials)} trials foil)")
-                                else:
-                                    key = f"accuracy_foil_by_length_{int(length_val)}_{test_prefix}"
-                                    targetfoil_accuracy_by_length_data[key] = np.nan
-                                    print(f"    - {key}: NaN (sem trials foil)")
-                            else:
-                                # Adicionar valores NaN para este length se não houver trials
-                                key_target = f"accuracy_target_by_length_{int(length_val)}_{test_prefix}"
-                                key_foil = f"accuracy_foil_by_length_{int(length_val)}_{test_prefix}"
-                                targetfoil_accuracy_by_length_data[key_target] = np.nan
-                                targetfoil_accuracy_by_length_data[key_foil] = np.nan
-                                print(f"    - {key_target}: NaN (sem trials para length {length_val})")
-                                print(f"    - {key_foil}: NaN (sem trials para length {length_val})")
-                    else:
-                        print(f"    - Aviso: Nenhum valor válido encontrado para targetfoil accuracy por length de {test_prefix}")
-                        # Adicionar valores NaN para todos os lengths
-                        for length_val in [2, 4, 6]:
-                            key_target = f"accuracy_target_by_length_{int(length_val)}_{test_prefix}"
-                            key_foil = f"accuracy_foil_by_length_{int(length_val)}_{test_prefix}"
-                            targetfoil_accuracy_by_length_data[key_target] = np.nan
-                            targetfoil_accuracy_by_length_data[key_foil] = np.nan
-                else:
-                    print(f"    - Aviso: Colunas {length_col}, {targetfoil_col} ou {corr_col} não encontradas")
-                    # Adicionar valores NaN para todos os lengths
-                    for length_val in [2, 4, 6]:
-                        key_target = f"accuracy_target_by_length_{int(length_val)}_{test_prefix}"
-                        key_foil = f"accuracy_foil_by_length_{int(length_val)}_{test_prefix}"
-                        targetfoil_accuracy_by_length_data[key_target] = np.nan
-                        targetfoil_accuracy_by_length_data[key_foil] = np.nan
-            
-            # Calcular accuracy para target vs foil para T0, T1 e T2
-            targetfoil_accuracy_data = {}
-            for test_prefix in ['T0', 'T1', 'T2']:
-                targetfoil_col = f'{test_prefix}_targetfoil'
-                corr_col = f'{test_prefix}_corr'
-                
-                if targetfoil_col in df.columns and corr_col in df.columns:
-                    # Criar DataFrame temporário com targetfoil e corr válidos
-                    temp_targetfoil_df = df[[targetfoil_col, corr_col]].copy()
-                    temp_targetfoil_df = temp_targetfoil_df.dropna()
-                    
-                    if len(temp_targetfoil_df) > 0:
-                        # Filtrar por target (T) e foil (F)
-                        target_trials = temp_targetfoil_df[temp_targetfoil_df[targetfoil_col] == 'T']
-                        foil_trials = temp_targetfoil_df[temp_targetfoil_df[targetfoil_col] == 'F']
-                        
-                        # Calcular accuracy para target trials
-                        if len(target_trials) > 0:
-                            target_accuracy = (target_trials[corr_col] == 1).sum() / len(target_trials)
-                            targetfoil_accuracy_data[f'accuracy_target_{test_prefix}'] = target_accuracy
-                            print(f"    - accuracy_target_{test_prefix}: {target_accuracy:.3f} ({len(target_trials)} trials target)")
-                        else:
-                            print(f"    - Aviso: Nenhum trial target encontrado para {test_prefix}")
-                            targetfoil_accuracy_data[f'accuracy_target_{test_prefix}'] = np.nan
-                        
-                        # Calcular accuracy para foil trials
-                        if len(foil_trials) > 0:
-                            foil_accuracy = (foil_trials[corr_col] == 1).sum() / len(foil_trials)
-                            targetfoil_accuracy_data[f'accuracy_foil_{test_prefix}'] = foil_accuracy
-                            print(f"    - accuracy_foil_{test_prefix}: {foil_accuracy:.3f} ({len(foil_trials)} trials foil)")
-                        else:
-                            print(f"    - Aviso: Nenhum trial foil encontrado para {test_prefix}")
-                            targetfoil_accuracy_data[f'accuracy_foil_{test_prefix}'] = np.nan
-                    else:
-                        print(f"    - Aviso: Nenhum valor válido encontrado para targetfoil accuracy de {test_prefix}")
-                        targetfoil_accuracy_data[f'accuracy_target_{test_prefix}'] = np.nan
-                        targetfoil_accuracy_data[f'accuracy_foil_{test_prefix}'] = np.nan
-                else:
-                    print(f"    - Aviso: Colunas {targetfoil_col} ou {corr_col} não encontradas")
-                    targetfoil_accuracy_data[f'accuracy_target_{test_prefix}'] = np.nan
-                    targetfoil_accuracy_data[f'accuracy_foil_{test_prefix}'] = np.nan
-            
-            # Adicionar resultados à lista - organizando por T0, T1, T2
-            result_dict = {
-                'id': participant_id
-            }
-            
-            # Adicionar dados T0 primeiro
-            result_dict['mean_rt_total_T0'] = valid_data['T0_rt']
-            for key, value in length_data.items():
-                if 'T0' in key:
-                    result_dict[key] = value
-            for key, value in correct_data.items():
-                if 'T0' in key:
-                    result_dict[key] = value
-            for key, value in incorrect_data.items():
-                if 'T0' in key:
-                    result_dict[key] = value
-            for key, value in accuracy_data.items():
-                if 'T0' in key:
-                    result_dict[key] = value
-            for key, value in accuracy_by_length_data.items():
-                if 'T0' in key:
-                    result_dict[key] = value
-            for key, value in slope_data.items():
-                if 'T0' in key:
-                    result_dict[key] = value
-            for key, value in rt_correct_by_length_data.items():
-                if 'T0' in key:
-                    result_dict[key] = value
-            for key, value in rt_incorrect_by_length_data.items():
-                if 'T0' in key:
-                    result_dict[key] = value
-            for key, value in targetfoil_accuracy_data.items():
-                if 'T0' in key:
-                    result_dict[key] = value
-            for key, value in targetfoil_accuracy_by_length_data.items():
-                if 'T0' in key:
-                    result_dict[key] = value
-            
-            # Adicionar dados T1
-            result_dict['mean_rt_total_T1'] = valid_data['T1_rt']
-            for key, value in length_data.items():
-                if 'T1' in key:
-                    result_dict[key] = value
-            for key, value in correct_data.items():
-                if 'T1' in key:
-                    result_dict[key] = value
-            for key, value in incorrect_data.items():
-                if 'T1' in key:
-                    result_dict[key] = value
-            for key, value in accuracy_data.items():
-                if 'T1' in key:
-                    result_dict[key] = value
-            for key, value in accuracy_by_length_data.items():
-                if 'T1' in key:
-                    result_dict[key] = value
-            for key, value in slope_data.items():
-                if 'T1' in key:
-                    result_dict[key] = value
-            for key, value in rt_correct_by_length_data.items():
-                if 'T1' in key:
-                    result_dict[key] = value
-            for key, value in rt_incorrect_by_length_data.items():
-                if 'T1' in key:
-                    result_dict[key] = value
-            for key, value in targetfoil_accuracy_data.items():
-                if 'T1' in key:
-                    result_dict[key] = value
-            for key, value in targetfoil_accuracy_by_length_data.items():
-                if 'T1' in key:
-                    result_dict[key] = value
-            
-            # Adicionar dados T2
-            result_dict['mean_rt_total_T2'] = valid_data['T2_rt']
-            for key, value in length_data.items():
-                if 'T2' in key:
-                    result_dict[key] = value
-            for key, value in correct_data.items():
-                if 'T2' in key:
-                    result_dict[key] = value
-            for key, value in incorrect_data.items():
-                if 'T2' in key:
-                    result_dict[key] = value
-            for key, value in accuracy_data.items():
-                if 'T2' in key:
-                    result_dict[key] = value
-            for key, value in accuracy_by_length_data.items():
-                if 'T2' in key:
-                    result_dict[key] = value
-            for key, value in slope_data.items():
-                if 'T2' in key:
-                    result_dict[key] = value
-            for key, value in rt_correct_by_length_data.items():
-                if 'T2' in key:
-                    result_dict[key] = value
-            for key, value in rt_incorrect_by_length_data.items():
-                if 'T2' in key:
-                    result_dict[key] = value
-            for key, value in targetfoil_accuracy_data.items():
-                if 'T2' in key:
-                    result_dict[key] = value
-            for key, value in targetfoil_accuracy_by_length_data.items():
-                if 'T2' in key:
-                    result_dict[key] = value
-            
-            results.append(result_dict)
+            with etapa('leitura'):
+                dados_combinados[participant_id] = pd.read_csv(file_path, skiprows=1)
+            contar('arquivos_lidos')
+            contar('linhas_lidas', len(dados_combinados[participant_id]))
             
         except Exception as e:
             print(f"Erro ao processar arquivo {file_path}: {str(e)}")
+            contar('falhas')
             continue
     
-    # Criar DataFrame com todos os resultados
-    if results:
-        results_df = pd.DataFrame(results)
-        
+    with etapa('dataset'):
+        dataset = SternbergDataset.de_dados_combinados(dados_combinados)
+    print(f"Calculando métricas de {len(dataset)} participantes ({dataset.n_trials} trials)...")
+    with etapa('metricas'):
+        results_df = calcular_metricas_dataset(dataset)
+    
+    if results_df is not None:
         # Salvar resultados em um arquivo CSV
         output_file = "analises.csv"
         
         # Salvar sem formatação forçada de casas decimais
-        results_df.to_csv(output_file, index=False)
+        with etapa('gravacao'):
+            results_df.to_csv(output_file, index=False)
         
         print(f"\nProcessamento concluído!")
         print(f"Resultados salvos em: {output_file}")
-        print(f"Total de participantes processados: {len(results)}")
+        print(f"Total de participantes processados: {len(results_df)}")
         
         # Mostrar um resumo dos resultados
         print("\nResumo dos resultados:")
@@ -531,6 +214,7 @@ def process_rt_means():
             print(f"\nValores NaN encontrados:")
             print(nan_counts)
         
+        gravar_relatorio_perfil(output_file)
         return results_df
     else:
         print("Nenhum resultado foi gerado.")
@@ -1,80 +1,118 @@
 import pandas as pd
-import pingouin as pg
 import numpy as np
 from pathlib import Path
-import re
+import argparse
+from dados_longos import criar_dados_longos, dividir_por_variavel
+from indice_variaveis import IndiceVariaveis
+from estatisticas_lote import descritivas_lote, descritivas_formato_describe
+from cache_resultados import CacheResultados, MODULOS_CALCULO, hash_dados, formatar_estatisticas_cache
+from relatorios import FORMATOS_SAIDA, EscritorRelatorio, verificar_formato_saida
+from perfil_execucao import AJUDA_PERFIL, ativar_perfil, etapa, gravar_relatorio_perfil
+from telemetria import contar, registrar_cache
 
-def realizar_anova_medidas_repetidas(csv_path, output_path=None):
+def calcular_anova_variavel(variable_name, anova_df):
     """
-    Realiza ANOVA de medidas repetidas para todas as variáveis em um arquivo CSV.
+    Realiza a ANOVA de medidas repetidas de uma variável já no formato longo.
     
     Args:
-        csv_path (str): Caminho para o arquivo CSV com os dados
-        output_path (str): Caminho para salvar o arquivo Excel com resultados (opcional)
+        variable_name (str): Nome da variável
+        anova_df (pd.DataFrame): Dados com colunas 'participant', 'time' e 'value'
     
     Returns:
-        pd.DataFrame: DataFrame com os resultados das ANOVAs
+        tuple: (dicionário com o resultado, mensagem de erro ou None)
     """
-    
-    # 1. Leitura do arquivo CSV
-    print("Lendo arquivo CSV...")
-    # Ler o arquivo tentando detectar automaticamente cabeçalho/linha descritiva
-    df = None
-    attempts = [0, 1]
-    last_error = None
-    for skip in attempts:
-        try:
-            temp_df = pd.read_csv(csv_path, skiprows=skip)
-            if 'id' in [c.lower() for c in temp_df.columns]:
-                # Padronizar nome da coluna de id para 'id'
-                rename_map = {c: 'id' for c in temp_df.columns if c.lower() == 'id'}
-                df = temp_df.rename(columns=rename_map)
-                break
-        except Exception as e:
-            last_error = e
-            continue
-    if df is None:
-        raise ValueError(f"Falha ao ler CSV. Último erro: {last_error}")
-    print(f"Dados carregados: {df.shape[0]} participantes, {df.shape[1]} colunas")
-    
-    # Identificar a coluna de ID
-    id_column = 'id'  # Assumindo que a coluna se chama 'id'
-    if id_column not in df.columns:
-        # Tentar encontrar coluna de ID
-        possible_id_cols = [col for col in df.columns if 'id' in col.lower() or 'participante' in col.lower()]
-        if possible_id_cols:
-            id_column = possible_id_cols[0]
-            print(f"Coluna de ID identificada: {id_column}")
+    # Importado aqui: o pingouin leva cerca de dois segundos para carregar, e ANOVAs encontradas
+    # no cache não precisam dele
+    import pingouin as pg
+    try:
+        # Realizar ANOVA de medidas repetidas
+        aov = pg.rm_anova(data=anova_df, dv='value', within='time', subject='participant')
+        
+        # Verificar se a ANOVA foi bem-sucedida
+        if aov.empty or 'time' not in aov['Source'].values:
+            raise ValueError("ANOVA não retornou resultados válidos")
+        
+        # Extrair resultados
+        time_row = aov.loc[aov['Source'] == 'time']
+        if time_row.empty:
+            raise ValueError("Não foi possível encontrar resultados para o fator 'time'")
+        
+        p_value = time_row['p-unc'].iloc[0]
+        f_value = time_row['F'].iloc[0]
+        
+        # Calcular partial eta squared (tamanho de efeito)
+        # Usar a coluna 'ng2' que é o partial eta squared calculado pelo pingouin
+        if 'ng2' in time_row.columns:
+            partial_eta_squared = time_row['ng2'].iloc[0]
         else:
-            raise ValueError("Não foi possível encontrar a coluna de ID")
+            # Fallback: calcular usando F e graus de liberdade
+            df1 = time_row['ddof1'].iloc[0]
+            df2 = time_row['ddof2'].iloc[0]
+            partial_eta_squared = (f_value * df1) / (f_value * df1 + df2)
+        
+        return {
+            'Variavel': variable_name,
+            'F': f_value,
+            'p_value': p_value,
+            'partial_eta_squared': partial_eta_squared,
+            'significancia': 'Sim' if p_value < 0.05 else 'Não',
+            'tamanho_efeito': 'Grande' if partial_eta_squared >= 0.14 else 'Médio' if partial_eta_squared >= 0.06 else 'Pequeno'
+        }, None
+        
+    except Exception as e:
+        # Resultado com erro
+        return {
+            'Variavel': variable_name,
+            'F': np.nan,
+            'p_value': np.nan,
+            'partial_eta_squared': np.nan,
+            'significancia': 'Erro',
+            'tamanho_efeito': 'Erro'
+        }, str(e)
+
+def identificar_coluna_id(df):
+    """
+    Identifica a coluna de ID dos participantes ('id' ou a primeira coluna com 'id'/'participante' no nome)
+    """
+    if 'id' in df.columns:
+        return 'id'
+    possible_id_cols = [col for col in df.columns if 'id' in col.lower() or 'participante' in col.lower()]
+    if possible_id_cols:
+        return possible_id_cols[0]
+    raise ValueError("Não foi possível encontrar a coluna de ID")
+
+def calcular_anovas(df, id_column=None, cache=None):
+    """
+    Realiza a ANOVA de medidas repetidas de todas as variáveis de um DataFrame, sem ler nem gravar arquivos.
     
-    # 2. Identificar variáveis e momentos de teste
-    print("\nIdentificando variáveis...")
-    # Detectar padrões _T0/_T1/_T2 em qualquer posição do nome da coluna
-    # e agrupar removendo o token _T[0-2]
-    variable_groups = {}  # base_variable -> { 'T0': col, 'T1': col, 'T2': col }
-    time_pattern = re.compile(r'_T([012])(?=(_|$))')
+    Args:
+        df (pd.DataFrame): Dados no formato largo (uma linha por participante, colunas <variavel>_T0/_T1/_T2)
+        id_column (str): Coluna de ID dos participantes (None = identificada automaticamente)
+        cache (CacheResultados): Cache das ANOVAs (None = sem cache)
     
-    for col in df.columns:
-        if col == id_column:
-            continue
-        match = time_pattern.search(col)
-        if not match:
-            continue
-        time_key = f"T{match.group(1)}"
-        # Remover apenas o token _T[0-2], mantendo quaisquer sufixos (ex.: _2)
-        base_name = time_pattern.sub('', col)
-        # Normalizações leves
-        base_name = re.sub(r'__+', '_', base_name).strip('_')
-        if base_name not in variable_groups:
-            variable_groups[base_name] = {}
-        variable_groups[base_name][time_key] = col
+    Returns:
+        tuple: (DataFrame com os resultados das ANOVAs ordenados por p-value,
+        DataFrame com as estatísticas descritivas no formato longo de descritivas_lote)
+    """
+    if id_column is None:
+        id_column = identificar_coluna_id(df)
+    if cache is None:
+        cache = CacheResultados(ativo=False)
+    
+    # Índice das variáveis: o token _T0/_T1/_T2 pode estar em qualquer posição do nome da coluna
+    indice = IndiceVariaveis(df.columns)
+    variable_groups = indice.grupos(indice.variaveis(completas=False))
     
     total_groups = len(variable_groups)
-    complete_groups = sum(1 for v in variable_groups.values() if set(v.keys()) == {'T0', 'T1', 'T2'})
+    complete_groups = len(indice.variaveis())
     print(f"Encontradas {total_groups} variáveis candidatas; {complete_groups} com T0, T1 e T2 presentes.")
     
-    # 3. Realizar ANOVA para cada variável
+    # Formato longo de todas as variáveis completas, montado uma única vez
+    complete_variable_groups = indice.grupos(indice.variaveis())
+    with etapa('formato_longo'):
+        dados_longos = dividir_por_variavel(criar_dados_longos(df, complete_variable_groups, id_column))
+    
+    # Realizar ANOVA para cada variável
     print("\nRealizando ANOVAs de medidas repetidas...")
     resultados = []
     
@@ -88,20 +126,8 @@ def realizar_anova_medidas_repetidas(csv_path, output_path=None):
         columns = [time_to_col['T0'], time_to_col['T1'], time_to_col['T2']]
         print(f"  Colunas: {columns}")
         
-        # Preparar dados para ANOVA
-        # Criar DataFrame no formato longo (long format) necessário para pingouin
-        anova_data = []
-        
-        for idx, row in df.iterrows():
-            participant_id = row[id_column]
-            # Adicionar dados para cada momento na ordem T0, T1, T2
-            for t_idx, t in enumerate(['T0', 'T1', 'T2']):
-                col = time_to_col[t]
-                value = row[col]
-                if pd.notna(value):
-                    anova_data.append({'participant': participant_id, 'time': t, 'value': value})
-        
-        anova_df = pd.DataFrame(anova_data)
+        # Dados no formato longo (long format) necessário para pingouin, já preparados
+        anova_df = dados_longos[variable_name]
         
         if len(anova_df) == 0:
             print(f"  AVISO: Nenhum dado válido para {variable_name}. Pulando...")
@@ -116,100 +142,153 @@ def realizar_anova_medidas_repetidas(csv_path, output_path=None):
             print(f"  AVISO: Sem variabilidade nos dados para {variable_name}. Pulando...")
             continue
         
+        # Reaproveitar o resultado do cache se os dados da variável não mudaram
+        conteudo = hash_dados(df[[id_column] + columns]) if cache.ativo else None
+        with etapa('teste:rm_anova'):
+            resultado, erro = cache.obter_ou_calcular(
+                'rm_anova', conteudo, {'variavel': variable_name, 'efeito': 'ng2'},
+                lambda: calcular_anova_variavel(variable_name, anova_df))
+        resultados.append(resultado)
+        contar('variaveis')
+        
+        if erro is None:
+            print(f"  OK: ANOVA concluída - p = {resultado['p_value']:.4f}, eta2 = {resultado['partial_eta_squared']:.4f}")
+        else:
+            print(f"  ERRO: Erro na ANOVA para {variable_name}: {erro}")
+            contar('falhas')
+    
+    # Criar DataFrame com resultados, ordenado por p-value (menor primeiro)
+    resultados_df = pd.DataFrame(resultados)
+    resultados_df = resultados_df.sort_values('p_value', na_position='last')
+    
+    # Estatísticas descritivas de todas as variáveis e momentos, calculadas de uma só vez
+    variaveis_completas = list(complete_variable_groups)
+    descritivas = pd.DataFrame()
+    if variaveis_completas:
+        with etapa('descritivas'):
+            descritivas = descritivas_lote(indice.criar_cubo(df, variaveis_completas), variaveis_completas)
+    
+    return resultados_df, descritivas
+
+def realizar_anova_medidas_repetidas(csv_path, output_path=None, usar_cache=True,
+                                     descritivas_consolidadas=False, formato_saida='xlsx'):
+    """
+    Realiza ANOVA de medidas repetidas para todas as variáveis em um arquivo CSV.
+    
+    Args:
+        csv_path (str): Caminho para o arquivo CSV com os dados
+        output_path (str): Caminho para salvar o arquivo Excel com resultados (opcional)
+        usar_cache (bool): Se deve reaproveitar ANOVAs de variáveis cujos dados não mudaram
+        descritivas_consolidadas (bool): Grava as estatísticas descritivas em uma única planilha
+            no formato longo (uma linha por variável e momento, com n, média, DP, EP, quartis,
+            assimetria e curtose) em vez de uma planilha por variável
+        formato_saida (str): 'xlsx' (uma pasta de trabalho) ou 'csv'/'parquet'
+            (uma pasta com um arquivo por planilha)
+    
+    Returns:
+        pd.DataFrame: DataFrame com os resultados das ANOVAs
+    """
+    verificar_formato_saida(formato_saida)
+    
+    # 1. Leitura do arquivo CSV
+    print("Lendo arquivo CSV...")
+    # Ler o arquivo tentando detectar automaticamente cabeçalho/linha descritiva
+    df = None
+    attempts = [0, 1]
+    last_error = None
+    for skip in attempts:
         try:
-            # Realizar ANOVA de medidas repetidas
-            aov = pg.rm_anova(data=anova_df, dv='value', within='time', subject='participant')
-            
-            # Verificar se a ANOVA foi bem-sucedida
-            if aov.empty or 'time' not in aov['Source'].values:
-                raise ValueError("ANOVA não retornou resultados válidos")
-            
-            # Extrair resultados
-            time_row = aov.loc[aov['Source'] == 'time']
-            if time_row.empty:
-                raise ValueError("Não foi possível encontrar resultados para o fator 'time'")
-            
-            p_value = time_row['p-unc'].iloc[0]
-            f_value = time_row['F'].iloc[0]
-            
-            # Calcular partial eta squared (tamanho de efeito)
-            # Usar a coluna 'ng2' que é o partial eta squared calculado pelo pingouin
-            if 'ng2' in time_row.columns:
-                partial_eta_squared = time_row['ng2'].iloc[0]
-            else:
-                # Fallback: calcular usando F e graus de liberdade
-                df1 = time_row['ddof1'].iloc[0]
-                df2 = time_row['ddof2'].iloc[0]
-                partial_eta_squared = (f_value * df1) / (f_value * df1 + df2)
-            
-            # Adicionar resultado
-            resultados.append({
-                'Variavel': variable_name,
-                'F': f_value,
-                'p_value': p_value,
-                'partial_eta_squared': partial_eta_squared,
-                'significancia': 'Sim' if p_value < 0.05 else 'Não',
-                'tamanho_efeito': 'Grande' if partial_eta_squared >= 0.14 else 'Médio' if partial_eta_squared >= 0.06 else 'Pequeno'
-            })
-            
-            print(f"  OK: ANOVA concluída - p = {p_value:.4f}, eta2 = {partial_eta_squared:.4f}")
-            
+            with etapa('leitura'):
+                temp_df = pd.read_csv(csv_path, skiprows=skip)
+            if 'id' in [c.lower() for c in temp_df.columns]:
+                # Padronizar nome da coluna de id para 'id'
+                rename_map = {c: 'id' for c in temp_df.columns if c.lower() == 'id'}
+                df = temp_df.rename(columns=rename_map)
+                break
         except Exception as e:
-            print(f"  ERRO: Erro na ANOVA para {variable_name}: {str(e)}")
-            # Adicionar resultado com erro
-            resultados.append({
-                'Variavel': variable_name,
-                'F': np.nan,
-                'p_value': np.nan,
-                'partial_eta_squared': np.nan,
-                'significancia': 'Erro',
-                'tamanho_efeito': 'Erro'
-            })
-    
-    # 4️⃣ Criar DataFrame com resultados
-    resultados_df = pd.DataFrame(resultados)
+            last_error = e
+            continue
+    if df is None:
+        raise ValueError(f"Falha ao ler CSV. Último erro: {last_error}")
+    print(f"Dados carregados: {df.shape[0]} participantes, {df.shape[1]} colunas")
+    contar('arquivos_lidos')
+    contar('linhas_lidas', len(df))
+    contar('participantes', len(df))
     
-    # Ordenar por p-value (menor primeiro)
-    resultados_df = resultados_df.sort_values('p_value', na_position='last')
+    # Identificar a coluna de ID
+    id_column = identificar_coluna_id(df)
+    if id_column != 'id':
+        print(f"Coluna de ID identificada: {id_column}")
+    
+    # 2. Identificar variáveis e realizar a ANOVA de cada uma
+    print("\nIdentificando variáveis...")
+    # A ANOVA do pingouin é chamada por este módulo, então o código dele também faz parte da chave
+    cache = CacheResultados(ativo=usar_cache, modulos=MODULOS_CALCULO + ('anova',))
+    resultados_df, descritivas = calcular_anovas(df, id_column, cache)
     
     print(f"\nResumo dos resultados:")
     print(f"Total de variáveis analisadas: {len(resultados_df)}")
     print(f"Variáveis significativas (p < 0.05): {len(resultados_df[resultados_df['significancia'] == 'Sim'])}")
+    if usar_cache:
+        print(formatar_estatisticas_cache(cache.estatisticas()))
+        removidos = cache.limpar()
+        if removidos:
+            print(f"Cache de resultados: {removidos} arquivos antigos removidos de {cache.pasta}")
+    registrar_cache(cache)
     
-    # 5. Exportar para Excel
+    # 3. Exportar para Excel
     if output_path is None:
         output_path = 'resultados_anova_medidas_repetidas.xlsx'
     
     print(f"\nSalvando resultados em: {output_path}")
-    
-    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-        # Planilha principal com resultados
-        resultados_df.to_excel(writer, sheet_name='Resultados_ANOVA', index=False)
-        
-        # Planilha com estatísticas descritivas
-        descritivas = []
-        for variable_name, time_to_col in variable_groups.items():
-            if set(time_to_col.keys()) == {'T0', 'T1', 'T2'}:
-                cols = [time_to_col['T0'], time_to_col['T1'], time_to_col['T2']]
-                stats = df[cols].describe()
-                stats.index.name = 'Estatistica'
-                stats.columns = ['T0', 'T1', 'T2']
-                descritivas.append((variable_name, stats))
-        
-        # Criar planilhas com estatísticas descritivas
-        if descritivas:
-            for var_name, stats in descritivas:
-                sheet_name = f'Desc_{var_name[:25]}'  # Limitar nome da planilha
-                stats.to_excel(writer, sheet_name=sheet_name)
+    output_path = salvar_resultados_anova(resultados_df, descritivas, output_path, descritivas_consolidadas,
+                                          formato_saida)
     
     print(f"Análise concluída! Resultados salvos em: {output_path}")
+    gravar_relatorio_perfil(output_path)
     
     return resultados_df
 
+def salvar_resultados_anova(resultados_df, descritivas, output_path, descritivas_consolidadas=False,
+                            formato_saida='xlsx'):
+    """
+    Grava o relatório da ANOVA: os resultados e as estatísticas descritivas (ver calcular_anovas)
+    
+    Returns:
+        str: Caminho do arquivo Excel ou da pasta com os arquivos gerados
+    """
+    with EscritorRelatorio(output_path, formato_saida) as escritor:
+        # Planilha principal com resultados
+        escritor.adicionar_planilha('Resultados_ANOVA', resultados_df)
+        
+        if not descritivas.empty:
+            if descritivas_consolidadas:
+                # Uma única planilha no formato longo: uma linha por variável e momento
+                escritor.adicionar_planilha('Descritivas', descritivas)
+            else:
+                # Criar planilhas com estatísticas descritivas
+                for var_name in descritivas['Variavel'].unique():
+                    # Nomes longos são encurtados pelo escritor, mantendo o length no final
+                    escritor.adicionar_planilha(f'Desc_{var_name}', descritivas_formato_describe(descritivas, var_name),
+                                                index=True)
+    return str(escritor.caminho)
+
 def main():
     """
     Função principal para executar a análise
     """
+    parser = argparse.ArgumentParser(description="ANOVA de medidas repetidas de todas as variáveis")
+    parser.add_argument('--descritivas-consolidadas', action='store_true',
+                        help="Grava as descritivas em uma única planilha (formato longo) "
+                             "em vez de uma planilha por variável")
+    parser.add_argument('--formato-saida', choices=FORMATOS_SAIDA, default='xlsx',
+                        help="Formato dos resultados: xlsx, ou csv/parquet em uma pasta com um arquivo "
+                             "por planilha (padrão: xlsx)")
+    parser.add_argument('--perfil', '--profile', nargs='?', const='tempo', default=None, help=AJUDA_PERFIL)
+    args = parser.parse_args()
+    if args.perfil:
+        ativar_perfil(args.perfil)
+    
     # Caminho para o arquivo CSV
     csv_path = 'analises.csv'
     
@@ -220,7 +299,9 @@ def main():
         return
     
     # Executar análise
-    resultados = realizar_anova_medidas_repetidas(csv_path)
+    resultados = realizar_anova_medidas_repetidas(csv_path,
+                                                  descritivas_consolidadas=args.descritivas_consolidadas,
+                                                  formato_saida=args.formato_saida)
     
     # Mostrar resultados principais
     print("\n" + "="*80)
@@ -0,0 +1,202 @@
+import os
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+
+# Colunas indexadas de cada tabela (as tabelas sem entrada recebem apenas o índice por Variavel).
+# O tamanho de efeito do post-hoc (d de Cohen) é filtrado em valor absoluto, daí o índice por expressão.
+INDICES = {
+    'ANOVA': ['Variavel', 'significativo', 'partial_eta_squared', 'p_value'],
+    'PostHoc': ['Variavel', 'Comparacao', 'Significativo', 'ABS(Tamanho_efeito)', 'P_corrigido']
+}
+
+# Colunas usadas pelos filtros de significância e tamanho de efeito em cada tabela
+COLUNAS_FILTRO = {
+    'ANOVA': {'significativo': 'significativo', 'efeito': 'partial_eta_squared'},
+    'PostHoc': {'significativo': 'Significativo', 'efeito': 'ABS(Tamanho_efeito)'}
+}
+
+# Situação do post-hoc de cada variável na coluna PostHoc de Resumo_Geral
+POSTHOC_REALIZADO = 'Realizado'
+POSTHOC_OMITIDO = 'Omitido (ANOVA não significativa)'
+POSTHOC_NAO_EXECUTADO = 'Não executado'
+
+def caminho_base_resultados(output_path):
+    """
+    Caminho da base de resultados gravada ao lado do relatório (ex.: resultados.xlsx -> resultados.sqlite)
+    """
+    return Path(output_path).with_suffix('.sqlite')
+
+def _coluna_indexada(expressao):
+    # 'ABS(Tamanho_efeito)' -> 'Tamanho_efeito'
+    return re.sub(r'^\w+\((\w+)\)$', r'\1', expressao)
+
+def _nome_indice(tabela, expressao):
+    return 'idx_' + tabela + '_' + re.sub(r'\W+', '_', expressao.lower()).strip('_')
+
+def salvar_base_resultados(caminho, tabelas, metadados=None):
+    """
+    Grava as tabelas de resultados de uma execução em uma base SQLite indexada
+
+    A base é montada em um arquivo temporário e só substitui a anterior quando
+    está completa, para que uma leitura concorrente nunca veja uma base pela metade.
+
+    Args:
+        caminho (str): Arquivo .sqlite
+        tabelas (dict): {nome da tabela: DataFrame}, com os mesmos nomes das planilhas do relatório
+        metadados (dict): Informações da execução gravadas na tabela 'metadados' (ex.: arquivo de entrada)
+
+    Returns:
+        Path: Caminho da base gravada
+    """
+    caminho = Path(caminho)
+    temporario = caminho.with_name(caminho.name + '.tmp')
+    temporario.unlink(missing_ok=True)
+
+    conexao = sqlite3.connect(temporario)
+    try:
+        for nome, tabela in tabelas.items():
+            tabela.to_sql(nome, conexao, index=False)
+            for expressao in INDICES.get(nome, ['Variavel']):
+                if _coluna_indexada(expressao) in tabela.columns:
+                    conexao.execute(f'CREATE INDEX "{_nome_indice(nome, expressao)}" ON "{nome}" ({expressao})')
+
+        metadados = dict(metadados or {})
+        metadados.setdefault('salvo_em', datetime.now().isoformat(timespec='seconds'))
+        conexao.execute("CREATE TABLE metadados (chave TEXT PRIMARY KEY, valor TEXT)")
+        conexao.executemany("INSERT INTO metadados (chave, valor) VALUES (?, ?)",
+                            [(chave, str(valor)) for chave, valor in metadados.items()])
+        conexao.commit()
+    finally:
+        conexao.close()
+
+    os.replace(temporario, caminho)
+    return caminho
+
+class BaseResultados:
+    """
+    Consulta a base SQLite de resultados gravada pela análise completa.
+
+    As tabelas têm os mesmos nomes e colunas das planilhas do relatório
+    ('ANOVA', 'PostHoc', 'Esfericidade', ...), e os filtros mais usados
+    (significância, tamanho de efeito, variável e comparação) são resolvidos
+    pelos índices da base, sem ler o relatório Excel.
+
+    Uso:
+        with BaseResultados('analise_completa_todas_variaveis.sqlite') as base:
+            significativas = base.consultar('ANOVA', significativo=True, efeito_minimo=0.06)
+    """
+
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+        if not self.caminho.exists():
+            raise FileNotFoundError(f"Base de resultados não encontrada: {self.caminho}")
+        self._conexao = sqlite3.connect(f'file:{self.caminho}?mode=ro', uri=True)
+
+    def tabelas(self):
+        """
+        Lista as tabelas de resultados gravadas
+        """
+        cursor = self._conexao.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name != 'metadados' ORDER BY name")
+        return [nome for (nome,) in cursor]
+
+    def metadados(self):
+        """
+        Retorna as informações da execução que gravou a base
+        """
+        return dict(self._conexao.execute("SELECT chave, valor FROM metadados"))
+
+    def variaveis_sem_posthoc(self):
+        """
+        Variáveis cujo post-hoc foi omitido por a ANOVA não ser significativa (ver --posthoc-todas)
+
+        Returns:
+            set: Vazio para bases gravadas antes da coluna PostHoc de Resumo_Geral
+        """
+        if 'Resumo_Geral' not in self.tabelas():
+            return set()
+        colunas = [linha[1] for linha in self._conexao.execute('PRAGMA table_info("Resumo_Geral")')]
+        if 'PostHoc' not in colunas:
+            return set()
+        cursor = self._conexao.execute('SELECT Variavel FROM "Resumo_Geral" WHERE PostHoc = ?', (POSTHOC_OMITIDO,))
+        return {variavel for (variavel,) in cursor}
+
+    def contar(self, tabela):
+        """
+        Número de linhas de uma tabela (0 se a tabela não foi gravada)
+        """
+        if tabela not in self.tabelas():
+            return 0
+        (total,) = self._conexao.execute(f'SELECT COUNT(*) FROM "{tabela}"').fetchone()
+        return total
+
+    def consultar(self, tabela, significativo=None, efeito_minimo=None, variaveis=None, comparacao=None,
+                  ordenar_por=None):
+        """
+        Lê as linhas de uma tabela que atendem aos filtros
+
+        Args:
+            tabela (str): Nome da tabela ('ANOVA', 'PostHoc', ...)
+            significativo (bool): Apenas significativos (True) ou não significativos (False); None = todos
+            efeito_minimo (float): Tamanho de efeito mínimo (η² parcial na ANOVA, |d| no post-hoc)
+            variaveis (list ou str): Padrões no estilo do shell das variáveis (ex.: 'accuracy_*'); vazio = sem filtro
+            comparacao (list ou str): Comparações do post-hoc (ex.: 'T0 vs T2'); vazio = sem filtro
+            ordenar_por (str): Coluna de ordenação; None = ordem de gravação
+
+        Returns:
+            pd.DataFrame: Linhas selecionadas (vazio se a tabela não foi gravada)
+        """
+        if tabela not in self.tabelas():
+            return pd.DataFrame()
+        filtros = COLUNAS_FILTRO.get(tabela, {})
+        condicoes = []
+        parametros = []
+
+        if significativo is not None:
+            if 'significativo' not in filtros:
+                raise ValueError(f"A tabela {tabela} não tem filtro de significância")
+            condicoes.append(f"{filtros['significativo']} = ?")
+            parametros.append('Sim' if significativo else 'Não')
+
+        if efeito_minimo is not None:
+            if 'efeito' not in filtros:
+                raise ValueError(f"A tabela {tabela} não tem filtro de tamanho de efeito")
+            condicoes.append(f"{filtros['efeito']} >= ?")
+            parametros.append(efeito_minimo)
+
+        if variaveis:
+            if isinstance(variaveis, str):
+                variaveis = variaveis.split(',')
+            padroes = [padrao.strip() for padrao in variaveis if padrao.strip()]
+            # Lista vazia (ex.: ',') não filtra, como em indice_variaveis.selecionar_variaveis
+            if padroes:
+                # GLOB segue as mesmas regras de fnmatch (sensível a maiúsculas) e usa o índice de Variavel
+                condicoes.append('(' + ' OR '.join('Variavel GLOB ?' for _ in padroes) + ')')
+                parametros.extend(padroes)
+
+        if comparacao:
+            if isinstance(comparacao, str):
+                comparacao = comparacao.split(',')
+            comparacoes = [valor.strip() for valor in comparacao if valor.strip()]
+            if comparacoes:
+                condicoes.append(f"Comparacao IN ({', '.join('?' for _ in comparacoes)})")
+                parametros.extend(comparacoes)
+
+        consulta = f'SELECT * FROM "{tabela}"'
+        if condicoes:
+            consulta += ' WHERE ' + ' AND '.join(condicoes)
+        consulta += f' ORDER BY "{ordenar_por}"' if ordenar_por else ' ORDER BY rowid'
+        return pd.read_sql_query(consulta, self._conexao, params=parametros)
+
+    def fechar(self):
+        self._conexao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, rastreamento):
+        self.fechar()
+        return False
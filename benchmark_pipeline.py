@@ -0,0 +1,295 @@
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import combine_sternberg_data
+from analises import process_rt_means
+from anova import realizar_anova_medidas_repetidas
+from analise_completa_todas_variaveis import analise_completa_todas_variaveis
+from indice_variaveis import IndiceVariaveis
+from graficos import paineis_boxplot, renderizar_boxplots
+from gerar_coorte_sintetica import gerar_coorte
+
+ESCALAS_PADRAO = [100, 1000, 10000]
+
+ARQUIVO_HISTORICO = 'benchmark_historico.jsonl'
+
+# Uma medição é uma regressão quando passa da mediana das últimas execuções (na mesma máquina) por mais que isto
+TOLERANCIA_TEMPO = 0.20
+TOLERANCIA_MEMORIA = 0.20
+EXECUCOES_REFERENCIA = 5
+
+def _combinar(pasta):
+    # Apenas combine_user_files é medido; a organização dos arquivos é feita antes
+    arquivos = combine_sternberg_data.organizar_arquivos(sorted(Path(pasta, 'data').glob('*.csv')))
+    return lambda: [combine_sternberg_data.combine_user_files(usuario, testes)
+                    for usuario, testes in arquivos.items()]
+
+def _metricas(pasta):
+    return process_rt_means
+
+def _anova(pasta):
+    return lambda: realizar_anova_medidas_repetidas('analises.csv', 'bench_anova.xlsx', usar_cache=False)
+
+def _analise_completa(pasta):
+    return lambda: analise_completa_todas_variaveis('analises.csv', 'bench_completa.xlsx', criar_graficos=False,
+                                                    usar_cache=False, usar_checkpoint=False,
+                                                    base_resultados=False)
+
+def _boxplots(pasta):
+    df = pd.read_csv('analises.csv')
+    indice = IndiceVariaveis(df.columns)
+    return lambda: renderizar_boxplots(paineis_boxplot(df, indice.variaveis(), indice), 'bench_graficos',
+                                       dpi=100, usar_cache=False)
+
+# Etapas medidas, na ordem do pipeline: cada uma recebe a pasta da coorte e devolve a função a cronometrar
+# (o preparo feito fora dessa função não entra na medição)
+BENCHMARKS = {
+    'combinar': _combinar,
+    'metricas': _metricas,
+    'anova': _anova,
+    'analise_completa': _analise_completa,
+    'boxplots': _boxplots
+}
+
+# Scripts cujo tempo de inicialização é medido (etapa 'inicializacao'): cada chamada pelo agendador
+# paga a importação do script e de suas dependências antes de qualquer trabalho
+MODULOS_INICIALIZACAO = ['combine_sternberg_data', 'analises', 'anova', 'analise_completa_todas_variaveis',
+                         'analise_pressupostos', 'pipeline']
+
+ETAPAS_BENCHMARK = list(BENCHMARKS) + ['inicializacao']
+
+# Importa o módulo e informa o pico de memória residente do processo em KB. O VmHWM é lido em vez
+# de ru_maxrss, que no Linux herda o pico do processo que chamou o subprocesso
+_CODIGO_INICIALIZACAO = '''import {modulo}
+try:
+    print(next(linha.split()[1] for linha in open('/proc/self/status') if linha.startswith('VmHWM')))
+except OSError:
+    import resource
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+'''
+
+def medir_inicializacao(modulo, repeticoes=3):
+    """
+    Mede o tempo para iniciar um interpretador novo e importar um script, sem executar nada
+
+    Returns:
+        dict: As mesmas medidas de medir(); o pico de memória é o residente (RSS) do processo
+    """
+    tempos = []
+    picos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        processo = subprocess.run([sys.executable, '-c', _CODIGO_INICIALIZACAO.format(modulo=modulo)],
+                                  cwd=Path(__file__).parent, capture_output=True, text=True, check=True)
+        tempos.append(time.perf_counter() - inicio)
+        picos.append(int(processo.stdout.split()[-1]) / 1024)
+    return {'segundos_min': min(tempos), 'segundos_mediana': statistics.median(tempos),
+            'repeticoes': repeticoes, 'pico_memoria_mb': max(picos)}
+
+def preparar_coorte(pasta, n_participantes, semente=0):
+    """
+    Gera a coorte sintética e os arquivos intermediários (combinados e analises.csv) usados pelas etapas
+    """
+    gerar_coorte(n_participantes, Path(pasta) / 'data', semente=semente)
+    with contextlib.chdir(pasta), _silencioso():
+        combine_sternberg_data.main()
+        process_rt_means()
+
+@contextlib.contextmanager
+def _silencioso():
+    logging.disable(logging.CRITICAL)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+def medir(funcao, repeticoes=3):
+    """
+    Mede o tempo de parede e o pico de memória de uma função
+
+    O tempo vem de `repeticoes` execuções sem rastreamento de memória; o pico
+    de memória (alocações do Python e do numpy, via tracemalloc) vem de uma
+    execução adicional, pois o rastreamento deixa o código mais lento.
+
+    Returns:
+        dict: 'segundos_min', 'segundos_mediana', 'repeticoes' e 'pico_memoria_mb'
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'segundos_min': min(tempos), 'segundos_mediana': statistics.median(tempos),
+            'repeticoes': repeticoes, 'pico_memoria_mb': pico / 2**20}
+
+def executar_benchmarks(escalas=None, etapas=None, repeticoes=3, semente=0):
+    """
+    Mede cada etapa em coortes sintéticas de cada tamanho
+
+    Returns:
+        list: Um dicionário por (etapa, participantes) com as medidas de medir()
+    """
+    escalas = ESCALAS_PADRAO if escalas is None else escalas
+    etapas = ETAPAS_BENCHMARK if etapas is None else etapas
+    resultados = []
+    if 'inicializacao' in etapas:
+        # Não depende do tamanho da coorte: medida uma vez, registrada com 0 participantes
+        print("\nInicialização dos scripts (interpretador novo + importações):")
+        for modulo in MODULOS_INICIALIZACAO:
+            medida = medir_inicializacao(modulo, repeticoes)
+            resultados.append({'etapa': f'inicializacao:{modulo}', 'participantes': 0, **medida})
+            print(f"  {modulo:<34} {medida['segundos_min']:7.3f}s  (mediana {medida['segundos_mediana']:.3f}s)"
+                  f"  RSS {medida['pico_memoria_mb']:6.1f} MB")
+    etapas = [etapa for etapa in etapas if etapa in BENCHMARKS]
+    for n_participantes in escalas:
+        if not etapas:
+            break
+        with tempfile.TemporaryDirectory(prefix='benchmark_sternberg_') as pasta:
+            print(f"\nCoorte de {n_participantes} participantes: preparando...")
+            preparar_coorte(pasta, n_participantes, semente)
+            with contextlib.chdir(pasta):
+                for etapa in etapas:
+                    with _silencioso():
+                        funcao = BENCHMARKS[etapa](pasta)
+                        medida = medir(funcao, repeticoes)
+                    resultados.append({'etapa': etapa, 'participantes': n_participantes, **medida})
+                    print(f"  {etapa:<18} {medida['segundos_min']:9.3f}s  (mediana {medida['segundos_mediana']:.3f}s)"
+                          f"  pico {medida['pico_memoria_mb']:8.1f} MB")
+    return resultados
+
+def _versao_codigo():
+    try:
+        processo = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  cwd=Path(__file__).parent)
+        return processo.stdout.strip() or None
+    except OSError:
+        return None
+
+def registrar_execucao(resultados, caminho=ARQUIVO_HISTORICO):
+    """
+    Acrescenta a execução ao histórico (um objeto JSON por linha)
+
+    Returns:
+        dict: Registro gravado
+    """
+    registro = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': _versao_codigo(),
+        'maquina': platform.node(),
+        'processadores': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'resultados': resultados
+    }
+    with open(caminho, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(registro) + '\n')
+    return registro
+
+def carregar_historico(caminho=ARQUIVO_HISTORICO):
+    if not Path(caminho).exists():
+        return []
+    with open(caminho, encoding='utf-8') as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+def detectar_regressoes(resultados, historico, maquina=None, execucoes=EXECUCOES_REFERENCIA,
+                        tolerancia_tempo=TOLERANCIA_TEMPO, tolerancia_memoria=TOLERANCIA_MEMORIA):
+    """
+    Compara as medidas com a mediana das últimas execuções da mesma etapa e escala na mesma máquina
+
+    Returns:
+        list: Um dicionário por medida que passou da tolerância ('etapa', 'participantes',
+        'medida', 'atual', 'referencia', 'variacao')
+    """
+    maquina = platform.node() if maquina is None else maquina
+    anteriores = [registro for registro in historico if registro.get('maquina') == maquina][-execucoes:]
+    regressoes = []
+    for resultado in resultados:
+        chave = (resultado['etapa'], resultado['participantes'])
+        for medida, tolerancia in [('segundos_min', tolerancia_tempo), ('pico_memoria_mb', tolerancia_memoria)]:
+            valores = [anterior[medida] for registro in anteriores for anterior in registro['resultados']
+                       if (anterior['etapa'], anterior['participantes']) == chave]
+            if not valores:
+                continue
+            referencia = statistics.median(valores)
+            if referencia > 0 and resultado[medida] > referencia * (1 + tolerancia):
+                regressoes.append({'etapa': chave[0], 'participantes': chave[1], 'medida': medida,
+                                   'atual': resultado[medida], 'referencia': referencia,
+                                   'variacao': resultado[medida] / referencia - 1})
+    return regressoes
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Mede o tempo e a memória de cada etapa do pipeline "
+                                                 "em coortes sintéticas")
+    parser.add_argument('--escalas', default=','.join(map(str, ESCALAS_PADRAO)),
+                        help=f"Números de participantes, separados por vírgula "
+                             f"(padrão: {','.join(map(str, ESCALAS_PADRAO))})")
+    parser.add_argument('--etapas', default=','.join(ETAPAS_BENCHMARK),
+                        help=f"Etapas medidas (padrão: {','.join(ETAPAS_BENCHMARK)})")
+    parser.add_argument('--repeticoes', type=int, default=3,
+                        help="Execuções cronometradas de cada etapa (padrão: 3)")
+    parser.add_argument('--semente', type=int, default=0, help="Semente das coortes (padrão: 0)")
+    parser.add_argument('--historico', default=ARQUIVO_HISTORICO,
+                        help=f"Arquivo de histórico (padrão: {ARQUIVO_HISTORICO})")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_TEMPO,
+                        help=f"Aumento relativo de tempo ou memória considerado regressão (padrão: {TOLERANCIA_TEMPO})")
+    parser.add_argument('--sem-registro', action='store_true',
+                        help="Não acrescenta esta execução ao histórico")
+    args = parser.parse_args()
+
+    escalas = [int(valor) for valor in args.escalas.split(',') if valor.strip()]
+    etapas = [valor.strip() for valor in args.etapas.split(',') if valor.strip()]
+    desconhecidas = [etapa for etapa in etapas if etapa not in ETAPAS_BENCHMARK]
+    if desconhecidas:
+        print(f"ERRO: Etapas desconhecidas: {', '.join(desconhecidas)} (opções: {', '.join(ETAPAS_BENCHMARK)})")
+        return 2
+
+    historico = carregar_historico(args.historico)
+    resultados = executar_benchmarks(escalas, etapas, args.repeticoes, args.semente)
+    regressoes = detectar_regressoes(resultados, historico, tolerancia_tempo=args.tolerancia,
+                                     tolerancia_memoria=args.tolerancia)
+    if not args.sem_registro:
+        registrar_execucao(resultados, args.historico)
+        print(f"\nResultados acrescentados a {args.historico}")
+
+    if regressoes:
+        print("\nALERTA: regressões em relação às últimas execuções:")
+        for regressao in regressoes:
+            unidade = 's' if regressao['medida'] == 'segundos_min' else ' MB'
+            print(f"  {regressao['etapa']} ({regressao['participantes']} participantes), {regressao['medida']}: "
+                  f"{regressao['atual']:.3f}{unidade} vs {regressao['referencia']:.3f}{unidade} "
+                  f"(+{regressao['variacao']:.0%})")
+        return 1
+    print("\nNenhuma regressão em relação às últimas execuções.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
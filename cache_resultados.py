@@ -0,0 +1,238 @@
+import pandas as pd
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from codigo_fonte import hash_codigo
+
+# Incrementar quando a forma de chamar os testes mudar fora de MODULOS_CALCULO, invalidando o cache antigo
+VERSAO_CACHE = 4
+
+# Módulos que calculam os resultados guardados: o hash do código deles (e dos módulos do projeto que
+# eles importam) faz parte da chave, então alterar um teste invalida o cache sem mudar VERSAO_CACHE
+MODULOS_CALCULO = ('estatisticas_lote', 'indice_variaveis')
+
+PASTA_CACHE_PADRAO = '.cache_resultados'
+
+# Limites da pasta do cache, aplicados por CacheResultados.limpar ao final de cada execução
+TAMANHO_MAXIMO_CACHE = 500 * 1024 ** 2
+IDADE_MAXIMA_CACHE_DIAS = 30
+
+@lru_cache(maxsize=None)
+def versao_codigo(modulos=MODULOS_CALCULO):
+    """
+    Hash do código-fonte dos módulos de cálculo (calculado uma vez por processo)
+    """
+    return hash_codigo(modulos, Path(__file__).parent)
+
+def hash_dados(dados):
+    """
+    Calcula um hash estável do conteúdo de um DataFrame (valores e tipos, sem o índice)
+
+    Args:
+        dados (pd.DataFrame): Colunas usadas por um teste (ex.: ID + T0/T1/T2 de uma variável)
+
+    Returns:
+        str: Hash SHA-256 em hexadecimal
+    """
+    h = hashlib.sha256()
+    h.update(str(dados.shape[1]).encode())
+    h.update(pd.util.hash_pandas_object(dados, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+class CacheResultados:
+    """
+    Cache em disco de resultados de testes estatísticos, endereçado pelo conteúdo dos dados.
+
+    Cada resultado é guardado em um arquivo cujo nome é o hash de
+    (versão do cache, código dos módulos de cálculo, nome do teste,
+    parâmetros, hash dos dados). Assim, apenas variáveis cujos dados mudaram
+    são recalculadas em uma nova execução, e uma alteração no código dos
+    testes recalcula tudo. Cada acerto renova a data do arquivo, para que
+    `limpar` remova primeiro os resultados usados há mais tempo.
+    """
+
+    def __init__(self, pasta=PASTA_CACHE_PADRAO, ativo=True, modulos=MODULOS_CALCULO):
+        """
+        Args:
+            pasta (str): Pasta do cache
+            ativo (bool): Se False, todo resultado é calculado e nada é gravado
+            modulos (tuple): Módulos cujo código entra na chave (ver MODULOS_CALCULO)
+        """
+        self.pasta = Path(pasta)
+        self.ativo = ativo
+        self.modulos = tuple(modulos)
+        self.hits = 0
+        self.misses = 0
+
+    def chave(self, nome_teste, hash_conteudo, parametros=None):
+        """
+        Monta a chave de um resultado a partir do teste, dos parâmetros e do hash dos dados
+        """
+        descricao = json.dumps({
+            'versao': VERSAO_CACHE,
+            'codigo': versao_codigo(self.modulos),
+            'teste': nome_teste,
+            'parametros': parametros or {},
+            'dados': hash_conteudo
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(descricao.encode()).hexdigest()
+
+    def _caminho(self, chave):
+        return self.pasta / chave[:2] / f'{chave}.pkl'
+
+    def obter_ou_calcular(self, nome_teste, hash_conteudo, parametros, calcular):
+        """
+        Retorna o resultado guardado para a chave ou calcula e guarda um novo
+
+        Args:
+            nome_teste (str): Nome do teste (ex.: 'shapiro', 'rm_anova')
+            hash_conteudo (str): Hash dos dados de entrada (ver hash_dados)
+            parametros (dict): Parâmetros que influenciam o resultado
+            calcular (callable): Função sem argumentos que calcula o resultado
+
+        Returns:
+            Resultado do teste (do cache ou recém-calculado)
+        """
+        if not self.ativo:
+            return calcular()
+
+        caminho = self._caminho(self.chave(nome_teste, hash_conteudo, parametros))
+        encontrado, resultado = self._carregar(caminho)
+        if encontrado:
+            self.hits += 1
+            return resultado
+
+        self.misses += 1
+        resultado = calcular()
+        self._salvar(caminho, resultado)
+        return resultado
+
+    def obter_ou_calcular_lote(self, nome_teste, conteudos, parametros, calcular_lote):
+        """
+        Versão em lote de obter_ou_calcular, para testes calculados para várias variáveis de uma vez
+
+        Args:
+            nome_teste (str): Nome do teste
+            conteudos (dict): {variavel: hash dos dados da variável}
+            parametros (dict): Parâmetros do teste (o nome da variável é acrescentado à chave)
+            calcular_lote (callable): Recebe a lista de variáveis sem resultado no cache
+                e retorna {variavel: resultado}
+
+        Returns:
+            dict: {variavel: resultado}, na ordem de `conteudos`
+        """
+        if not self.ativo:
+            return calcular_lote(list(conteudos))
+
+        resultados = {}
+        faltantes = {}
+        for variavel, hash_conteudo in conteudos.items():
+            caminho = self._caminho(self.chave(nome_teste, hash_conteudo, dict(parametros, variavel=variavel)))
+            encontrado, resultado = self._carregar(caminho)
+            if encontrado:
+                resultados[variavel] = resultado
+            else:
+                faltantes[variavel] = caminho
+
+        self.hits += len(resultados)
+        self.misses += len(faltantes)
+        if faltantes:
+            novos = calcular_lote(list(faltantes))
+            for variavel, caminho in faltantes.items():
+                self._salvar(caminho, novos[variavel])
+                resultados[variavel] = novos[variavel]
+
+        return {variavel: resultados[variavel] for variavel in conteudos}
+
+    def _carregar(self, caminho):
+        if not caminho.exists():
+            return False, None
+        try:
+            with open(caminho, 'rb') as f:
+                resultado = pickle.load(f)
+        except Exception:
+            # Arquivo corrompido, incompatível ou removido por outra execução: recalcular
+            return False, None
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        return True, resultado
+
+    def _salvar(self, caminho, resultado):
+        # Escrita atômica: vários processos podem gravar no cache ao mesmo tempo
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=caminho.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(resultado, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, caminho)
+        except Exception:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    def limpar(self, tamanho_maximo=TAMANHO_MAXIMO_CACHE, idade_maxima_dias=IDADE_MAXIMA_CACHE_DIAS):
+        """
+        Remove do cache os resultados não usados há mais de `idade_maxima_dias` e, se a pasta
+        ainda passar de `tamanho_maximo` bytes, os usados há mais tempo
+
+        Returns:
+            int: Número de arquivos removidos
+        """
+        if not self.ativo or not self.pasta.exists():
+            return 0
+        arquivos = []
+        for caminho in self.pasta.glob('*/*'):
+            try:
+                info = caminho.stat()
+            except OSError:
+                continue
+            arquivos.append((info.st_mtime, info.st_size, caminho))
+        arquivos.sort()
+
+        limite_idade = time.time() - idade_maxima_dias * 86400
+        tamanho_total = sum(tamanho for _, tamanho, _ in arquivos)
+        removidos = 0
+        for data, tamanho, caminho in arquivos:
+            if data >= limite_idade and tamanho_total <= tamanho_maximo:
+                break
+            # Temporários recentes podem ser de uma gravação em andamento em outro processo
+            if caminho.suffix != '.pkl' and data >= limite_idade:
+                continue
+            try:
+                caminho.unlink()
+            except OSError:
+                continue
+            tamanho_total -= tamanho
+            removidos += 1
+        return removidos
+
+    def estatisticas(self):
+        """
+        Retorna as contagens de acertos e falhas do cache nesta execução
+        """
+        return resumir_estatisticas(self.hits, self.misses)
+
+def resumir_estatisticas(hits, misses):
+    """
+    Monta o dicionário de estatísticas do cache (útil para somar contagens de vários processos)
+    """
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'taxa_acerto': hits / total if total else 0.0
+    }
+
+def formatar_estatisticas_cache(estatisticas):
+    """
+    Formata as estatísticas do cache para o resumo impresso ao final da execução
+    """
+    return (f"Cache de resultados: {estatisticas['hits']} acertos, {estatisticas['misses']} recálculos "
+            f"(taxa de acerto: {estatisticas['taxa_acerto'] * 100:.1f}%)")
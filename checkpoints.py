@@ -0,0 +1,89 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+def assinatura_execucao(hash_entrada, parametros):
+    """
+    Identifica uma execução da bateria pelos dados de entrada e pelos parâmetros que afetam os resultados
+
+    Args:
+        hash_entrada (str): Hash do arquivo/DataFrame de entrada (ver cache_resultados.hash_dados)
+        parametros (dict): Parâmetros da execução (etapas, versão dos testes, ...)
+
+    Returns:
+        str: Hash SHA-256 em hexadecimal
+    """
+    descricao = json.dumps({'dados': hash_entrada, 'parametros': parametros}, sort_keys=True, default=str)
+    return hashlib.sha256(descricao.encode()).hexdigest()
+
+class CheckpointAnalise:
+    """
+    Registro em SQLite dos resultados de cada variável já concluída em uma execução.
+
+    Cada variável é gravada (e confirmada no disco) assim que termina, e os
+    registros nunca são alterados, apenas incluídos. Se a execução for
+    interrompida, uma nova execução com a mesma assinatura retoma a partir das
+    variáveis ainda não concluídas.
+    """
+
+    def __init__(self, caminho, assinatura):
+        self.caminho = Path(caminho)
+        self.assinatura = assinatura
+        self._conexao = sqlite3.connect(self.caminho)
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                assinatura TEXT NOT NULL,
+                variavel TEXT NOT NULL,
+                resultado BLOB NOT NULL,
+                salvo_em TEXT NOT NULL,
+                PRIMARY KEY (assinatura, variavel)
+            )
+        """)
+        self._conexao.commit()
+
+    def variaveis_concluidas(self):
+        """
+        Retorna o conjunto de variáveis já gravadas para esta execução
+        """
+        cursor = self._conexao.execute(
+            "SELECT variavel FROM checkpoints WHERE assinatura = ?", (self.assinatura,))
+        return {variavel for (variavel,) in cursor}
+
+    def salvar(self, variavel, resultado):
+        """
+        Grava os resultados de uma variável concluída
+        """
+        self._conexao.execute(
+            "INSERT OR IGNORE INTO checkpoints (assinatura, variavel, resultado, salvo_em) VALUES (?, ?, ?, ?)",
+            (self.assinatura, variavel, pickle.dumps(resultado, protocol=pickle.HIGHEST_PROTOCOL),
+             datetime.now().isoformat(timespec='seconds')))
+        self._conexao.commit()
+
+    def carregar(self, variaveis):
+        """
+        Lê os resultados gravados das variáveis pedidas
+
+        Returns:
+            dict: {variavel: resultado}, na ordem de `variaveis` (variáveis sem registro são omitidas)
+        """
+        cursor = self._conexao.execute(
+            "SELECT variavel, resultado FROM checkpoints WHERE assinatura = ?", (self.assinatura,))
+        gravados = {variavel: resultado for variavel, resultado in cursor}
+        return {variavel: pickle.loads(gravados[variavel]) for variavel in variaveis if variavel in gravados}
+
+    def finalizar(self):
+        """
+        Remove os registros desta execução (concluída com sucesso) e o arquivo, se ficar vazio
+        """
+        self._conexao.execute("DELETE FROM checkpoints WHERE assinatura = ?", (self.assinatura,))
+        self._conexao.commit()
+        (restantes,) = self._conexao.execute("SELECT COUNT(*) FROM checkpoints").fetchone()
+        self.fechar()
+        if restantes == 0:
+            self.caminho.unlink(missing_ok=True)
+
+    def fechar(self):
+        self._conexao.close()
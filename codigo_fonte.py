@@ -0,0 +1,65 @@
+import ast
+import hashlib
+from pathlib import Path
+
+def modulos_locais(script, pasta=None):
+    """
+    Módulos do projeto (arquivos .py da mesma pasta) importados por um script, direta ou indiretamente
+
+    Considera também as importações feitas dentro de funções (as bibliotecas
+    pesadas e alguns módulos do projeto só são importados quando usados).
+
+    Args:
+        script (str ou Path): Arquivo .py de partida
+        pasta (str ou Path): Pasta dos módulos do projeto (padrão: a pasta do script)
+
+    Returns:
+        list: Caminhos dos módulos importados, em ordem alfabética, sem o próprio script
+    """
+    script = Path(script)
+    pasta = script.parent if pasta is None else Path(pasta)
+    encontrados = set()
+    pendentes = [script]
+    while pendentes:
+        arquivo = pendentes.pop()
+        try:
+            arvore = ast.parse(arquivo.read_text(encoding='utf-8'), filename=str(arquivo))
+        except (OSError, SyntaxError, ValueError):
+            # Script ilegível: a própria execução vai apontar o erro
+            continue
+        for no in ast.walk(arvore):
+            if isinstance(no, ast.Import):
+                nomes = [alias.name for alias in no.names]
+            elif isinstance(no, ast.ImportFrom) and no.level == 0 and no.module:
+                nomes = [no.module]
+            else:
+                continue
+            for nome in nomes:
+                modulo = pasta / f"{nome.split('.')[0]}.py"
+                if modulo != script and modulo not in encontrados and modulo.is_file():
+                    encontrados.add(modulo)
+                    pendentes.append(modulo)
+    return sorted(encontrados)
+
+def hash_codigo(modulos, pasta='.'):
+    """
+    Hash do código-fonte de módulos do projeto e de todos os módulos do projeto que eles importam
+
+    Args:
+        modulos (list): Nomes dos módulos (ex.: ['estatisticas_lote'])
+        pasta (str ou Path): Pasta dos módulos
+
+    Returns:
+        str: Hash SHA-256 em hexadecimal
+    """
+    pasta = Path(pasta)
+    arquivos = set()
+    for modulo in modulos:
+        arquivo = pasta / f'{modulo}.py'
+        arquivos.add(arquivo)
+        arquivos.update(modulos_locais(arquivo, pasta))
+    sha = hashlib.sha256()
+    for arquivo in sorted(arquivos):
+        sha.update(arquivo.name.encode())
+        sha.update(arquivo.read_bytes() if arquivo.is_file() else b'')
+    return sha.hexdigest()
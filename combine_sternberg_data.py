@@ -3,6 +3,8 @@ import os
 import glob
 from pathlib import Path
 import logging
+from perfil_execucao import etapa, gravar_relatorio_perfil
+from telemetria import contar
 
 # Configuração de logging
 logging.basicConfig(
@@ -111,10 +113,14 @@ def combine_user_files(user_id, files_dict):
             logging.info(f"  Processando {file_path}")
             
             # Lê o arquivo
-            df = pd.read_csv(file_path)
+            with etapa('leitura'):
+                df = pd.read_csv(file_path)
+            contar('arquivos_lidos')
+            contar('linhas_lidas', len(df))
             
             # Converte colunas numéricas para int
-            df = convert_numeric_columns_to_int(df)
+            with etapa('conversao'):
+                df = convert_numeric_columns_to_int(df)
             
             # Adiciona prefixo às colunas
             prefix = f"T{test_num}_"
@@ -143,7 +149,8 @@ def combine_user_files(user_id, files_dict):
                     combined_df[col] = df[col]
     
     # Converte colunas numéricas finais para int
-    combined_df = convert_numeric_columns_to_int(combined_df)
+    with etapa('conversao'):
+        combined_df = convert_numeric_columns_to_int(combined_df)
     
     logging.info(f"  Arquivo combinado criado com {len(combined_df.columns)} colunas")
     return combined_df
@@ -172,6 +179,80 @@ def get_column_descriptions(columns):
         return desc_map.get(col, col)
     return [desc(col) for col in columns]
 
+def organizar_arquivos(csv_files):
+    """
+    Organiza os arquivos T{n}_{id}_sternberg.csv por usuário e teste.
+    
+    Args:
+        csv_files: Caminhos dos arquivos CSV
+        
+    Returns:
+        Dicionário {user_id: {test_num: caminho}}
+    """
+    users_files = {}
+    
+    for file_path in csv_files:
+        filename = os.path.basename(file_path)
+        user_id = extract_user_id(filename)
+        test_num = extract_test_number(filename)
+        
+        if user_id and test_num:
+            if user_id not in users_files:
+                users_files[user_id] = {}
+            
+            users_files[user_id][test_num] = file_path
+            logging.info(f"Arquivo {filename} -> Usuário {user_id}, Teste T{test_num}")
+    
+    logging.info(f"Organizados {len(users_files)} usuários")
+    return users_files
+
+def valores_como_salvos(df):
+    """
+    Reproduz em memória os valores que o arquivo combinado terá depois de gravado e lido de volta.
+    
+    O arquivo combinado é gravado com float_format='%.0f', o que arredonda as
+    colunas decimais (como o rt) para inteiros, e na leitura as colunas
+    numéricas voltam como int64 (ou float64, se tiverem valores ausentes). Aplicar o mesmo aqui faz
+    com que as métricas calculadas em memória sejam idênticas às do pipeline
+    em arquivos.
+    
+    Args:
+        df: DataFrame combinado (saída de combine_user_files)
+        
+    Returns:
+        DataFrame com os valores e tipos lidos do arquivo gravado
+    """
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.Int64Dtype):
+            df[col] = df[col].astype('float64') if df[col].isna().any() else df[col].astype('int64')
+        elif df[col].dtype in ['float64', 'float32']:
+            df[col] = df[col].round(0)
+            if df[col].notna().all():
+                df[col] = df[col].astype('int64')
+    return df
+
+def combinar_dados(input_folder="data"):
+    """
+    Combina os dados T0, T1 e T2 de todos os usuários, sem gravar arquivos.
+    
+    Args:
+        input_folder: Pasta com os arquivos T{n}_{id}_sternberg.csv
+        
+    Returns:
+        Dicionário {user_id: DataFrame combinado}, com os valores como ficariam
+        no arquivo gravado por main() (ver valores_como_salvos)
+    """
+    users_files = organizar_arquivos(glob.glob(os.path.join(input_folder, "*.csv")))
+    
+    dados_combinados = {}
+    for user_id, files_dict in users_files.items():
+        combined_df = combine_user_files(user_id, files_dict)
+        if combined_df is not None:
+            dados_combinados[user_id] = valores_como_salvos(combined_df)
+    
+    return dados_combinados
+
 def main():
     # Criar pasta para os arquivos combinados
     output_folder = "dados_sternberg_combinados"
@@ -186,7 +267,8 @@ def main():
         return
     
     # Encontrar todos os arquivos CSV
-    csv_files = glob.glob(os.path.join(input_folder, "*.csv"))
+    with etapa('varredura'):
+        csv_files = glob.glob(os.path.join(input_folder, "*.csv"))
     
     if not csv_files:
         logging.error(f"Nenhum arquivo CSV encontrado em {input_folder}")
@@ -195,21 +277,8 @@ def main():
     logging.info(f"Encontrados {len(csv_files)} arquivos CSV")
     
     # Organizar arquivos por usuário
-    users_files = {}
-    
-    for file_path in csv_files:
-        filename = os.path.basename(file_path)
-        user_id = extract_user_id(filename)
-        test_num = extract_test_number(filename)
-        
-        if user_id and test_num:
-            if user_id not in users_files:
-                users_files[user_id] = {}
-            
-            users_files[user_id][test_num] = file_path
-            logging.info(f"Arquivo {filename} -> Usuário {user_id}, Teste T{test_num}")
-    
-    logging.info(f"Organizados {len(users_files)} usuários")
+    with etapa('varredura'):
+        users_files = organizar_arquivos(csv_files)
     
     # Processar cada usuário
     for user_id, files_dict in users_files.items():
@@ -220,26 +289,30 @@ def main():
             logging.warning(f"Usuário {user_id} tem apenas {len(files_dict)} testes (esperado: 3)")
         
         # Combinar arquivos do usuário
-        combined_df = combine_user_files(user_id, files_dict)
+        with etapa('combinar'):
+            combined_df = combine_user_files(user_id, files_dict)
         
         if combined_df is not None:
             # Salvar arquivo combinado
             output_file = os.path.join(output_folder, f"{user_id}_sternberg_combined.csv")
             # Adicionar linha de descrição curta acima do cabeçalho
             descriptions = get_column_descriptions(combined_df.columns)
-            with open(output_file, 'w', encoding='utf-8', newline='') as f:
+            with etapa('gravacao'), open(output_file, 'w', encoding='utf-8', newline='') as f:
                 f.write(','.join(descriptions) + '\n')
                 # Salva o DataFrame garantindo que colunas numéricas sejam salvas como números
                 combined_df.to_csv(f, index=False, float_format='%.0f')
             logging.info(f"Arquivo salvo: {output_file}")
+            contar('participantes')
             
             # Mostrar informações sobre as colunas
             logging.info(f"  Colunas: {list(combined_df.columns)}")
             logging.info(f"  Linhas: {len(combined_df)}")
         else:
             logging.error(f"Erro ao combinar arquivos para usuário {user_id}")
+            contar('falhas')
     
     logging.info("Processamento concluído!")
+    gravar_relatorio_perfil(output_folder)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,186 @@
+import argparse
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from base_resultados import BaseResultados
+from relatorios import FORMATOS_SAIDA, EscritorRelatorio
+
+# Tabelas comparadas: chave de alinhamento, coluna de significância e colunas numéricas
+# (estatística do teste, p e tamanho de efeito) com o nome da tolerância de cada uma
+TABELAS_COMPARADAS = {
+    'ANOVA': {
+        'chaves': ['Variavel'],
+        'significativo': 'significativo',
+        'colunas': {'F': 'estatistica', 'p_value': 'p', 'partial_eta_squared': 'efeito'}
+    },
+    'PostHoc': {
+        'chaves': ['Variavel', 'Comparacao'],
+        'significativo': 'Significativo',
+        'colunas': {'T_statistic': 'estatistica', 'P_corrigido': 'p', 'Tamanho_efeito': 'efeito'}
+    }
+}
+
+# Diferenças absolutas abaixo das quais um valor é considerado inalterado
+TOLERANCIAS_PADRAO = {'estatistica': 0.01, 'p': 0.001, 'efeito': 0.01}
+
+def comparar_tabela(anterior, atual, chaves, significativo, colunas, tolerancias):
+    """
+    Alinha duas versões de uma tabela de resultados pela chave e lista as linhas que mudaram
+
+    Args:
+        anterior, atual (pd.DataFrame): Tabelas das duas execuções
+        chaves (list): Colunas que identificam uma linha (ex.: ['Variavel', 'Comparacao'])
+        significativo (str): Coluna com 'Sim'/'Não'
+        colunas (dict): {coluna numérica: nome da tolerância}
+        tolerancias (dict): {nome da tolerância: diferença absoluta máxima}
+
+    Returns:
+        pd.DataFrame: Uma linha por chave nova, removida ou alterada, com os valores das duas
+        execuções, as diferenças, 'Mudou_significancia' e a lista de 'Alteracoes'
+    """
+    usadas = chaves + [significativo] + list(colunas)
+    unidas = pd.merge(anterior.reindex(columns=usadas), atual.reindex(columns=usadas), on=chaves, how='outer',
+                      suffixes=('_anterior', '_atual'), indicator=True, validate='one_to_one')
+
+    situacao = unidas['_merge'].map({'left_only': 'Removida', 'right_only': 'Nova', 'both': 'Alterada'})
+    ambas = (unidas['_merge'] == 'both').to_numpy()
+
+    sig_anterior = unidas[f'{significativo}_anterior']
+    sig_atual = unidas[f'{significativo}_atual']
+    mudou_significancia = ambas & (sig_anterior.astype(str) != sig_atual.astype(str)).to_numpy()
+
+    comparacao = unidas[chaves].copy()
+    comparacao['Situacao'] = situacao.astype(str)
+    comparacao['Significativo_anterior'] = sig_anterior
+    comparacao['Significativo_atual'] = sig_atual
+    comparacao['Mudou_significancia'] = np.where(mudou_significancia, 'Sim', 'Não')
+
+    alteracoes = [['significância'] if mudou else [] for mudou in mudou_significancia]
+    alterada = mudou_significancia.copy()
+    for coluna, tolerancia in colunas.items():
+        valor_anterior = unidas[f'{coluna}_anterior'].to_numpy(dtype=float)
+        valor_atual = unidas[f'{coluna}_atual'].to_numpy(dtype=float)
+        delta = valor_atual - valor_anterior
+        # Um valor que deixou de existir (ou passou a existir) também é uma alteração
+        mudou = ambas & ((np.abs(delta) > tolerancias[tolerancia]) | (np.isnan(valor_anterior) != np.isnan(valor_atual)))
+        comparacao[f'{coluna}_anterior'] = valor_anterior
+        comparacao[f'{coluna}_atual'] = valor_atual
+        comparacao[f'Delta_{coluna}'] = delta
+        for posicao in np.flatnonzero(mudou):
+            alteracoes[posicao].append(coluna)
+        alterada |= mudou
+
+    comparacao['Alteracoes'] = [', '.join(lista) for lista in alteracoes]
+    manter = ~ambas | alterada
+    return comparacao[manter].sort_values(chaves).reset_index(drop=True)
+
+def comparar_execucoes(base_anterior, base_atual, tolerancias=None):
+    """
+    Compara as conclusões de ANOVA e post-hoc de duas execuções da análise completa
+
+    Comparações post-hoc que faltam em uma das execuções porque ela omitiu o
+    post-hoc da variável (ANOVA não significativa, sem --posthoc-todas) não
+    contam como novas nem removidas: a mudança já aparece na tabela ANOVA, e
+    o número de linhas ignoradas fica em `diferencas['PostHoc'].attrs['omitidas']`.
+
+    Args:
+        base_anterior, base_atual (str): Bases de resultados (.sqlite) das duas execuções
+        tolerancias (dict): Substitui valores de TOLERANCIAS_PADRAO ('estatistica', 'p', 'efeito')
+
+    Returns:
+        dict: {tabela: DataFrame de comparar_tabela}
+    """
+    tolerancias = {**TOLERANCIAS_PADRAO, **(tolerancias or {})}
+    diferencas = {}
+    with BaseResultados(base_anterior) as anterior, BaseResultados(base_atual) as atual:
+        for tabela, definicao in TABELAS_COMPARADAS.items():
+            diferencas[tabela] = comparar_tabela(anterior.consultar(tabela), atual.consultar(tabela),
+                                                 definicao['chaves'], definicao['significativo'],
+                                                 definicao['colunas'], tolerancias)
+        sem_posthoc_anterior = anterior.variaveis_sem_posthoc()
+        sem_posthoc_atual = atual.variaveis_sem_posthoc()
+
+    posthoc = diferencas['PostHoc']
+    omitidas = (((posthoc['Situacao'] == 'Removida') & posthoc['Variavel'].isin(sem_posthoc_atual)) |
+                ((posthoc['Situacao'] == 'Nova') & posthoc['Variavel'].isin(sem_posthoc_anterior)))
+    diferencas['PostHoc'] = posthoc[~omitidas].reset_index(drop=True)
+    diferencas['PostHoc'].attrs['omitidas'] = int(omitidas.sum())
+    return diferencas
+
+def imprimir_diferencas(diferencas):
+    """
+    Imprime o resumo das diferenças de cada tabela
+    """
+    for tabela, comparacao in diferencas.items():
+        chaves = TABELAS_COMPARADAS[tabela]['chaves']
+        print(f"\n{tabela}")
+        print('-'*50)
+        if comparacao.attrs.get('omitidas'):
+            print(f"  Comparações ignoradas (post-hoc omitido por ANOVA não significativa): "
+                  f"{comparacao.attrs['omitidas']}")
+        if comparacao.empty:
+            print("  Nenhuma diferença além das tolerâncias")
+            continue
+        for situacao in ['Nova', 'Removida']:
+            linhas = comparacao[comparacao['Situacao'] == situacao]
+            if not linhas.empty:
+                print(f"  {situacao}s: {len(linhas)}")
+        viradas = comparacao[comparacao['Mudou_significancia'] == 'Sim']
+        print(f"  Mudanças de significância: {len(viradas)}")
+        for _, row in viradas.iterrows():
+            nome = ' - '.join(str(row[chave]) for chave in chaves)
+            print(f"    {nome}: {row['Significativo_anterior']} -> {row['Significativo_atual']}")
+        outras = comparacao[(comparacao['Situacao'] == 'Alterada') & (comparacao['Mudou_significancia'] == 'Não')]
+        print(f"  Outras alterações além das tolerâncias: {len(outras)}")
+        for _, row in outras.iterrows():
+            nome = ' - '.join(str(row[chave]) for chave in chaves)
+            print(f"    {nome}: {row['Alteracoes']}")
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Compara os resultados de ANOVA e post-hoc de duas execuções")
+    parser.add_argument('anterior', help="Base de resultados (.sqlite) da execução anterior")
+    parser.add_argument('atual', help="Base de resultados (.sqlite) da execução atual")
+    parser.add_argument('--tol-estatistica', type=float, default=TOLERANCIAS_PADRAO['estatistica'],
+                        help=f"Diferença máxima de F/T (padrão: {TOLERANCIAS_PADRAO['estatistica']})")
+    parser.add_argument('--tol-p', type=float, default=TOLERANCIAS_PADRAO['p'],
+                        help=f"Diferença máxima de p (padrão: {TOLERANCIAS_PADRAO['p']})")
+    parser.add_argument('--tol-efeito', type=float, default=TOLERANCIAS_PADRAO['efeito'],
+                        help=f"Diferença máxima do tamanho de efeito (padrão: {TOLERANCIAS_PADRAO['efeito']})")
+    parser.add_argument('--saida', default=None,
+                        help="Grava as diferenças em um relatório (uma planilha por tabela)")
+    parser.add_argument('--formato-saida', choices=FORMATOS_SAIDA, default='xlsx',
+                        help="Formato do relatório de diferenças (padrão: xlsx)")
+    args = parser.parse_args()
+
+    for caminho in [args.anterior, args.atual]:
+        if not Path(caminho).exists():
+            print(f"ERRO: Base de resultados não encontrada: {caminho}")
+            return 2
+
+    diferencas = comparar_execucoes(args.anterior, args.atual, {
+        'estatistica': args.tol_estatistica, 'p': args.tol_p, 'efeito': args.tol_efeito})
+
+    print('DIFERENÇAS ENTRE EXECUÇÕES')
+    print('='*50)
+    print(f'Anterior: {args.anterior}')
+    print(f'Atual: {args.atual}')
+    imprimir_diferencas(diferencas)
+
+    if args.saida:
+        with EscritorRelatorio(args.saida, args.formato_saida) as escritor:
+            for tabela, comparacao in diferencas.items():
+                escritor.adicionar_planilha(tabela, comparacao)
+        print(f"\nDiferenças salvas em: {escritor.caminho}")
+
+    # Código de saída 1 quando alguma conclusão mudou, para uso como verificação automática
+    conclusoes_mudaram = any((comparacao['Mudou_significancia'] == 'Sim').any() or
+                             comparacao['Situacao'].isin(['Nova', 'Removida']).any()
+                             for comparacao in diferencas.values())
+    return 1 if conclusoes_mudaram else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
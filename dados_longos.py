@@ -0,0 +1,106 @@
+import pandas as pd
+import numpy as np
+
+# Momentos de teste, na ordem usada em todas as análises
+TEMPOS = ['T0', 'T1', 'T2']
+
+def grupos_por_sufixo(variaveis):
+    """
+    Monta o mapeamento variável -> {tempo: coluna} para variáveis no formato <base>_T0/_T1/_T2
+
+    Args:
+        variaveis (list): Nomes base das variáveis
+
+    Returns:
+        dict: {variavel: {'T0': col, 'T1': col, 'T2': col}}
+    """
+    return {var: {t: f'{var}_{t}' for t in TEMPOS} for var in variaveis}
+
+def criar_cubo(df, variable_groups):
+    """
+    Monta a matriz participante x tempo de todas as variáveis como um único array.
+
+    Args:
+        df (pd.DataFrame): Dados no formato largo (uma linha por participante)
+        variable_groups (dict): {variavel: {'T0': col, 'T1': col, 'T2': col}}
+
+    Returns:
+        np.ndarray: Array (variáveis, participantes, tempos) com NaN para valores
+        ausentes, não numéricos ou tempos sem coluna correspondente
+    """
+    variaveis = list(variable_groups.keys())
+    colunas = [variable_groups[var].get(t) for var in variaveis for t in TEMPOS]
+    presentes = [col for col in colunas if col is not None and col in df.columns]
+
+    # Conversão para numérico de todas as colunas de uma só vez
+    numericos = df[presentes].apply(pd.to_numeric, errors='coerce')
+    valores = np.full((len(df), len(colunas)), np.nan)
+    for j, col in enumerate(colunas):
+        if col is not None and col in df.columns:
+            valores[:, j] = numericos[col].to_numpy(dtype=float)
+
+    return valores.reshape(len(df), len(variaveis), len(TEMPOS)).transpose(1, 0, 2)
+
+def colunas_existentes(df, variable_groups):
+    """
+    Indica quais tempos de cada variável têm coluna correspondente no DataFrame
+
+    Returns:
+        np.ndarray: Array booleano (variáveis, tempos), na ordem de criar_cubo
+    """
+    return np.array([[variable_groups[var].get(t) in df.columns for t in TEMPOS]
+                     for var in variable_groups], dtype=bool).reshape(len(variable_groups), len(TEMPOS))
+
+def criar_dados_longos(df, variable_groups, id_column):
+    """
+    Converte todas as variáveis T0/T1/T2 para o formato longo em uma única operação vetorizada.
+
+    As linhas ficam ordenadas por variável, participante e tempo (mesma ordem
+    das tabelas montadas linha a linha anteriormente) e apenas valores numéricos
+    válidos são mantidos. Tempos sem coluna correspondente no DataFrame são
+    tratados como ausentes.
+
+    Args:
+        df (pd.DataFrame): Dados no formato largo (uma linha por participante)
+        variable_groups (dict): {variavel: {'T0': col, 'T1': col, 'T2': col}}
+        id_column (str): Nome da coluna de ID
+
+    Returns:
+        pd.DataFrame: Colunas 'Variavel' (categórica), 'participant', 'time'
+        (categórica ordenada T0 < T1 < T2) e 'value'
+    """
+    variaveis = list(variable_groups.keys())
+    n_participantes = len(df)
+    n_tempos = len(TEMPOS)
+
+    # Cubo (variável, participante, tempo) achatado
+    valores_longos = criar_cubo(df, variable_groups).ravel()
+
+    codigos_variavel = np.repeat(np.arange(len(variaveis)), n_participantes * n_tempos)
+    codigos_participante = np.tile(np.repeat(np.arange(n_participantes), n_tempos), len(variaveis))
+    codigos_tempo = np.tile(np.arange(n_tempos), len(variaveis) * n_participantes)
+
+    validos = ~np.isnan(valores_longos)
+
+    return pd.DataFrame({
+        'Variavel': pd.Categorical.from_codes(codigos_variavel[validos], categories=variaveis),
+        'participant': df[id_column].to_numpy()[codigos_participante[validos]],
+        'time': pd.Categorical.from_codes(codigos_tempo[validos], categories=TEMPOS, ordered=True),
+        'value': valores_longos[validos]
+    })
+
+def dividir_por_variavel(dados_longos):
+    """
+    Separa o conjunto longo compartilhado em uma tabela por variável
+
+    Args:
+        dados_longos (pd.DataFrame): Resultado de criar_dados_longos
+
+    Returns:
+        dict: {variavel: pd.DataFrame com colunas 'participant', 'time', 'value'}
+    """
+    tabelas = {var: pd.DataFrame(columns=['participant', 'time', 'value'])
+               for var in dados_longos['Variavel'].cat.categories}
+    for variavel, grupo in dados_longos.groupby('Variavel', observed=True, sort=False):
+        tabelas[variavel] = grupo[['participant', 'time', 'value']].reset_index(drop=True)
+    return tabelas
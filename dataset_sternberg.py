@@ -0,0 +1,192 @@
+import numpy as np
+import pandas as pd
+from dados_longos import TEMPOS
+
+# Colunas de cada sessão usadas nas métricas (T0_length, T0_targetfoil, ...)
+COLUNAS_TRIAL = ['length', 'targetfoil', 'corr', 'rt']
+
+# Valor de length dos trials sem tamanho do conjunto
+LENGTH_AUSENTE = -1
+
+# Valor de corr dos trials com corr preenchido diferente de 0 e 1 (ex.: 2, 0.5)
+CORR_OUTRO = 2
+
+class SternbergDataset:
+    """
+    Trials de todos os participantes em arrays NumPy tipados, um por campo (formato colunar).
+
+    Os trials ficam ordenados por participante e sessão (mantendo a ordem
+    original dentro de cada sessão), e `offsets` guarda onde começa cada
+    grupo participante x sessão: os trials da sessão s do participante p vão
+    de offsets[3 * p + s] a offsets[3 * p + s + 1]. Assim, os trials de um
+    participante são fatias (views, sem cópia) dos arrays, em vez de filtros
+    repetidos sobre DataFrames com colunas T0_rt, T1_corr, ...
+
+    Campos ausentes não descartam o trial, para que cada métrica filtre
+    apenas os campos que usa: rt ausente é NaN, length ausente é
+    LENGTH_AUSENTE e `corr_valido`/`targetfoil_valido` indicam os trials com
+    corr preenchido e com targetfoil T ou F. O corr é 1 (correta), 0
+    (incorreta) ou CORR_OUTRO (preenchido com outro valor: conta como
+    resposta não correta na acurácia, mas não como incorreta). O rt é
+    float32, exato para os tempos em ms inteiros dos arquivos combinados.
+    """
+
+    __slots__ = ('participantes', 'sessoes_presentes', 'codigo', 'sessao', 'length', 'targetfoil', 'corr',
+                 'rt', 'corr_valido', 'targetfoil_valido', 'offsets', '_indices')
+
+    def __init__(self, participantes, codigo, sessao, length, targetfoil, corr, rt, corr_valido=None,
+                 targetfoil_valido=None, sessoes_presentes=None):
+        """
+        Args:
+            participantes (list): IDs dos participantes; `codigo` indexa esta lista
+            codigo (array): Participante de cada trial (posição em `participantes`)
+            sessao (array): Sessão de cada trial (0, 1 ou 2 para T0, T1 e T2)
+            length (array): Tamanho do conjunto memorizado (LENGTH_AUSENTE se ausente)
+            targetfoil (array): True para alvos (T), False para distratores (F)
+            corr (array): 1 para respostas corretas, 0 para incorretas e CORR_OUTRO para outros valores
+            rt (array): Tempo de resposta (ms), NaN se ausente
+            corr_valido (array): Trials com corr preenchido (padrão: todos)
+            targetfoil_valido (array): Trials com targetfoil T ou F (padrão: todos)
+            sessoes_presentes (array): Booleano (participantes, 3) indicando as sessões com dados
+                (padrão: as sessões com pelo menos um trial)
+        """
+        self.participantes = np.asarray(participantes, dtype=object)
+        n_participantes = len(self.participantes)
+        codigo = np.asarray(codigo, dtype=np.int32)
+        sessao = np.asarray(sessao, dtype=np.int8)
+        ordem = np.lexsort((sessao, codigo))
+        self.codigo = codigo[ordem]
+        self.sessao = sessao[ordem]
+        self.length = np.asarray(length, dtype=np.int8)[ordem]
+        self.targetfoil = np.asarray(targetfoil, dtype=bool)[ordem]
+        self.corr = np.asarray(corr, dtype=np.int8)[ordem]
+        self.rt = np.asarray(rt, dtype=np.float32)[ordem]
+        todos = np.ones(len(ordem), dtype=bool)
+        self.corr_valido = todos if corr_valido is None else np.asarray(corr_valido, dtype=bool)[ordem]
+        self.targetfoil_valido = (todos.copy() if targetfoil_valido is None
+                                  else np.asarray(targetfoil_valido, dtype=bool)[ordem])
+
+        grupos = self.codigo.astype(np.int64) * len(TEMPOS) + self.sessao
+        self.offsets = np.searchsorted(grupos, np.arange(n_participantes * len(TEMPOS) + 1))
+        if sessoes_presentes is None:
+            sessoes_presentes = np.diff(self.offsets).reshape(n_participantes, len(TEMPOS)) > 0
+        self.sessoes_presentes = np.asarray(sessoes_presentes, dtype=bool)
+        self._indices = {participante: i for i, participante in enumerate(self.participantes)}
+
+    @classmethod
+    def de_dados_combinados(cls, dados_combinados):
+        """
+        Monta o dataset a partir dos dados combinados de cada participante
+
+        Args:
+            dados_combinados (dict): {id do participante: DataFrame com colunas T0_rt, T0_length, ...}
+                (ver combine_sternberg_data.combinar_dados ou os arquivos lidos por analises.py)
+
+        Returns:
+            SternbergDataset: Uma sessão só é considerada presente se tiver as quatro colunas de
+            COLUNAS_TRIAL; linhas sem nenhum dos quatro campos (as que completam a sessão mais curta
+            no arquivo combinado) não viram trials
+        """
+        participantes = list(dados_combinados)
+        sessoes_presentes = np.zeros((len(participantes), len(TEMPOS)), dtype=bool)
+        campos = {campo: [] for campo in ['codigo', 'sessao', 'corr_valido', 'targetfoil_valido'] + COLUNAS_TRIAL}
+
+        for sessao, tempo in enumerate(TEMPOS):
+            colunas = [f'{tempo}_{coluna}' for coluna in COLUNAS_TRIAL]
+            quadros, codigos = [], []
+            for codigo, df in enumerate(dados_combinados.values()):
+                if all(coluna in df.columns for coluna in colunas):
+                    sessoes_presentes[codigo, sessao] = True
+                    quadros.append(df[colunas].set_axis(COLUNAS_TRIAL, axis=1))
+                    codigos.append(np.full(len(df), codigo, dtype=np.int32))
+            if not quadros:
+                continue
+
+            # Conversão de todos os participantes da sessão de uma só vez
+            tabela = pd.concat(quadros, ignore_index=True)
+            length = pd.to_numeric(tabela['length'], errors='coerce').to_numpy(dtype=float)
+            corr = pd.to_numeric(tabela['corr'], errors='coerce').to_numpy(dtype=float)
+            rt = pd.to_numeric(tabela['rt'], errors='coerce').to_numpy(dtype=float)
+            targetfoil = tabela['targetfoil']
+            targetfoil_valido = targetfoil.isin(['T', 'F']).to_numpy()
+            corr_valido = ~np.isnan(corr)
+            linhas = ~np.isnan(length) | corr_valido | ~np.isnan(rt) | targetfoil.notna().to_numpy()
+
+            campos['codigo'].append(np.concatenate(codigos)[linhas])
+            campos['sessao'].append(np.full(linhas.sum(), sessao, dtype=np.int8))
+            campos['length'].append(np.where(np.isnan(length), LENGTH_AUSENTE, length)[linhas])
+            campos['targetfoil'].append((targetfoil == 'T').to_numpy()[linhas])
+            campos['targetfoil_valido'].append(targetfoil_valido[linhas])
+            campos['corr'].append(np.select([corr == 1, corr == 0, corr_valido], [1, 0, CORR_OUTRO])[linhas])
+            campos['corr_valido'].append(corr_valido[linhas])
+            campos['rt'].append(rt[linhas])
+
+        arrays = {campo: np.concatenate(valores) if valores else np.empty(0) for campo, valores in campos.items()}
+        return cls(participantes, sessoes_presentes=sessoes_presentes, **arrays)
+
+    def __len__(self):
+        return len(self.participantes)
+
+    @property
+    def n_trials(self):
+        return len(self.rt)
+
+    @property
+    def nbytes(self):
+        """
+        Memória ocupada pelos arrays dos trials e pelos offsets (bytes)
+        """
+        return sum(getattr(self, campo).nbytes for campo in
+                   ['codigo', 'sessao', 'length', 'targetfoil', 'corr', 'rt', 'corr_valido', 'targetfoil_valido',
+                    'offsets'])
+
+    def indice(self, participante):
+        """
+        Posição de um participante, a partir do ID
+        """
+        return self._indices[participante]
+
+    def grupos(self):
+        """
+        Grupo participante x sessão de cada trial (3 * participante + sessão), na ordem dos arrays
+        """
+        return np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+
+    def trials(self, participante, sessao=None):
+        """
+        Trials de um participante (ou de uma de suas sessões), como views dos arrays
+
+        Args:
+            participante (int ou str): Posição ou ID do participante
+            sessao (int): 0, 1 ou 2 (None = as três sessões)
+
+        Returns:
+            dict: 'sessao', 'length', 'targetfoil', 'corr', 'rt', 'corr_valido' e 'targetfoil_valido',
+            sem cópia dos dados
+        """
+        if not isinstance(participante, (int, np.integer)):
+            participante = self.indice(participante)
+        primeiro = len(TEMPOS) * participante
+        if sessao is None:
+            inicio, fim = self.offsets[primeiro], self.offsets[primeiro + len(TEMPOS)]
+        else:
+            inicio, fim = self.offsets[primeiro + sessao], self.offsets[primeiro + sessao + 1]
+        return {campo: getattr(self, campo)[inicio:fim]
+                for campo in ['sessao', 'length', 'targetfoil', 'corr', 'rt', 'corr_valido', 'targetfoil_valido']}
+
+    def para_dataframe(self):
+        """
+        Converte os trials para uma tabela longa (uma linha por trial)
+
+        Returns:
+            pd.DataFrame: Colunas participant, time (T0, T1, T2), length, targetfoil (T/F), corr (0, 1 ou
+            CORR_OUTRO) e rt, com valores ausentes onde o campo não foi preenchido
+        """
+        return pd.DataFrame({
+            'participant': self.participantes[self.codigo],
+            'time': pd.Categorical.from_codes(self.sessao, TEMPOS),
+            'length': pd.arrays.IntegerArray(self.length, self.length == LENGTH_AUSENTE),
+            'targetfoil': np.where(self.targetfoil_valido, np.where(self.targetfoil, 'T', 'F'), None),
+            'corr': pd.arrays.IntegerArray(self.corr, ~self.corr_valido),
+            'rt': self.rt
+        })
@@ -0,0 +1,728 @@
+import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dados_longos import TEMPOS
+
+# scipy.stats é importado dentro das funções que o usam: sua importação leva perto de um segundo,
+# e execuções que pedem só parte da bateria (ou encontram tudo no cache) não precisam dele
+
+# Pares de tempos comparados no post-hoc (índices em TEMPOS), na ordem do relatório
+PARES_TEMPOS = [(0, 1), (0, 2), (1, 2)]
+
+def _media_dp(valores, mascara):
+    """
+    Média e desvio-padrão amostral (ddof=1) ao longo dos participantes, considerando só a máscara
+    """
+    n = mascara.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.where(mascara, valores, 0.0).sum(axis=1) / n
+        desvios = np.where(mascara, valores - media[:, np.newaxis], 0.0)
+        dp = np.sqrt((desvios ** 2).sum(axis=1) / (n - 1))
+    return media, dp, n
+
+def _teste_t_pareado(x, y, mascara):
+    """
+    Teste t pareado vetorizado (uma comparação por variável) nos participantes da máscara
+
+    Returns:
+        dict com médias, desvios, diferença média, T, p, graus de liberdade e n
+    """
+    from scipy import stats
+    media_x, dp_x, n = _media_dp(x, mascara)
+    media_y, dp_y, _ = _media_dp(y, mascara)
+    media_dif, dp_dif, _ = _media_dp(x - y, mascara)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_stat = media_dif / (dp_dif / np.sqrt(n))
+        p_value = 2 * stats.t.sf(np.abs(t_stat), n - 1)
+    return {
+        'media_x': media_x, 'media_y': media_y, 'dp_x': dp_x, 'dp_y': dp_y,
+        'media_dif': media_dif, 'dp_dif': dp_dif, 't': t_stat, 'p': p_value, 'n': n
+    }
+
+def _correcao_holm(p_values, n_comparacoes):
+    """
+    Correção de Holm por linha (família de comparações de cada variável); NaN é ignorado
+    """
+    ordem = np.argsort(p_values, axis=1)  # NaN fica no final
+    ordenados = np.take_along_axis(p_values, ordem, axis=1)
+    multiplicadores = n_comparacoes[:, np.newaxis] - np.arange(p_values.shape[1])[np.newaxis, :]
+    ajustados = np.minimum(np.maximum.accumulate(ordenados * multiplicadores, axis=1), 1.0)
+    resultado = np.empty_like(p_values)
+    np.put_along_axis(resultado, ordem, ajustados, axis=1)
+    return resultado
+
+def _mascaras(cubo):
+    """
+    Máscaras de valores presentes, tempos presentes e participantes completos de cada variável
+
+    Participante completo: tem valor em todos os tempos presentes na variável
+    (exclusão listwise, como no pingouin).
+    """
+    presente = ~np.isnan(cubo)
+    tempo_presente = presente.any(axis=1)
+    completo = (presente | ~tempo_presente[:, np.newaxis, :]).all(axis=2)
+    return presente, tempo_presente, completo
+
+def _colunas_do_cubo(cubo, variaveis, colunas=None):
+    """
+    Achata o cubo em uma matriz participante x coluna (variável, tempo), só com as colunas existentes
+
+    Returns:
+        tuple: (matriz (participantes, colunas), nomes das variáveis, tempos) das colunas
+    """
+    n_variaveis, n_participantes, n_tempos = cubo.shape
+    if colunas is None:
+        colunas = np.ones((n_variaveis, n_tempos), dtype=bool)
+    selecionadas = colunas.ravel()
+    matriz = cubo.transpose(1, 0, 2).reshape(n_participantes, n_variaveis * n_tempos)[:, selecionadas]
+    nomes = np.repeat(np.asarray(variaveis, dtype=object), n_tempos)[selecionadas]
+    tempos = np.tile(np.asarray(TEMPOS, dtype=object), n_variaveis)[selecionadas]
+    return matriz, nomes, tempos
+
+def _separar_por_variavel(tabela, variaveis):
+    """
+    Separa uma tabela com coluna 'Variavel' em {variavel: DataFrame} (vazio se a variável não tiver linhas)
+    """
+    por_variavel = {variavel: grupo.reset_index(drop=True)
+                    for variavel, grupo in tabela.groupby('Variavel', sort=False)} if len(tabela) else {}
+    return {variavel: por_variavel.get(variavel, pd.DataFrame()) for variavel in variaveis}
+
+def _grupos_de_tempos(tempo_presente):
+    """
+    Agrupa as variáveis pelo conjunto de tempos presentes
+
+    Yields:
+        tuple: (índices das variáveis, máscara booleana dos tempos presentes)
+    """
+    for padrao in np.unique(tempo_presente, axis=0):
+        yield np.nonzero((tempo_presente == padrao).all(axis=1))[0], padrao
+
+def _contrastes_ortonormais(k):
+    """
+    Matriz k x (k-1) de contrastes de Helmert ortonormais
+    """
+    contrastes = np.zeros((k, k - 1))
+    for j in range(1, k):
+        contrastes[:j, j - 1] = 1.0
+        contrastes[j, j - 1] = -j
+        contrastes[:, j - 1] /= np.linalg.norm(contrastes[:, j - 1])
+    return contrastes
+
+def _covariancias(valores, mascara):
+    """
+    Matrizes de covariância (ddof=1) entre tempos, por variável, usando só os participantes da máscara
+
+    Args:
+        valores (np.ndarray): Array (variáveis, participantes, tempos)
+        mascara (np.ndarray): Array booleano (variáveis, participantes)
+
+    Returns:
+        np.ndarray: Array (variáveis, tempos, tempos)
+    """
+    n = mascara.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.where(mascara[:, :, np.newaxis], valores, 0.0).sum(axis=1) / n[:, np.newaxis]
+        centrado = np.where(mascara[:, :, np.newaxis], valores - media[:, np.newaxis, :], 0.0)
+        return np.einsum('vpi,vpj->vij', centrado, centrado) / (n - 1)[:, np.newaxis, np.newaxis]
+
+def calcular_esfericidade(cubo):
+    """
+    Teste de Mauchly e epsilons de Greenhouse-Geisser e Huynh-Feldt para todas as variáveis
+
+    Usa a matriz de covariância dos contrastes ortonormais entre os tempos
+    presentes, calculada só com os participantes completos (como o
+    pingouin.sphericity/pingouin.epsilon). Com 2 tempos a esfericidade é
+    sempre atendida (p = 1, epsilons = 1).
+
+    Args:
+        cubo (np.ndarray): Array (variáveis, participantes, tempos) com NaN para ausentes
+
+    Returns:
+        dict: Arrays por variável 'n_completos', 'W', 'chi2', 'p', 'eps_GG' e 'eps_HF'
+    """
+    from scipy import stats
+    _, tempo_presente, completo = _mascaras(cubo)
+    n_variaveis = cubo.shape[0]
+    n_completos = completo.sum(axis=1)
+    resultado = {nome: np.full(n_variaveis, np.nan) for nome in ['W', 'chi2', 'p', 'eps_GG', 'eps_HF']}
+    resultado['n_completos'] = n_completos
+
+    for idx, padrao in _grupos_de_tempos(tempo_presente):
+        k = int(padrao.sum())
+        if k < 2:
+            continue
+        if k == 2:
+            resultado['p'][idx] = 1.0
+            resultado['eps_GG'][idx] = 1.0
+            resultado['eps_HF'][idx] = 1.0
+            continue
+
+        d = k - 1
+        n = n_completos[idx].astype(float)
+        covariancia = _covariancias(cubo[idx][:, :, padrao], completo[idx])
+        contrastes = _contrastes_ortonormais(k)
+        matriz = contrastes.T @ np.nan_to_num(covariancia) @ contrastes
+        validos = n >= 2
+
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            # Mauchly: autovalores muito pequenos são descartados, como no pingouin
+            autovalores = np.linalg.eigvalsh(matriz)
+            usados = autovalores > 0.001
+            W = np.where(usados, autovalores, 1.0).prod(axis=1) / (np.where(usados, autovalores, 0.0).sum(axis=1) / d) ** d
+            # Sem nenhum autovalor acima do limite, o pingouin obtém W = 1 / 0 = inf (qui-quadrado
+            # -inf e p = 1); o mesmo resultado é fixado aqui em vez de depender da divisão por zero
+            W = np.where(usados.any(axis=1), W, np.inf)
+            f = 1 - (2 * d ** 2 + d + 2) / (6 * d * (n - 1))
+            w2 = ((d + 2) * (d - 1) * (d - 2) * (2 * d ** 3 + 6 * d ** 2 + 3 * k + 2)
+                  / (288 * ((n - 1) * d * f) ** 2))
+            chi2 = -(n - 1) * f * np.log(W)
+            gl = max(d * (d + 1) / 2 - 1, 1)
+            p1 = stats.chi2.sf(chi2, gl)
+            p2 = stats.chi2.sf(chi2, gl + 4)
+
+            traco = np.trace(matriz, axis1=1, axis2=2)
+            eps_gg = np.minimum(traco ** 2 / (d * (matriz ** 2).sum(axis=(1, 2))), 1.0)
+            eps_hf = np.minimum((n * d * eps_gg - 2) / (d * (n - 1 - d * eps_gg)), 1.0)
+
+        resultado['W'][idx] = np.where(validos, W, np.nan)
+        resultado['chi2'][idx] = np.where(validos, chi2, np.nan)
+        resultado['p'][idx] = np.where(validos, p1 + w2 * (p2 - p1), np.nan)
+        resultado['eps_GG'][idx] = np.where(validos, eps_gg, np.nan)
+        resultado['eps_HF'][idx] = np.where(validos, eps_hf, np.nan)
+
+    return resultado
+
+def calcular_rm_anova(cubo, esfericidade=None, residuos=False):
+    """
+    ANOVA de medidas repetidas de um fator (tempo) para todas as variáveis
+
+    Usa os participantes completos nos tempos presentes (como o
+    pingouin.rm_anova). Além do p sem correção, retorna os p corrigidos por
+    Greenhouse-Geisser e Huynh-Feldt.
+
+    Args:
+        cubo (np.ndarray): Array (variáveis, participantes, tempos) com NaN para ausentes
+        esfericidade (dict): Resultado de calcular_esfericidade (calculado se não informado)
+        residuos (bool): Se deve retornar também os resíduos do modelo, obtidos das
+            médias já calculadas para as somas de quadrados (sem reajuste)
+
+    Returns:
+        dict: Arrays por variável 'n_tempos', 'n_completos', 'F', 'ddof1', 'ddof2',
+        'p', 'ng2', 'p_GG' e 'p_HF'; com residuos=True, também 'residuos', um
+        array no formato do cubo (NaN fora dos participantes completos e tempos presentes)
+    """
+    from scipy import stats
+    if esfericidade is None:
+        esfericidade = calcular_esfericidade(cubo)
+    _, tempo_presente, completo = _mascaras(cubo)
+    n_variaveis = cubo.shape[0]
+    n_completos = completo.sum(axis=1)
+    resultado = {nome: np.full(n_variaveis, np.nan) for nome in ['F', 'ddof1', 'ddof2', 'p', 'ng2', 'p_GG', 'p_HF']}
+    resultado['n_tempos'] = tempo_presente.sum(axis=1)
+    resultado['n_completos'] = n_completos
+    if residuos:
+        resultado['residuos'] = np.full(cubo.shape, np.nan)
+
+    for idx, padrao in _grupos_de_tempos(tempo_presente):
+        k = int(padrao.sum())
+        if k < 2:
+            continue
+        valores = cubo[idx][:, :, padrao]
+        mascara = np.broadcast_to(completo[idx][:, :, np.newaxis], valores.shape)
+        n = n_completos[idx].astype(float)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media_tempo = np.where(mascara, valores, 0.0).sum(axis=1) / n[:, np.newaxis]
+            media_geral = media_tempo.mean(axis=1)
+            media_participante = np.where(mascara, valores, 0.0).sum(axis=2) / k
+
+            ss_tempo = n * ((media_tempo - media_geral[:, np.newaxis]) ** 2).sum(axis=1)
+            ss_residuo_total = (np.where(mascara, valores - media_tempo[:, np.newaxis, :], 0.0) ** 2).sum(axis=(1, 2))
+            ss_participantes = k * (np.where(completo[idx], media_participante - media_geral[:, np.newaxis], 0.0) ** 2).sum(axis=1)
+            ss_erro = ss_residuo_total - ss_participantes
+
+            ddof1 = k - 1
+            ddof2 = ddof1 * (n - 1)
+            f_valor = (ss_tempo / ddof1) / (ss_erro / ddof2)
+
+            resultado['F'][idx] = f_valor
+            resultado['ddof1'][idx] = ddof1
+            resultado['ddof2'][idx] = ddof2
+            resultado['p'][idx] = stats.f.sf(f_valor, ddof1, ddof2)
+            resultado['ng2'][idx] = ss_tempo / (ss_tempo + ss_residuo_total)
+
+            # Graus de liberdade corrigidos pelos epsilons (mínimo 1, como no pingouin)
+            for correcao in ['GG', 'HF']:
+                eps = esfericidade[f'eps_{correcao}'][idx]
+                resultado[f'p_{correcao}'][idx] = stats.f.sf(
+                    f_valor, np.maximum(ddof1 * eps, 1.0), np.maximum(ddof2 * eps, 1.0))
+
+            if residuos:
+                # Resíduos centrados no participante: valor - média do participante - média do tempo + média geral
+                residuo = (valores - media_participante[:, :, np.newaxis] - media_tempo[:, np.newaxis, :]
+                           + media_geral[:, np.newaxis, np.newaxis])
+                bloco = resultado['residuos'][idx]
+                bloco[:, :, padrao] = np.where(mascara, residuo, np.nan)
+                resultado['residuos'][idx] = bloco
+
+    return resultado
+
+def esfericidade_lote(cubo, variaveis, alpha=0.05):
+    """
+    Teste de esfericidade para todas as variáveis, no formato de testar_esfericidade_variavel
+
+    Args:
+        cubo (np.ndarray): Array (variáveis, participantes, tempos) com NaN para ausentes
+        variaveis (list): Nomes das variáveis, na ordem do cubo
+        alpha (float): Nível de significância do teste de Mauchly
+
+    Returns:
+        dict: {variavel: dict} com Mauchly_W, Mauchly_p, Esferico, Correcao_GG
+        e Correcao_HF (epsilons), ou 'Erro'
+    """
+    presente, tempo_presente, _ = _mascaras(cubo)
+    n_tempos = tempo_presente.sum(axis=1)
+    participantes_por_tempo = np.where(tempo_presente, presente.sum(axis=1), np.iinfo(int).max).min(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        desvio = np.nanstd(np.where(presente, cubo, np.nan).reshape(len(variaveis), -1), axis=1, ddof=1)
+    esfericidade = calcular_esfericidade(cubo)
+
+    resultados = {}
+    for i, variavel in enumerate(variaveis):
+        if n_tempos[i] == 0:
+            resultados[variavel] = {'Variavel': variavel, 'Erro': 'Sem dados válidos'}
+        elif n_tempos[i] < 3:
+            resultados[variavel] = {'Variavel': variavel, 'Erro': f'Apenas {n_tempos[i]} tempos encontrados. Necessário 3.'}
+        elif participantes_por_tempo[i] < 3:
+            resultados[variavel] = {'Variavel': variavel, 'Erro': f'Mínimo de participantes insuficiente: {participantes_por_tempo[i]}'}
+        elif desvio[i] == 0:
+            resultados[variavel] = {'Variavel': variavel, 'Erro': 'Sem variabilidade nos dados'}
+        elif esfericidade['n_completos'][i] < 2:
+            resultados[variavel] = {'Variavel': variavel, 'Erro': f'Participantes completos insuficientes: {esfericidade["n_completos"][i]}'}
+        else:
+            p_value = esfericidade['p'][i]
+            resultados[variavel] = {
+                'Variavel': variavel,
+                'Mauchly_W': esfericidade['W'][i],
+                'Mauchly_p': p_value,
+                'Esferico': 'Sim' if p_value > alpha else 'Não',
+                'Correcao_GG': esfericidade['eps_GG'][i],
+                'Correcao_HF': esfericidade['eps_HF'][i]
+            }
+    return resultados
+
+def anova_lote(cubo, variaveis, alpha=0.05, anova=None):
+    """
+    ANOVA de medidas repetidas para todas as variáveis, no formato de anova_variavel
+
+    Args:
+        cubo (np.ndarray): Array (variáveis, participantes, tempos) com NaN para ausentes
+        variaveis (list): Nomes das variáveis, na ordem do cubo
+        alpha (float): Nível de significância
+        anova (dict): Resultado de calcular_rm_anova para o mesmo cubo (calculado se não informado)
+
+    Returns:
+        dict: {variavel: dict} com F, p_value, p_GG, p_HF, partial_eta_squared
+        (eta² generalizado), significativo e tamanho_efeito, ou 'Erro'
+    """
+    if anova is None:
+        anova = calcular_rm_anova(cubo)
+
+    resultados = {}
+    for i, variavel in enumerate(variaveis):
+        if anova['n_tempos'][i] == 0:
+            resultados[variavel] = {'Variavel': variavel, 'Erro': 'Sem dados válidos'}
+        elif anova['n_tempos'][i] < 2 or anova['n_completos'][i] < 2:
+            resultados[variavel] = {'Variavel': variavel, 'Erro': 'Participantes completos insuficientes para a ANOVA'}
+        else:
+            p_value = anova['p'][i]
+            eta = anova['ng2'][i]
+            resultados[variavel] = {
+                'Variavel': variavel,
+                'F': anova['F'][i],
+                'p_value': p_value,
+                'p_GG': anova['p_GG'][i],
+                'p_HF': anova['p_HF'][i],
+                'partial_eta_squared': eta,
+                'significativo': 'Sim' if p_value < alpha else 'Não',
+                'tamanho_efeito': 'Grande' if eta >= 0.14 else 'Médio' if eta >= 0.06 else 'Pequeno'
+            }
+    return resultados
+
+def _testes_residuos(residuos):
+    """
+    Shapiro-Wilk, D'Agostino-Pearson e dados do gráfico Q-Q normal dos resíduos válidos de uma variável
+    """
+    from scipy import stats
+    residuos = residuos[~np.isnan(residuos)]
+    n, shapiro_stat, shapiro_p, dagostino_stat, dagostino_p = _testes_normalidade_coluna(residuos)
+    if n >= 3:
+        (quantis, ordenados), (_, _, r_qq) = stats.probplot(residuos, dist='norm')
+    else:
+        quantis, ordenados, r_qq = np.empty(0), np.empty(0), np.nan
+    return n, shapiro_stat, shapiro_p, dagostino_stat, dagostino_p, r_qq, quantis, ordenados
+
+def residuos_lote(cubo, variaveis, alpha=0.05, anova=None, n_threads=None):
+    """
+    Normalidade dos resíduos da ANOVA de medidas repetidas para todas as variáveis
+
+    Em medidas repetidas o pressuposto de normalidade vale para os resíduos
+    do modelo, e não para os valores brutos de cada tempo. Os resíduos
+    centrados no participante vêm da mesma decomposição da ANOVA
+    (calcular_rm_anova com residuos=True), sem reajustar o modelo. Os testes
+    de cada variável rodam em um pool de threads.
+
+    Args:
+        cubo (np.ndarray): Array (variáveis, participantes, tempos) com NaN para ausentes
+        variaveis (list): Nomes das variáveis, na ordem do cubo
+        alpha (float): Nível de significância
+        anova (dict): Resultado de calcular_rm_anova(cubo, residuos=True) (calculado se não informado)
+        n_threads (int): Número de threads (padrão do ThreadPoolExecutor se None)
+
+    Returns:
+        dict: {variavel: {'normalidade': dict, 'qq': pd.DataFrame}}. 'normalidade' tem
+        n_residuos, Shapiro_Stat, Shapiro_p, Normal, DAgostino_Stat, DAgostino_p e
+        QQ_r (correlação do gráfico Q-Q), ou 'Erro'; 'qq' tem os quantis teóricos
+        e os resíduos ordenados
+    """
+    if anova is None or 'residuos' not in anova:
+        anova = calcular_rm_anova(cubo, residuos=True)
+    residuos = anova['residuos'].reshape(len(variaveis), -1)
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        testes = list(executor.map(_testes_residuos, residuos))
+
+    resultados = {}
+    for i, variavel in enumerate(variaveis):
+        n, shapiro_stat, shapiro_p, dagostino_stat, dagostino_p, r_qq, quantis, ordenados = testes[i]
+        if anova['n_tempos'][i] == 0:
+            normalidade = {'Variavel': variavel, 'Erro': 'Sem dados válidos'}
+        elif anova['n_tempos'][i] < 2 or anova['n_completos'][i] < 2:
+            normalidade = {'Variavel': variavel, 'Erro': 'Participantes completos insuficientes para a ANOVA'}
+        elif n < 3:
+            normalidade = {'Variavel': variavel, 'Erro': f'Resíduos insuficientes: {n}'}
+        else:
+            normalidade = {
+                'Variavel': variavel,
+                'n_residuos': n,
+                'Shapiro_Stat': shapiro_stat,
+                'Shapiro_p': shapiro_p,
+                'Normal': 'Sim' if shapiro_p > alpha else 'Não',
+                'DAgostino_Stat': dagostino_stat,
+                'DAgostino_p': dagostino_p,
+                'QQ_r': r_qq
+            }
+        qq = pd.DataFrame({
+            'Variavel': variavel,
+            'Ordem': np.arange(1, len(ordenados) + 1),
+            'Quantil_teorico': quantis,
+            'Residuo': ordenados
+        }) if 'Erro' not in normalidade else pd.DataFrame()
+        resultados[variavel] = {'normalidade': normalidade, 'qq': qq}
+    return resultados
+
+def _testes_normalidade_coluna(valores):
+    """
+    Shapiro-Wilk (n >= 3) e D'Agostino-Pearson (n >= 8) dos valores válidos de uma coluna
+    """
+    from scipy.stats import shapiro, normaltest
+    valores = valores[~np.isnan(valores)]
+    shapiro_stat = shapiro_p = dagostino_stat = dagostino_p = np.nan
+    if len(valores) >= 3:
+        shapiro_stat, shapiro_p = shapiro(valores)
+    if len(valores) >= 8:
+        dagostino_stat, dagostino_p = normaltest(valores)
+    return len(valores), shapiro_stat, shapiro_p, dagostino_stat, dagostino_p
+
+def normalidade_lote(cubo, variaveis, colunas=None, alpha=0.05, n_threads=None):
+    """
+    Testes de normalidade de todas as colunas (variável, tempo) de uma só vez
+
+    Os testes de cada coluna rodam em um pool de threads. A saída segue o
+    formato de testar_normalidade_variavel ('Normal' pelo Shapiro-Wilk), com
+    as colunas adicionais do teste de D'Agostino-Pearson.
+
+    Args:
+        cubo (np.ndarray): Array (variáveis, participantes, tempos) com NaN para ausentes
+        variaveis (list): Nomes das variáveis, na ordem do cubo
+        colunas (np.ndarray): Tempos com coluna existente (ver colunas_existentes); padrão: todos
+        alpha (float): Nível de significância
+        n_threads (int): Número de threads (padrão do ThreadPoolExecutor se None)
+
+    Returns:
+        dict: {variavel: pd.DataFrame} com uma linha por tempo
+    """
+    matriz, nomes, tempos = _colunas_do_cubo(cubo, variaveis, colunas)
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        testes = np.array(list(executor.map(_testes_normalidade_coluna, matriz.T)), dtype=float).reshape(-1, 5)
+    n = testes[:, 0].astype(int)
+    shapiro_p = testes[:, 2]
+
+    tabela = pd.DataFrame({
+        'Variavel': nomes,
+        'Tempo': tempos,
+        'n': n,
+        'Shapiro_Stat': testes[:, 1],
+        'Shapiro_p': shapiro_p,
+        'Normal': np.where(n < 3, 'Dados insuficientes', np.where(shapiro_p > alpha, 'Sim', 'Não')),
+        'DAgostino_Stat': testes[:, 3],
+        'DAgostino_p': testes[:, 4]
+    })
+    return _separar_por_variavel(tabela, variaveis)
+
+def descritivas_lote(cubo, variaveis, colunas=None):
+    """
+    Estatísticas descritivas de todas as células variável x tempo em uma única passada vetorizada
+
+    Segue as convenções do pandas (describe/skew/kurt): desvio-padrão com
+    ddof=1, quartis por interpolação linear, assimetria e curtose (excesso)
+    com correção de viés, NaN ignorado. Assimetria exige n >= 3 e curtose
+    n >= 4; ambas valem 0 para colunas constantes.
+
+    Args:
+        cubo (np.ndarray): Array (variáveis, participantes, tempos) com NaN para ausentes
+        variaveis (list): Nomes das variáveis, na ordem do cubo
+        colunas (np.ndarray): Tempos com coluna existente (ver colunas_existentes); padrão: todos
+
+    Returns:
+        pd.DataFrame: Uma linha por variável e tempo (colunas existentes, inclusive sem
+        dados válidos), com n, media, desvio_padrao, erro_padrao, min, Q1, mediana, Q3,
+        max, assimetria e curtose
+    """
+    matriz, nomes, tempos = _colunas_do_cubo(cubo, variaveis, colunas)
+    validos = ~np.isnan(matriz)
+    n = validos.sum(axis=0)
+    n_float = n.astype(float)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.where(validos, matriz, 0.0).sum(axis=0) / n
+        desvios = np.where(validos, matriz - media, 0.0)
+        m2 = (desvios ** 2).sum(axis=0)
+        m3 = (desvios ** 3).sum(axis=0)
+        m4 = (desvios ** 4).sum(axis=0)
+        desvio_padrao = np.where(n > 1, np.sqrt(m2 / (n - 1)), np.nan)
+
+        # Momentos praticamente nulos são erro de ponto flutuante (como em pandas.core.nanops)
+        m2 = np.where(np.abs(m2) < 1e-14, 0.0, m2)
+        m3 = np.where(np.abs(m3) < 1e-14, 0.0, m3)
+        m4 = np.where(np.abs(m4) < 1e-14, 0.0, m4)
+        assimetria = (n_float * np.sqrt(n_float - 1) / (n_float - 2)) * (m3 / m2 ** 1.5)
+        assimetria = np.where(n < 3, np.nan, np.where(m2 == 0, 0.0, assimetria))
+        denominador = (n_float - 2) * (n_float - 3) * m2 ** 2
+        curtose = (n_float * (n_float + 1) * (n_float - 1) * m4 / denominador
+                   - 3 * (n_float - 1) ** 2 / ((n_float - 2) * (n_float - 3)))
+        curtose = np.where(n < 4, np.nan, np.where(denominador == 0, 0.0, curtose))
+
+        # Quantis (mínimo, quartis, máximo) só das colunas com algum valor válido
+        quantis = np.full((5, matriz.shape[1]), np.nan)
+        com_dados = n > 0
+        if com_dados.any():
+            quantis[:, com_dados] = np.nanquantile(matriz[:, com_dados], [0.0, 0.25, 0.5, 0.75, 1.0], axis=0)
+        minimo, q1, mediana, q3, maximo = quantis
+        erro_padrao = desvio_padrao / np.sqrt(n_float)
+
+    return pd.DataFrame({
+        'Variavel': nomes,
+        'Tempo': tempos,
+        'n': n,
+        'media': media,
+        'desvio_padrao': desvio_padrao,
+        'erro_padrao': erro_padrao,
+        'min': minimo,
+        'Q1': q1,
+        'mediana': mediana,
+        'Q3': q3,
+        'max': maximo,
+        'assimetria': assimetria,
+        'curtose': curtose
+    })
+
+def outliers_lote(cubo, variaveis, colunas=None, descritivas=None):
+    """
+    Detecção de outliers por IQR (1,5 x IQR) e Z-score (|z| > 3) de todas as colunas de uma só vez
+
+    Quartis, médias e desvios vêm da tabela de descritivas_lote (a mesma
+    usada nos relatórios), com as convenções do pandas/scipy (quartis por
+    interpolação linear, z-score com ddof=0). Colunas sem nenhum valor válido
+    não aparecem na saída.
+
+    Args:
+        cubo (np.ndarray): Array (variáveis, participantes, tempos) com NaN para ausentes
+        variaveis (list): Nomes das variáveis, na ordem do cubo
+        colunas (np.ndarray): Tempos com coluna existente (ver colunas_existentes); padrão: todos
+        descritivas (pd.DataFrame): Resultado de descritivas_lote para o mesmo cubo e
+            colunas (calculado se não for informado)
+
+    Returns:
+        dict: {variavel: pd.DataFrame} no formato de detectar_outliers_variavel
+    """
+    if descritivas is None:
+        descritivas = descritivas_lote(cubo, variaveis, colunas)
+    matriz, _, _ = _colunas_do_cubo(cubo, variaveis, colunas)
+    com_dados = descritivas['n'].to_numpy() > 0
+    matriz, descritivas = matriz[:, com_dados], descritivas[com_dados]
+    n = descritivas['n'].to_numpy()
+    media = descritivas['media'].to_numpy()
+    desvio_padrao = descritivas['desvio_padrao'].to_numpy()
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        q1, q3 = descritivas['Q1'].to_numpy(), descritivas['Q3'].to_numpy()
+        iqr = q3 - q1
+        outliers_iqr = ((matriz < q1 - 1.5 * iqr) | (matriz > q3 + 1.5 * iqr)).sum(axis=0)
+
+        validos = ~np.isnan(matriz)
+        desvios = np.where(validos, matriz - media, 0.0)
+        dp_populacional = np.sqrt((desvios ** 2).sum(axis=0) / n)
+        z_scores = np.abs(desvios / dp_populacional)
+        outliers_z = np.where(n > 1, (validos & (z_scores > 3)).sum(axis=0), 0)
+
+    tabela = pd.DataFrame({
+        'Variavel': descritivas['Variavel'].to_numpy(),
+        'Tempo': descritivas['Tempo'].to_numpy(),
+        'n_total': n,
+        'outliers_IQR': outliers_iqr,
+        'outliers_Zscore': outliers_z,
+        'percent_outliers_IQR': outliers_iqr / n * 100,
+        'percent_outliers_Zscore': outliers_z / n * 100,
+        'media': media,
+        'desvio_padrao': desvio_padrao,
+        'min': descritivas['min'].to_numpy(),
+        'max': descritivas['max'].to_numpy()
+    })
+    return _separar_por_variavel(tabela, variaveis)
+
+def descritivas_formato_describe(descritivas, variavel):
+    """
+    Tabela de uma variável no formato de DataFrame.describe() (estatísticas nas linhas, tempos nas colunas)
+
+    Args:
+        descritivas (pd.DataFrame): Resultado de descritivas_lote
+        variavel (str): Nome da variável
+
+    Returns:
+        pd.DataFrame: Índice 'Estatistica' (count, mean, std, min, 25%, 50%, 75%, max)
+    """
+    linhas = descritivas[descritivas['Variavel'] == variavel].set_index('Tempo')
+    tabela = pd.DataFrame({
+        'count': linhas['n'].astype(float),
+        'mean': linhas['media'],
+        'std': linhas['desvio_padrao'],
+        'min': linhas['min'],
+        '25%': linhas['Q1'],
+        '50%': linhas['mediana'],
+        '75%': linhas['Q3'],
+        'max': linhas['max']
+    }).T
+    tabela.index.name = 'Estatistica'
+    tabela.columns.name = None
+    return tabela
+
+def posthoc_lote(cubo, variaveis, alpha=0.05):
+    """
+    Comparações post-hoc pareadas entre os tempos para todas as variáveis de uma só vez.
+
+    Trabalha sobre a matriz participante x tempo de cada variável. T, p e o
+    tamanho de efeito (Hedges g) usam os participantes completos em todos os
+    tempos presentes (exclusão listwise, como o pingouin.pairwise_ttests); a
+    diferença de médias e o IC 95% usam os participantes em comum de cada par.
+    Com menos de 2 participantes completos, T, p e o tamanho de efeito (d_z)
+    passam a usar os participantes em comum de cada par (mínimo de 3), como
+    no método manual com scipy.
+
+    Args:
+        cubo (np.ndarray): Array (variáveis, participantes, tempos) com NaN para ausentes
+        variaveis (list): Nomes das variáveis, na ordem do cubo
+        alpha (float): Nível de significância para as p corrigidas
+
+    Returns:
+        dict: {variavel: pd.DataFrame} no formato de comparacoes_post_hoc_variavel,
+        com as colunas adicionais 'P_holm' e 'Cohen_dz'
+    """
+    from scipy import stats
+    presente, tempo_presente, completo = _mascaras(cubo)
+    n_tempos = tempo_presente.sum(axis=1)
+    n_comparacoes = n_tempos * (n_tempos - 1) // 2
+
+    modo_listwise = completo.sum(axis=1) >= 2
+
+    colunas = {nome: [] for nome in ['incluir', 'Diferenca_medias', 'IC_inferior', 'IC_superior',
+                                     'T_statistic', 'p_value', 'Tamanho_efeito', 'Cohen_dz']}
+
+    for a, b in PARES_TEMPOS:
+        x = cubo[:, :, a]
+        y = cubo[:, :, b]
+        par_valido = tempo_presente[:, a] & tempo_presente[:, b]
+
+        # Participantes em comum no par: diferença de médias e IC 95%
+        comum = presente[:, :, a] & presente[:, :, b]
+        par = _teste_t_pareado(x, y, comum)
+        n_comum = par['n']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            gl = np.maximum(n_comum - 1, 1)
+            t_critico = stats.t.ppf(0.975, gl)
+            se_dif = par['dp_dif'] / np.sqrt(n_comum)
+        suficiente = n_comum >= 3
+        diff_medias = np.where(suficiente, par['media_x'] - par['media_y'], np.nan)
+        ic_inferior = np.where(suficiente, diff_medias - t_critico * se_dif, np.nan)
+        ic_superior = np.where(suficiente, diff_medias + t_critico * se_dif, np.nan)
+
+        # d_z nos participantes em comum (método manual): 0 se não calculável
+        with np.errstate(invalid='ignore', divide='ignore'):
+            dz_comum = np.where((n_comum > 1) & (par['dp_dif'] > 0), par['media_dif'] / par['dp_dif'], 0.0)
+
+        # Participantes completos (listwise): T, p, Hedges g e d_z
+        lw = _teste_t_pareado(x, y, completo)
+        n_lw = lw['n']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cohen_d_av = (lw['media_x'] - lw['media_y']) / np.sqrt((lw['dp_x'] ** 2 + lw['dp_y'] ** 2) / 2)
+            hedges = cohen_d_av * (1 - 3 / (4 * (2 * n_lw) - 9))
+            hedges = np.where(np.isnan(hedges), lw['t'] / np.sqrt(n_lw), hedges)
+            dz_lw = lw['media_dif'] / lw['dp_dif']
+
+        colunas['incluir'].append(np.where(modo_listwise, par_valido, par_valido & suficiente))
+        colunas['Diferenca_medias'].append(diff_medias)
+        colunas['IC_inferior'].append(ic_inferior)
+        colunas['IC_superior'].append(ic_superior)
+        colunas['T_statistic'].append(np.where(modo_listwise, lw['t'], par['t']))
+        colunas['p_value'].append(np.where(modo_listwise, lw['p'], par['p']))
+        colunas['Tamanho_efeito'].append(np.where(modo_listwise, hedges, dz_comum))
+        colunas['Cohen_dz'].append(np.where(modo_listwise, dz_lw, dz_comum))
+
+    # Arrays (variáveis, pares)
+    matrizes = {nome: np.column_stack(valores) for nome, valores in colunas.items()}
+    incluir = matrizes.pop('incluir')
+    p_values = np.where(incluir, matrizes['p_value'], np.nan)
+
+    # Correções para comparações múltiplas dentro de cada variável
+    matrizes['P_corrigido'] = np.minimum(p_values * n_comparacoes[:, np.newaxis], 1.0)
+    matrizes['P_holm'] = _correcao_holm(p_values, n_comparacoes)
+
+    # Montar uma tabela única e separar por variável
+    idx_variavel, idx_par = np.nonzero(incluir)
+    comparacoes = np.array([f'{TEMPOS[a]} vs {TEMPOS[b]}' for a, b in PARES_TEMPOS])
+    tabela = pd.DataFrame({
+        'Variavel': np.asarray(variaveis, dtype=object)[idx_variavel],
+        'Comparacao': comparacoes[idx_par],
+        'Diferenca_medias': matrizes['Diferenca_medias'][idx_variavel, idx_par],
+        'P_corrigido': matrizes['P_corrigido'][idx_variavel, idx_par],
+        'IC_inferior': matrizes['IC_inferior'][idx_variavel, idx_par],
+        'IC_superior': matrizes['IC_superior'][idx_variavel, idx_par],
+        'T_statistic': matrizes['T_statistic'][idx_variavel, idx_par],
+        'p_value': matrizes['p_value'][idx_variavel, idx_par],
+        'Significativo': np.where(matrizes['P_corrigido'][idx_variavel, idx_par] < alpha, 'Sim', 'Não'),
+        'Tamanho_efeito': matrizes['Tamanho_efeito'][idx_variavel, idx_par],
+        'P_holm': matrizes['P_holm'][idx_variavel, idx_par],
+        'Cohen_dz': matrizes['Cohen_dz'][idx_variavel, idx_par]
+    })
+    por_variavel = {i: grupo.reset_index(drop=True) for i, grupo in tabela.groupby(idx_variavel, sort=False)}
+
+    resultados = {}
+    for i, variavel in enumerate(variaveis):
+        if n_tempos[i] == 0:
+            resultados[variavel] = pd.DataFrame([{'Variavel': variavel, 'Erro': 'Sem dados válidos'}])
+        elif n_tempos[i] < 2:
+            resultados[variavel] = pd.DataFrame([{'Variavel': variavel, 'Erro': f'Apenas {n_tempos[i]} tempos encontrados. Necessário pelo menos 2.'}])
+        elif i not in por_variavel:
+            resultados[variavel] = pd.DataFrame([{'Variavel': variavel, 'Erro': 'Não foi possível realizar comparações manuais'}])
+        else:
+            resultados[variavel] = por_variavel[i]
+    return resultados
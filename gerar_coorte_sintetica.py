@@ -0,0 +1,206 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Colunas dos arquivos brutos, na ordem lida por combine_sternberg_data.py
+COLUNAS_BRUTAS = ['subNum', 'length', 'trial', 'set', 'stim', 'targetfoil', 'resp', 'corr', 'rt']
+
+TAMANHOS_CONJUNTO = [2, 4, 6]
+CONSOANTES = np.array(list('BCDFGHJKLMNPQRSTVWXZ'))
+
+# Modelo gerador. RT ex-gaussiano: normal(mu, sigma) + exponencial(tau), com
+# mu = base + slope * tamanho do conjunto + custo do distrator + efeito da sessão (+ custo do erro).
+# Acerto: logística com intercepto individual, queda com o tamanho do conjunto e ganho com a prática.
+PARAMETROS_PADRAO = {
+    'rt_base': (420.0, 60.0),        # média e DP entre participantes (ms)
+    'slope': (38.0, 10.0),           # ms por item na memória
+    'custo_distrator': 25.0,         # ms a mais para distratores (F)
+    'efeito_sessao': [0.0, -30.0, -45.0],  # ms em T0, T1, T2 (prática)
+    'variacao_sessao': 0.3,          # variação individual relativa do efeito da sessão
+    'sigma': (45.0, 10.0),           # componente normal do RT (ms)
+    'tau': (140.0, 40.0),            # componente exponencial do RT (ms)
+    'custo_erro': 60.0,              # ms a mais nas respostas incorretas
+    'rt_minimo': 200.0,
+    'logito_acerto': (2.8, 0.5),     # intercepto do acerto entre participantes
+    'queda_acerto_item': 0.25,       # redução do logito por item além de 2
+    'ganho_acerto_sessao': 0.15      # aumento do logito por sessão
+}
+
+# Participantes gerados por tarefa: cada lote tem sua própria semente derivada da semente
+# principal, de modo que a coorte gerada não depende do número de processos
+TAMANHO_LOTE = 1000
+
+def _desenho_sessao(n_trials):
+    """
+    Tamanhos e tipos (alvo/distrator) de uma sessão balanceada: cada combinação aparece n_trials/6 vezes
+    """
+    celulas = len(TAMANHOS_CONJUNTO) * 2
+    if n_trials % celulas != 0:
+        raise ValueError(f"O número de trials deve ser múltiplo de {celulas} (tamanhos 2/4/6 x alvo/distrator)")
+    repeticoes = n_trials // celulas
+    tamanhos = np.repeat(np.tile(TAMANHOS_CONJUNTO, 2), repeticoes)
+    alvos = np.repeat([True, False], len(TAMANHOS_CONJUNTO) * repeticoes)
+    return tamanhos, alvos
+
+def gerar_lote(ids, rng, n_trials=96, parametros=None):
+    """
+    Gera as três sessões de um lote de participantes, de forma vetorizada
+
+    Args:
+        ids (array): IDs dos participantes
+        rng (np.random.Generator): Gerador de números aleatórios do lote
+        n_trials (int): Trials por sessão (múltiplo de 6)
+        parametros (dict): Substitui valores de PARAMETROS_PADRAO
+
+    Returns:
+        pd.DataFrame: Colunas 'tempo' (0, 1, 2) e COLUNAS_BRUTAS, ordenado por participante, tempo e trial
+    """
+    p = {**PARAMETROS_PADRAO, **(parametros or {})}
+    ids = np.asarray(ids)
+    n_part = len(ids)
+    n_sessoes = n_part * 3
+    n = n_sessoes * n_trials
+
+    # Parâmetros individuais (um valor por participante, repetido em suas sessões e trials)
+    def individual(media_dp, minimo=None):
+        valores = rng.normal(media_dp[0], media_dp[1], n_part)
+        return valores if minimo is None else np.maximum(valores, minimo)
+    rt_base = individual(p['rt_base'], 150.0)
+    slope = individual(p['slope'], 0.0)
+    sigma = individual(p['sigma'], 5.0)
+    tau = individual(p['tau'], 10.0)
+    logito = individual(p['logito_acerto'])
+    ganho_sessao = 1 + p['variacao_sessao'] * rng.standard_normal(n_part)
+
+    por_trial = lambda valores: np.repeat(valores, 3 * n_trials)
+    tempo = np.tile(np.repeat(np.arange(3), n_trials), n_part)
+    participante = np.repeat(ids, 3 * n_trials)
+
+    # Desenho balanceado embaralhado independentemente em cada sessão
+    tamanhos, alvos = _desenho_sessao(n_trials)
+    ordem = rng.permuted(np.tile(np.arange(n_trials), (n_sessoes, 1)), axis=1).ravel()
+    length = tamanhos[ordem]
+    alvo = alvos[ordem]
+
+    # Conjuntos de letras: as 6 primeiras de uma permutação das consoantes formam o conjunto
+    # (truncado no tamanho do trial); a 7ª, que nunca está no conjunto, é o distrator
+    permutacao = rng.random((n, len(CONSOANTES))).argsort(axis=1)[:, :7]
+    letras = CONSOANTES[permutacao]
+    conjunto = letras[:, :6].copy()
+    conjunto[np.arange(6) >= length[:, None]] = ''
+    conjunto = np.ascontiguousarray(conjunto).view('<U6').ravel()
+    posicao_alvo = (rng.random(n) * length).astype(int)
+    stim = np.where(alvo, letras[np.arange(n), posicao_alvo], letras[:, 6])
+    targetfoil = np.where(alvo, 'T', 'F')
+
+    # Acerto e resposta
+    logito_trial = (por_trial(logito) - p['queda_acerto_item'] * (length - 2)
+                    + p['ganho_acerto_sessao'] * tempo)
+    corr = (rng.random(n) < 1 / (1 + np.exp(-logito_trial))).astype(int)
+    resp = np.where(corr == 1, targetfoil, np.where(alvo, 'F', 'T'))
+
+    # RT ex-gaussiano
+    efeito_sessao = np.asarray(p['efeito_sessao'])[tempo] * por_trial(ganho_sessao)
+    mu = (por_trial(rt_base) + por_trial(slope) * length + p['custo_distrator'] * ~alvo
+          + efeito_sessao + p['custo_erro'] * (corr == 0))
+    rt = mu + por_trial(sigma) * rng.standard_normal(n) + rng.exponential(por_trial(tau))
+    rt = np.maximum(rt, p['rt_minimo'])
+
+    return pd.DataFrame({
+        'tempo': tempo,
+        'subNum': participante,
+        'length': length,
+        'trial': np.tile(np.arange(1, n_trials + 1), n_sessoes),
+        'set': conjunto,
+        'stim': stim,
+        'targetfoil': targetfoil,
+        'resp': resp,
+        'corr': corr,
+        'rt': rt
+    })
+
+def _gravar_lote(tarefa):
+    """
+    Gera um lote e grava um arquivo T{n}_{id}_sternberg.csv por participante e sessão
+
+    Returns:
+        int: Bytes gravados
+    """
+    ids, semente, pasta, n_trials, parametros = tarefa
+    lote = gerar_lote(ids, np.random.default_rng(semente), n_trials, parametros)
+
+    # Todas as linhas do lote são formatadas de uma só vez e depois divididas em arquivos
+    # (cada sessão tem exatamente n_trials linhas consecutivas)
+    linhas = lote[COLUNAS_BRUTAS].to_csv(header=False, index=False, float_format='%.3f',
+                                         lineterminator='\n').splitlines(keepends=True)
+    cabecalho = ','.join(COLUNAS_BRUTAS) + '\n'
+    total = 0
+    for sessao, inicio in enumerate(range(0, len(linhas), n_trials)):
+        participante = ids[sessao // 3]
+        conteudo = cabecalho + ''.join(linhas[inicio:inicio + n_trials])
+        with open(Path(pasta) / f'T{sessao % 3}_{participante}_sternberg.csv', 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+        total += len(conteudo)
+    return total
+
+def gerar_coorte(n_participantes, pasta='data', semente=0, n_trials=96, n_processos=1, id_inicial=1001,
+                 parametros=None):
+    """
+    Gera uma coorte sintética no formato dos arquivos brutos lidos por combine_sternberg_data.py
+
+    Args:
+        n_participantes (int): Número de participantes (cada um com T0, T1 e T2)
+        pasta (str): Pasta de saída
+        semente (int): Semente; a mesma semente gera a mesma coorte com qualquer número de processos
+        n_trials (int): Trials por sessão (múltiplo de 6)
+        n_processos (int): Processos gerando e gravando lotes em paralelo
+        id_inicial (int): ID do primeiro participante (os demais são consecutivos)
+        parametros (dict): Substitui valores de PARAMETROS_PADRAO
+
+    Returns:
+        dict: 'arquivos', 'bytes' e 'segundos'
+    """
+    _desenho_sessao(n_trials)
+    Path(pasta).mkdir(parents=True, exist_ok=True)
+    inicio = time.perf_counter()
+
+    ids = np.arange(id_inicial, id_inicial + n_participantes)
+    lotes = [ids[i:i + TAMANHO_LOTE] for i in range(0, n_participantes, TAMANHO_LOTE)]
+    sementes = np.random.SeedSequence(semente).spawn(len(lotes))
+    tarefas = [(lote, semente_lote, pasta, n_trials, parametros) for lote, semente_lote in zip(lotes, sementes)]
+
+    if n_processos > 1 and len(tarefas) > 1:
+        with ProcessPoolExecutor(max_workers=n_processos) as executor:
+            total = sum(executor.map(_gravar_lote, tarefas))
+    else:
+        total = sum(map(_gravar_lote, tarefas))
+
+    return {'arquivos': n_participantes * 3, 'bytes': total, 'segundos': time.perf_counter() - inicio}
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Gera uma coorte sintética de dados brutos do Sternberg")
+    parser.add_argument('participantes', type=int, help="Número de participantes (ex.: 10 a 100000)")
+    parser.add_argument('--pasta', default='data', help="Pasta de saída (padrão: data)")
+    parser.add_argument('--semente', '--seed', type=int, default=0, help="Semente (padrão: 0)")
+    parser.add_argument('--trials', type=int, default=96,
+                        help="Trials por sessão, múltiplo de 6 (padrão: 96)")
+    parser.add_argument('--processos', type=int, default=1,
+                        help="Processos gerando e gravando em paralelo (0 = todos os núcleos; padrão: 1)")
+    parser.add_argument('--id-inicial', type=int, default=1001, help="ID do primeiro participante (padrão: 1001)")
+    args = parser.parse_args()
+    n_processos = args.processos if args.processos > 0 else (os.cpu_count() or 1)
+
+    print(f"Gerando {args.participantes} participantes ({args.participantes * 3} arquivos) em {args.pasta}/...")
+    resumo = gerar_coorte(args.participantes, args.pasta, args.semente, args.trials, n_processos, args.id_inicial)
+    print(f"Concluído: {resumo['arquivos']} arquivos, {resumo['bytes'] / 1e6:.1f} MB "
+          f"em {resumo['segundos']:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+from dados_longos import TEMPOS, grupos_por_sufixo, criar_cubo, colunas_existentes
+from perfil_execucao import etapa
+
+# Backend não interativo definido antes de qualquer importação do matplotlib (também vale para
+# bibliotecas que importam o pyplot). O matplotlib em si só é importado ao desenhar o primeiro
+# gráfico: execuções sem gráficos não pagam o custo da importação
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+# Cores das caixas de T0, T1 e T2
+CORES_TEMPOS = ['lightblue', 'lightgreen', 'lightcoral']
+
+FORMATOS_GRAFICOS = ['png', 'svg', 'pdf']
+
+# Incrementar sempre que a aparência dos gráficos mudar, forçando o redesenho de todos
+VERSAO_GRAFICOS = 1
+
+# Extensão do arquivo, ao lado de cada imagem, com o hash dos dados e do estilo usados para desenhá-la
+SUFIXO_HASH = '.hash'
+
+def paineis_boxplot(df, variaveis, indice=None):
+    """
+    Prepara os dados dos boxplots (um painel por variável) a partir do DataFrame largo
+
+    Args:
+        df (pd.DataFrame): Dados no formato largo
+        variaveis (list): Variáveis (sem sufixo _T0/_T1/_T2)
+        indice (IndiceVariaveis): Índice das variáveis de `df` (opcional; sem ele,
+            as colunas são <variavel>_T0/_T1/_T2)
+
+    Returns:
+        list: Um dicionário por variável com 'nome', 'titulo', 'rotulo_y',
+        'tempos' e 'dados' (valores válidos de cada tempo com pelo menos um valor)
+    """
+    if indice is not None:
+        cubo = indice.criar_cubo(df, variaveis)
+        existentes = indice.colunas_existentes(variaveis)
+    else:
+        grupos = grupos_por_sufixo(variaveis)
+        cubo = criar_cubo(df, grupos)
+        existentes = colunas_existentes(df, grupos)
+
+    paineis = []
+    for i, variavel in enumerate(variaveis):
+        tempos = []
+        dados = []
+        for j, tempo in enumerate(TEMPOS):
+            valores = cubo[i, :, j]
+            valores = valores[~np.isnan(valores)]
+            if existentes[i, j] and len(valores) > 0:
+                tempos.append(tempo)
+                dados.append(valores)
+        paineis.append({
+            'nome': variavel,
+            'titulo': f'Boxplot - {variavel}',
+            'rotulo_y': variavel,
+            'tempos': tempos,
+            'dados': dados
+        })
+    return paineis
+
+def _geometria_caixa(posicao, largura, estatisticas):
+    """
+    Coordenadas de caixa, bigodes, limites e mediana de um boxplot (mesma geometria do Axes.bxp)
+    """
+    esquerda = posicao - largura * 0.5
+    direita = posicao + largura * 0.5
+    return {
+        'caixa': np.column_stack([[esquerda, direita, direita, esquerda, esquerda],
+                                  [estatisticas['q1'], estatisticas['q1'], estatisticas['q3'],
+                                   estatisticas['q3'], estatisticas['q1']]]),
+        'bigodes': ([estatisticas['q1'], estatisticas['whislo']], [estatisticas['q3'], estatisticas['whishi']]),
+        'limites': ([estatisticas['whislo']] * 2, [estatisticas['whishi']] * 2),
+        'mediana': [estatisticas['med']] * 2
+    }
+
+class RenderizadorBoxplots:
+    """
+    Desenha boxplots T0/T1/T2 reaproveitando uma única figura (backend Agg) entre variáveis.
+
+    Os artistas de cada painel (caixas, bigodes, medianas, pontos e textos)
+    são criados uma vez e depois apenas têm seus dados atualizados, desde que
+    o número de tempos do painel não mude. Cada página pode conter várias
+    variáveis (um painel por variável).
+    """
+
+    def __init__(self, pasta, dpi=300, formato='png', variaveis_por_pagina=1):
+        if formato not in FORMATOS_GRAFICOS:
+            raise ValueError(f"Formato de gráfico inválido: {formato}. Use um de {FORMATOS_GRAFICOS}")
+        self.pasta = Path(pasta)
+        self.dpi = dpi
+        self.formato = formato
+        self.variaveis_por_pagina = max(1, variaveis_por_pagina)
+        self._figura = None
+        self._paineis = []
+
+    def _criar_figura(self):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        n = self.variaveis_por_pagina
+        colunas = math.ceil(math.sqrt(n))
+        linhas = math.ceil(n / colunas)
+        if n == 1:
+            self._figura = Figure(figsize=(12, 8))
+        else:
+            self._figura = Figure(figsize=(6 * colunas, 4.5 * linhas), layout='constrained')
+        FigureCanvasAgg(self._figura)
+        eixos = self._figura.subplots(linhas, colunas, squeeze=False).ravel()
+        self._paineis = [{'eixo': eixo, 'artistas': None} for eixo in eixos]
+
+    def _desenhar_painel(self, painel, dados_painel):
+        from matplotlib import cbook
+        from matplotlib.path import Path as CaminhoGrafico
+        eixo = painel['eixo']
+        tempos = dados_painel['tempos']
+        dados = dados_painel['dados']
+        estatisticas = cbook.boxplot_stats(dados, whis=1.5)
+        posicoes = list(range(1, len(dados) + 1))
+        medias = [np.mean(valores) for valores in dados]
+        tamanho_titulo = 16 if self.variaveis_por_pagina == 1 else 12
+
+        artistas = painel['artistas']
+        if artistas is None or len(artistas['boxes']) != len(dados):
+            # Primeiro uso do painel (ou número de tempos diferente): criar os artistas
+            eixo.clear()
+            artistas = eixo.bxp(estatisticas, positions=posicoes, patch_artist=True)
+            for caixa, cor in zip(artistas['boxes'], CORES_TEMPOS):
+                caixa.set_facecolor(cor)
+            artistas['textos'] = [eixo.text(posicao, media, '', ha='center', va='bottom', fontweight='bold')
+                                  for posicao, media in zip(posicoes, medias)]
+            eixo.set_xlabel('Tempo de Teste', fontsize=12)
+            eixo.grid(True, alpha=0.3)
+            painel['artistas'] = artistas
+        else:
+            # Reaproveitar os artistas, trocando apenas os dados
+            largura = np.clip(0.15 * np.ptp(posicoes), 0.15, 0.5)
+            for i, (posicao, est) in enumerate(zip(posicoes, estatisticas)):
+                geometria = _geometria_caixa(posicao, largura, est)
+                artistas['boxes'][i].set_path(CaminhoGrafico(geometria['caixa'], closed=True))
+                artistas['whiskers'][2 * i].set_ydata(geometria['bigodes'][0])
+                artistas['whiskers'][2 * i + 1].set_ydata(geometria['bigodes'][1])
+                artistas['caps'][2 * i].set_ydata(geometria['limites'][0])
+                artistas['caps'][2 * i + 1].set_ydata(geometria['limites'][1])
+                artistas['medians'][i].set_ydata(geometria['mediana'])
+                artistas['fliers'][i].set_data(np.full(len(est['fliers']), posicao, dtype=float), est['fliers'])
+            # O eixo x (posições dos tempos) não muda; só a escala de y é recalculada
+            eixo.relim()
+            eixo.autoscale_view(scalex=False)
+
+        for texto, posicao, media in zip(artistas['textos'], posicoes, medias):
+            texto.set_position((posicao, media))
+            texto.set_text(f'Média: {media:.3f}')
+        eixo.set_xticks(posicoes)
+        eixo.set_xticklabels(tempos)
+        eixo.set_title(dados_painel['titulo'], fontsize=tamanho_titulo, fontweight='bold')
+        eixo.set_ylabel(dados_painel['rotulo_y'], fontsize=12)
+        eixo.set_visible(True)
+
+    def nome_arquivo(self, paineis_pagina, numero_pagina):
+        """
+        Nome do arquivo de uma página: boxplot_<variavel> com uma variável por página,
+        boxplots_pagina_<n> com várias
+        """
+        if self.variaveis_por_pagina == 1:
+            return self.pasta / f"boxplot_{paineis_pagina[0]['nome']}.{self.formato}"
+        return self.pasta / f"boxplots_pagina_{numero_pagina:03d}.{self.formato}"
+
+    def remover_paginas_excedentes(self, n_paginas):
+        """
+        Remove as páginas numeradas (e seus arquivos .hash) além de n_paginas, deixadas por uma execução
+        anterior com mais páginas, para que não pareçam parte da saída atual
+
+        Com uma variável por página os arquivos têm o nome da variável, não um número, e nada é removido.
+
+        Returns:
+            list: Arquivos removidos
+        """
+        if self.variaveis_por_pagina == 1 or not self.pasta.is_dir():
+            return []
+        padrao = re.compile(rf'boxplots_pagina_(\d+)\.{re.escape(self.formato)}({re.escape(SUFIXO_HASH)})?')
+        removidos = []
+        for arquivo in self.pasta.glob('boxplots_pagina_*'):
+            correspondencia = padrao.fullmatch(arquivo.name)
+            if correspondencia and int(correspondencia.group(1)) > n_paginas:
+                arquivo.unlink()
+                removidos.append(arquivo)
+        return removidos
+
+    def hash_pagina(self, paineis_pagina):
+        """
+        Hash dos dados e dos parâmetros de estilo de uma página de boxplots
+        """
+        h = hashlib.sha256()
+        h.update(json.dumps({
+            'versao': VERSAO_GRAFICOS,
+            'dpi': self.dpi,
+            'formato': self.formato,
+            'variaveis_por_pagina': self.variaveis_por_pagina,
+            'cores': CORES_TEMPOS,
+            'paineis': [[painel['nome'], painel['titulo'], painel['rotulo_y'], painel['tempos']]
+                        for painel in paineis_pagina]
+        }, sort_keys=True).encode())
+        for painel in paineis_pagina:
+            for valores in painel['dados']:
+                h.update(str(len(valores)).encode())
+                h.update(np.ascontiguousarray(valores, dtype=float).tobytes())
+        return h.hexdigest()
+
+    def pagina_atualizada(self, paineis_pagina, numero_pagina=1):
+        """
+        Indica se a imagem da página já existe e foi desenhada com os mesmos dados e estilo
+        """
+        arquivo = self.nome_arquivo(paineis_pagina, numero_pagina)
+        arquivo_hash = arquivo.with_name(arquivo.name + SUFIXO_HASH)
+        if not arquivo.exists() or not arquivo_hash.exists():
+            return False
+        return arquivo_hash.read_text().strip() == self.hash_pagina(paineis_pagina)
+
+    def renderizar_pagina(self, paineis_pagina, numero_pagina=1):
+        """
+        Desenha e salva uma página de boxplots
+
+        Args:
+            paineis_pagina (list): Até variaveis_por_pagina painéis (ver paineis_boxplot)
+            numero_pagina (int): Número da página (usado no nome do arquivo com várias variáveis)
+
+        Returns:
+            dict: {nome do painel: arquivo salvo ou None se o painel não tinha dados}
+        """
+        com_dados = [painel for painel in paineis_pagina if painel['dados']]
+        if not com_dados:
+            return {painel['nome']: None for painel in paineis_pagina}
+
+        if self._figura is None:
+            self._criar_figura()
+        for painel, dados_painel in zip(self._paineis, com_dados):
+            self._desenhar_painel(painel, dados_painel)
+        for painel in self._paineis[len(com_dados):]:
+            painel['eixo'].set_visible(False)
+
+        self.pasta.mkdir(parents=True, exist_ok=True)
+        arquivo = self.nome_arquivo(paineis_pagina, numero_pagina)
+        self._figura.savefig(arquivo, dpi=self.dpi, bbox_inches='tight')
+        arquivo.with_name(arquivo.name + SUFIXO_HASH).write_text(self.hash_pagina(paineis_pagina))
+        return {painel['nome']: str(arquivo) if painel['dados'] else None for painel in paineis_pagina}
+
+# Renderizador de cada processo de trabalho (a figura é reaproveitada entre as páginas do processo)
+_RENDERIZADOR_TRABALHADOR = {}
+
+def _inicializar_renderizador(pasta, dpi, formato, variaveis_por_pagina):
+    _RENDERIZADOR_TRABALHADOR['renderizador'] = RenderizadorBoxplots(pasta, dpi, formato, variaveis_por_pagina)
+
+def _renderizar_pagina_trabalhador(pagina):
+    numero_pagina, paineis_pagina = pagina
+    return _RENDERIZADOR_TRABALHADOR['renderizador'].renderizar_pagina(paineis_pagina, numero_pagina)
+
+def renderizar_boxplots(paineis, pasta, dpi=300, formato='png', variaveis_por_pagina=1, n_processos=1,
+                        usar_cache=True):
+    """
+    Desenha os boxplots de vários painéis, agrupados em páginas, opcionalmente em vários processos
+
+    Com o cache ativo, páginas cuja imagem já existe com o mesmo hash de dados
+    e estilo (arquivo .hash ao lado da imagem) não são redesenhadas.
+
+    Args:
+        paineis (list): Painéis a desenhar (ver paineis_boxplot)
+        pasta (str): Pasta de saída
+        dpi (int): Resolução das imagens (ignorada em parte nos formatos vetoriais)
+        formato (str): 'png', 'svg' ou 'pdf'
+        variaveis_por_pagina (int): Número de variáveis (painéis) por arquivo
+        n_processos (int): Número de processos (1 = execução sequencial)
+        usar_cache (bool): Se deve reaproveitar imagens cujos dados e estilo não mudaram
+
+    Returns:
+        dict: {nome do painel: arquivo salvo ou None}, na ordem de `paineis`
+    """
+    with etapa('graficos'):
+        return _renderizar_boxplots(paineis, pasta, dpi, formato, variaveis_por_pagina, n_processos, usar_cache)
+
+def _renderizar_boxplots(paineis, pasta, dpi, formato, variaveis_por_pagina, n_processos, usar_cache):
+    variaveis_por_pagina = max(1, variaveis_por_pagina)
+    # Painéis sem dados não ocupam espaço nas páginas
+    com_dados = [painel for painel in paineis if painel['dados']]
+    paginas = [(numero, com_dados[i:i + variaveis_por_pagina])
+               for numero, i in enumerate(range(0, len(com_dados), variaveis_por_pagina), 1)]
+
+    arquivos = {painel['nome']: None for painel in paineis}
+    renderizador = RenderizadorBoxplots(pasta, dpi, formato, variaveis_por_pagina)
+    renderizador.remover_paginas_excedentes(len(paginas))
+    if usar_cache:
+        pendentes = []
+        for numero, pagina in paginas:
+            if renderizador.pagina_atualizada(pagina, numero):
+                arquivo = str(renderizador.nome_arquivo(pagina, numero))
+                arquivos.update({painel['nome']: arquivo for painel in pagina})
+            else:
+                pendentes.append((numero, pagina))
+        print(f"Boxplots: {len(pendentes)} página(s) a desenhar, "
+              f"{len(paginas) - len(pendentes)} sem alterações (cache de gráficos)")
+        paginas = pendentes
+
+    if n_processos <= 1 or len(paginas) <= 1:
+        for numero, pagina in paginas:
+            arquivos.update(renderizador.renderizar_pagina(pagina, numero))
+        return arquivos
+
+    contexto = None
+    if 'fork' in multiprocessing.get_all_start_methods():
+        contexto = multiprocessing.get_context('fork')
+
+    with ProcessPoolExecutor(max_workers=n_processos, mp_context=contexto,
+                             initializer=_inicializar_renderizador,
+                             initargs=(pasta, dpi, formato, variaveis_por_pagina)) as executor:
+        tamanho_lote = max(1, math.ceil(len(paginas) / (n_processos * 4)))
+        for resultado in executor.map(_renderizar_pagina_trabalhador, paginas, chunksize=tamanho_lote):
+            arquivos.update(resultado)
+    return arquivos
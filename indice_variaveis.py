@@ -0,0 +1,202 @@
+import fnmatch
+import re
+import numpy as np
+import pandas as pd
+from dados_longos import TEMPOS
+
+# Token de tempo em qualquer posição do nome da coluna (ex.: accuracy_total_T0, rt_T1_2)
+PADRAO_TEMPO = re.compile(r'_T([012])(?=(_|$))')
+
+# Fatores do desenho Sternberg codificados no nome das métricas geradas por analises.py
+PADROES_FATORES = {
+    'medida': re.compile(r'^(mean_rt|accuracy|slope_rt)'),
+    'comprimento': re.compile(r'_by_length_(\d+)'),
+    'estimulo': re.compile(r'_(target|foil)(?=_|$)'),
+    'resposta': re.compile(r'_(correct|incorrect)(?=_|$)')
+}
+
+def separar_tempo(coluna):
+    """
+    Separa o nome de uma coluna em variável base e tempo
+
+    O token _T0/_T1/_T2 pode estar em qualquer posição; ele é removido e os
+    demais sufixos são mantidos (ex.: 'rt_T1_2' -> ('rt_2', 'T1')).
+
+    Returns:
+        tuple: (variavel_base, tempo) ou None se a coluna não tiver token de tempo
+    """
+    match = PADRAO_TEMPO.search(coluna)
+    if not match:
+        return None
+    base = re.sub(r'__+', '_', PADRAO_TEMPO.sub('', coluna)).strip('_')
+    return base, f'T{match.group(1)}'
+
+def fatores_variavel(variavel):
+    """
+    Extrai os níveis dos fatores (medida, comprimento, estímulo, resposta) do nome de uma variável
+
+    Returns:
+        dict: {fator: nível}, com None para fatores ausentes no nome
+    """
+    fatores = {}
+    for fator, padrao in PADROES_FATORES.items():
+        match = padrao.search(variavel)
+        fatores[fator] = match.group(1) if match else None
+    if fatores['comprimento'] is not None:
+        fatores['comprimento'] = int(fatores['comprimento'])
+    return fatores
+
+def selecionar_variaveis(variaveis, padroes=None):
+    """
+    Filtra as variáveis por padrões no estilo do shell (ex.: 'accuracy_*,mean_rt_total')
+
+    Args:
+        variaveis (list): Variáveis disponíveis
+        padroes (list ou str): Padrões (lista ou texto separado por vírgulas); None = todas
+
+    Returns:
+        list: Variáveis que correspondem a pelo menos um padrão, na ordem original
+    """
+    if not padroes:
+        return list(variaveis)
+    if isinstance(padroes, str):
+        padroes = padroes.split(',')
+    padroes = [padrao.strip() for padrao in padroes if padrao.strip()]
+    return [var for var in variaveis if any(fnmatch.fnmatchcase(var, padrao) for padrao in padroes)]
+
+class IndiceVariaveis:
+    """
+    Índice das variáveis T0/T1/T2 de um conjunto de dados, montado uma única vez.
+
+    Mapeia cada variável base para a coluna (nome e posição) de cada tempo e
+    para os níveis dos fatores do desenho, para que as etapas da análise
+    consultem o índice em vez de reprocessar os nomes das colunas. As
+    variáveis ficam na ordem em que aparecem nas colunas.
+    """
+
+    def __init__(self, colunas):
+        """
+        Args:
+            colunas (Iterable): Nomes das colunas (ex.: df.columns)
+        """
+        registros = {}
+        for posicao, coluna in enumerate(colunas):
+            separado = separar_tempo(str(coluna))
+            if separado is None:
+                continue
+            base, tempo = separado
+            registro = registros.setdefault(base, {})
+            # Em nomes duplicados após a normalização, vale a primeira coluna
+            registro.setdefault(tempo, (coluna, posicao))
+
+        linhas = []
+        for base, tempos in registros.items():
+            linha = {'Variavel': base}
+            for tempo in TEMPOS:
+                coluna, posicao = tempos.get(tempo, (None, -1))
+                linha[tempo] = coluna
+                linha[f'posicao_{tempo}'] = posicao
+            linha['completa'] = all(tempo in tempos for tempo in TEMPOS)
+            linha.update(fatores_variavel(base))
+            linhas.append(linha)
+
+        colunas_tabela = (['Variavel'] + TEMPOS + [f'posicao_{t}' for t in TEMPOS] + ['completa']
+                          + list(PADROES_FATORES))
+        self.tabela = pd.DataFrame(linhas, columns=colunas_tabela).set_index('Variavel')
+
+    def __len__(self):
+        return len(self.tabela)
+
+    def __contains__(self, variavel):
+        return variavel in self.tabela.index
+
+    def variaveis(self, completas=True):
+        """
+        Lista as variáveis do índice
+
+        Args:
+            completas (bool): Apenas variáveis com coluna para T0, T1 e T2
+        """
+        tabela = self.tabela[self.tabela['completa']] if completas else self.tabela
+        return list(tabela.index)
+
+    def selecionar(self, completas=True, **fatores):
+        """
+        Seleciona variáveis pelos níveis dos fatores, sem interpretar nomes
+
+        Exemplo: indice.selecionar(medida='accuracy', comprimento=4, estimulo='foil')
+
+        Args:
+            completas (bool): Apenas variáveis com coluna para T0, T1 e T2
+            **fatores: Fator -> nível (ou lista de níveis); None seleciona variáveis sem o fator
+
+        Returns:
+            list: Variáveis que atendem a todos os filtros, na ordem do índice
+        """
+        mascara = self.tabela['completa'] if completas else pd.Series(True, index=self.tabela.index)
+        for fator, nivel in fatores.items():
+            if fator not in PADROES_FATORES:
+                raise ValueError(f"Fator desconhecido: {fator} (opções: {', '.join(PADROES_FATORES)})")
+            valores = self.tabela[fator]
+            if nivel is None:
+                mascara = mascara & valores.isna()
+            elif isinstance(nivel, (list, tuple, set)):
+                mascara = mascara & valores.isin(list(nivel))
+            else:
+                mascara = mascara & (valores == nivel)
+        return list(self.tabela.index[mascara])
+
+    def colunas(self, variavel):
+        """
+        Colunas existentes de uma variável, na ordem dos tempos
+        """
+        linha = self.tabela.loc[variavel]
+        return [linha[tempo] for tempo in TEMPOS if pd.notna(linha[tempo])]
+
+    def grupos(self, variaveis=None):
+        """
+        Mapeamento {variavel: {tempo: coluna}} (apenas tempos existentes), no formato de criar_cubo
+        """
+        if variaveis is None:
+            variaveis = self.variaveis()
+        tabela = self.tabela.loc[list(variaveis), TEMPOS]
+        return {variavel: {tempo: coluna for tempo, coluna in linha.items() if pd.notna(coluna)}
+                for variavel, linha in zip(tabela.index, tabela.to_dict('records'))}
+
+    def posicoes(self, variaveis=None):
+        """
+        Posições das colunas de cada tempo no DataFrame de origem
+
+        Returns:
+            np.ndarray: Array (variáveis, tempos) de inteiros, com -1 para tempos sem coluna
+        """
+        if variaveis is None:
+            variaveis = self.variaveis()
+        return self.tabela.loc[list(variaveis), [f'posicao_{t}' for t in TEMPOS]].to_numpy(dtype=int)
+
+    def colunas_existentes(self, variaveis=None):
+        """
+        Indica quais tempos de cada variável têm coluna (ver dados_longos.colunas_existentes)
+
+        Returns:
+            np.ndarray: Array booleano (variáveis, tempos)
+        """
+        return self.posicoes(variaveis) >= 0
+
+    def criar_cubo(self, df, variaveis=None):
+        """
+        Monta o cubo (variáveis, participantes, tempos) pelas posições das colunas
+
+        Equivalente a dados_longos.criar_cubo, sem procurar as colunas pelo nome.
+        O DataFrame deve ser o mesmo (mesmas colunas) usado para montar o índice.
+        """
+        if variaveis is None:
+            variaveis = self.variaveis()
+        posicoes = self.posicoes(variaveis).ravel()
+        existentes = posicoes >= 0
+        usadas = np.unique(posicoes[existentes])
+
+        numericos = df.iloc[:, usadas].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        valores = np.full((len(df), posicoes.size), np.nan)
+        valores[:, existentes] = numericos[:, np.searchsorted(usadas, posicoes[existentes])]
+        return valores.reshape(len(df), len(variaveis), len(TEMPOS)).transpose(1, 0, 2)
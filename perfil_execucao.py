@@ -0,0 +1,262 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+# Variável de ambiente que ativa o perfil em qualquer script (inclusive nos que não têm opções de linha
+# de comando e nas etapas executadas por pipeline.py): "1" ou "tempo" (apenas os tempos das etapas),
+# ou uma lista separada por vírgulas com "cprofile" e/ou "memoria" (ex.: STERNBERG_PERFIL=cprofile,memoria)
+VARIAVEL_AMBIENTE = 'STERNBERG_PERFIL'
+
+OPCOES_PERFIL = ['tempo', 'cprofile', 'memoria']
+
+AJUDA_PERFIL = ("Mede o tempo de cada etapa e grava um relatório <saída>.perfil.txt; aceita também "
+                "'cprofile' e/ou 'memoria', separados por vírgula (equivale a STERNBERG_PERFIL)")
+
+# Funções listadas por etapa no relatório do cProfile
+FUNCOES_POR_ETAPA = 15
+
+def interpretar_opcoes(valor):
+    """
+    Interpreta o valor de --perfil ou de STERNBERG_PERFIL
+
+    Returns:
+        set: Opções ativas (subconjunto de OPCOES_PERFIL), vazio se o perfil estiver desligado
+    """
+    if valor is None or str(valor).strip().lower() in ('', '0', 'false', 'nao', 'não'):
+        return set()
+    opcoes = {opcao.strip().lower() for opcao in str(valor).split(',') if opcao.strip()}
+    opcoes = {'tempo' if opcao in ('1', 'true', 'sim') else opcao for opcao in opcoes}
+    invalidas = sorted(opcoes - set(OPCOES_PERFIL))
+    if invalidas:
+        raise ValueError(f"Opções de perfil desconhecidas: {', '.join(invalidas)} (opções: {', '.join(OPCOES_PERFIL)})")
+    return opcoes | {'tempo'}
+
+class Perfilador:
+    """
+    Acumula o tempo (e, opcionalmente, o cProfile e o pico de memória) de cada etapa de uma execução.
+
+    Etapas podem ser aninhadas; o nome de uma etapa interna é prefixado pelo
+    da externa ('metricas/slope'). Cada etapa registra o tempo total e o tempo
+    próprio (sem as etapas internas), usado para ordenar os pontos críticos.
+    O cProfile é ligado apenas nas etapas mais externas (o Python admite um
+    perfilador por vez) e o pico de memória é medido pelo tracemalloc, que
+    deixa o código bem mais lento. Só o processo principal é medido: trabalho
+    feito em processos paralelos aparece como tempo da etapa que os aguarda.
+    """
+
+    def __init__(self, cprofile=False, memoria=False):
+        self.cprofile = cprofile
+        self.memoria = memoria
+        self.etapas = {}
+        self._pilha = []
+        self._iniciou_tracemalloc = False
+
+    def _registro(self, nome):
+        if nome not in self.etapas:
+            self.etapas[nome] = {'chamadas': 0, 'segundos': 0.0, 'proprio': 0.0, 'pico_memoria': 0,
+                                 'cprofile': None}
+        return self.etapas[nome]
+
+    def _nome_completo(self, nome):
+        return f"{self._pilha[-1]['nome']}/{nome}" if self._pilha else nome
+
+    def _acumular(self, nome, segundos, segundos_filhos=0.0):
+        registro = self._registro(nome)
+        registro['chamadas'] += 1
+        registro['segundos'] += segundos
+        registro['proprio'] += segundos - segundos_filhos
+        if self._pilha:
+            self._pilha[-1]['filhos'] += segundos
+        return registro
+
+    @contextmanager
+    def etapa(self, nome):
+        """
+        Mede o bloco como uma etapa (ex.: with perfilador.etapa('leitura'): ...)
+        """
+        quadro = {'nome': self._nome_completo(nome), 'filhos': 0.0, 'pico_filhos': 0}
+        perfil_cprofile = None
+        if self.cprofile and not self._pilha:
+            perfil_cprofile = cProfile.Profile()
+        if self.memoria:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._iniciou_tracemalloc = True
+            # O pico é zerado para esta etapa; o pico anterior é devolvido à etapa externa na saída
+            quadro['base'], quadro['pico_anterior'] = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        self._pilha.append(quadro)
+        inicio = time.perf_counter()
+        if perfil_cprofile is not None:
+            perfil_cprofile.enable()
+        try:
+            yield
+        finally:
+            if perfil_cprofile is not None:
+                perfil_cprofile.disable()
+            segundos = time.perf_counter() - inicio
+            self._pilha.pop()
+            registro = self._acumular(quadro['nome'], segundos, quadro['filhos'])
+            if self.memoria:
+                pico = max(tracemalloc.get_traced_memory()[1], quadro['pico_filhos'])
+                registro['pico_memoria'] = max(registro['pico_memoria'], pico - quadro['base'])
+                if self._pilha:
+                    self._pilha[-1]['pico_filhos'] = max(self._pilha[-1]['pico_filhos'], pico,
+                                                         quadro['pico_anterior'])
+            if perfil_cprofile is not None:
+                if registro['cprofile'] is None:
+                    registro['cprofile'] = pstats.Stats(perfil_cprofile)
+                else:
+                    registro['cprofile'].add(perfil_cprofile)
+
+    def secoes(self, prefixo):
+        """
+        Cronômetro de seções consecutivas de um trecho longo, sem reindentá-lo
+
+        Cada chamada de marcar(nome) atribui a '<prefixo>:<nome>' o tempo
+        desde a marca anterior (ou desde a criação do cronômetro).
+        """
+        return _CronometroSecoes(self, prefixo)
+
+    def relatorio(self, funcoes_por_etapa=FUNCOES_POR_ETAPA):
+        """
+        Relatório em texto: etapas ordenadas pelo tempo próprio e, se houver, as funções mais custosas
+
+        Returns:
+            str: Conteúdo do relatório
+        """
+        linhas = ['PERFIL DA EXECUÇÃO', '=' * 50, '']
+        total = sum(registro['proprio'] for registro in self.etapas.values())
+        cabecalho = f"{'Etapa':<50} {'Chamadas':>9} {'Total (s)':>11} {'Próprio (s)':>12} {'%':>6}"
+        if self.memoria:
+            cabecalho += f" {'Pico (MB)':>10}"
+        linhas += ['ETAPAS (ordenadas pelo tempo próprio)', '-' * 50, cabecalho]
+        for nome, registro in sorted(self.etapas.items(), key=lambda item: -item[1]['proprio']):
+            linha = (f"{nome:<50} {registro['chamadas']:>9d} {registro['segundos']:>11.3f} "
+                     f"{registro['proprio']:>12.3f} {registro['proprio'] / total if total else 0:>6.1%}")
+            if self.memoria:
+                linha += f" {registro['pico_memoria'] / 2**20:>10.1f}"
+            linhas.append(linha)
+        linhas.append(f"{'Total medido':<50} {'':>9} {'':>11} {total:>12.3f}")
+
+        perfis = [(nome, registro['cprofile']) for nome, registro in self.etapas.items() if registro['cprofile']]
+        if perfis:
+            geral = pstats.Stats()
+            geral.add(*[estatisticas for _, estatisticas in perfis])
+            perfis = [('TODAS AS ETAPAS', geral)] + perfis
+        for nome, estatisticas in perfis:
+            saida = io.StringIO()
+            estatisticas.stream = saida
+            estatisticas.sort_stats('tottime').print_stats(funcoes_por_etapa)
+            linhas += ['', f"FUNÇÕES MAIS CUSTOSAS: {nome} (cProfile, por tempo próprio)", '-' * 50,
+                       saida.getvalue().strip()]
+        return '\n'.join(linhas) + '\n'
+
+    def finalizar(self):
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+
+class _CronometroSecoes:
+    def __init__(self, perfilador, prefixo):
+        self.perfilador = perfilador
+        self.nome = perfilador._nome_completo(prefixo)
+        self.ultimo = time.perf_counter()
+
+    def marcar(self, nome):
+        agora = time.perf_counter()
+        self.perfilador._acumular(f'{self.nome}:{nome}', agora - self.ultimo)
+        self.ultimo = agora
+
+class _CronometroInativo:
+    def marcar(self, nome):
+        pass
+
+_CRONOMETRO_INATIVO = _CronometroInativo()
+
+# Perfilador da execução atual (None = perfil desligado, e as etapas não custam nada)
+_perfilador = None
+
+def ativar_perfil(opcoes='tempo'):
+    """
+    Liga o perfil da execução atual
+
+    Args:
+        opcoes (str ou set): Valor de --perfil / STERNBERG_PERFIL (ver interpretar_opcoes)
+
+    Returns:
+        Perfilador: Perfilador ativo, ou None se as opções desligarem o perfil
+    """
+    global _perfilador
+    if isinstance(opcoes, str):
+        opcoes = interpretar_opcoes(opcoes)
+    if not opcoes:
+        return None
+    _perfilador = Perfilador(cprofile='cprofile' in opcoes, memoria='memoria' in opcoes)
+    return _perfilador
+
+def ativar_perfil_do_ambiente():
+    """
+    Liga o perfil se a variável STERNBERG_PERFIL estiver definida
+
+    Chamada na importação do módulo: um valor inválido apenas gera um aviso e
+    deixa o perfil desligado, em vez de impedir a execução de qualquer script.
+
+    Returns:
+        Perfilador: Perfilador ativo, ou None
+    """
+    try:
+        return ativar_perfil(os.environ.get(VARIAVEL_AMBIENTE, ''))
+    except ValueError as erro:
+        print(f"Aviso: {VARIAVEL_AMBIENTE} ignorada, perfil desligado: {erro}", file=sys.stderr)
+        return None
+
+def perfilador_ativo():
+    return _perfilador
+
+def etapa(nome):
+    """
+    Mede o bloco como uma etapa do perfil, se ele estiver ligado
+
+    Uso:
+        with etapa('leitura'):
+            df = pd.read_csv(caminho)
+    """
+    return nullcontext() if _perfilador is None else _perfilador.etapa(nome)
+
+def secoes(prefixo):
+    """
+    Cronômetro de seções consecutivas (ver Perfilador.secoes); não faz nada com o perfil desligado
+    """
+    return _CRONOMETRO_INATIVO if _perfilador is None else _perfilador.secoes(prefixo)
+
+def caminho_relatorio_perfil(output_path):
+    return Path(output_path).with_suffix('.perfil.txt')
+
+def gravar_relatorio_perfil(output_path):
+    """
+    Grava o relatório do perfil ao lado de uma saída (<saída>.perfil.txt) e desliga o perfil
+
+    Args:
+        output_path (str): Arquivo ou pasta de saída da execução
+
+    Returns:
+        Path: Caminho do relatório, ou None se o perfil estiver desligado
+    """
+    global _perfilador
+    if _perfilador is None:
+        return None
+    _perfilador.finalizar()
+    caminho = caminho_relatorio_perfil(output_path)
+    caminho.write_text(_perfilador.relatorio(), encoding='utf-8')
+    _perfilador = None
+    print(f"Relatório de perfil salvo em: {caminho}")
+    return caminho
+
+ativar_perfil_do_ambiente()
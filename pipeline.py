@@ -0,0 +1,359 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from pathlib import Path
+from perfil_execucao import AJUDA_PERFIL, VARIAVEL_AMBIENTE, interpretar_opcoes
+from codigo_fonte import modulos_locais
+import telemetria
+
+# Etapas do pipeline, na ordem do README. Entradas e saídas aceitam padrões no estilo do shell;
+# o próprio script e os módulos do projeto que ele importa (ver codigo_fonte.modulos_locais) são
+# sempre entradas, para que uma alteração no código refaça a etapa.
+# Uma etapa sem saídas (como o resumo, que só imprime) é executada sempre.
+ETAPAS_PIPELINE = {
+    'combinar': {
+        'script': 'combine_sternberg_data.py',
+        'entradas': ['data/*.csv'],
+        'saidas': ['dados_sternberg_combinados/*_sternberg_combined.csv']
+    },
+    'analises': {
+        'script': 'analises.py',
+        'entradas': ['dados_sternberg_combinados/*_sternberg_combined.csv'],
+        'saidas': ['analises.csv']
+    },
+    'anova': {
+        'script': 'anova.py',
+        'entradas': ['analises.csv'],
+        'saidas': ['resultados_anova_medidas_repetidas.xlsx']
+    },
+    'analise_completa': {
+        'script': 'analise_completa_todas_variaveis.py',
+        'entradas': ['analises.csv'],
+        'saidas': ['analise_completa_todas_variaveis.xlsx', 'analise_completa_todas_variaveis.sqlite']
+    },
+    'resumo': {
+        'script': 'resumo_resultados.py',
+        'entradas': ['analise_completa_todas_variaveis.sqlite'],
+        'saidas': []
+    }
+}
+
+# Hashes das entradas da última execução bem-sucedida de cada etapa
+ARQUIVO_ESTADO = '.pipeline_estado.json'
+
+def _expandir(padroes, pasta):
+    arquivos = set()
+    for padrao in padroes:
+        arquivos.update(glob.glob(str(Path(pasta) / padrao)))
+    return sorted(arquivos)
+
+def _hash_arquivo(caminho):
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+def dependencias(etapas=None):
+    """
+    Deduz de quais etapas cada etapa depende, pelas saídas que ela usa como entrada
+
+    Returns:
+        dict: {etapa: [etapas anteriores das quais depende]}
+    """
+    if etapas is None:
+        etapas = ETAPAS_PIPELINE
+    return {nome: [outra for outra, anterior in etapas.items()
+                   if outra != nome and set(anterior['saidas']) & set(definicao['entradas'])]
+            for nome, definicao in etapas.items()}
+
+def selecionar_etapas(alvos=None, etapas=None):
+    """
+    Etapas necessárias para produzir os alvos (os alvos e tudo de que dependem), na ordem do pipeline
+    """
+    if etapas is None:
+        etapas = ETAPAS_PIPELINE
+    if not alvos:
+        return list(etapas)
+    desconhecidas = [alvo for alvo in alvos if alvo not in etapas]
+    if desconhecidas:
+        raise ValueError(f"Etapas desconhecidas: {', '.join(desconhecidas)} (opções: {', '.join(etapas)})")
+    deps = dependencias(etapas)
+    necessarias = set()
+    pendentes = list(alvos)
+    while pendentes:
+        nome = pendentes.pop()
+        if nome not in necessarias:
+            necessarias.add(nome)
+            pendentes.extend(deps[nome])
+    return [nome for nome in etapas if nome in necessarias]
+
+class Pipeline:
+    """
+    Executa as etapas do pipeline fazendo o mínimo de trabalho, como o make.
+
+    Uma etapa é pulada quando todas as suas saídas existem e são mais novas
+    que todas as entradas (dados, script e módulos do projeto importados), ou, se as datas indicarem o contrário (cópia,
+    checkout), quando o conteúdo das entradas é idêntico ao da última execução
+    bem-sucedida. Etapas independentes (ex.: anova e analise_completa) são
+    executadas ao mesmo tempo, cada uma em seu próprio processo. Com `perfil`,
+    cada etapa grava o relatório de perfil ao lado de suas saídas (ver perfil_execucao).
+    Ao final de cada execução, a telemetria (tempos, contadores de cada etapa
+    e falhas) é gravada em pipeline_telemetria.json e pipeline_telemetria.prom
+    (ver telemetria).
+    """
+
+    def __init__(self, pasta='.', etapas=None, n_processos=2, forcar=False, perfil=None):
+        self.pasta = Path(pasta)
+        self.etapas = ETAPAS_PIPELINE if etapas is None else etapas
+        self.n_processos = max(1, n_processos)
+        self.forcar = forcar
+        self.perfil = perfil
+        self.ultima_telemetria = None
+        self.caminho_estado = self.pasta / ARQUIVO_ESTADO
+        self.estado = json.loads(self.caminho_estado.read_text()) if self.caminho_estado.exists() else {}
+
+    def codigo(self, nome):
+        """
+        Arquivos de código da etapa: o script e os módulos do projeto que ele importa
+        """
+        script = self.pasta / self.etapas[nome]['script']
+        return [str(script)] + [str(modulo) for modulo in modulos_locais(script, self.pasta)]
+
+    def entradas(self, nome):
+        return self.codigo(nome) + _expandir(self.etapas[nome]['entradas'], self.pasta)
+
+    def hashes_entradas(self, nome):
+        return {str(Path(arquivo).relative_to(self.pasta)): _hash_arquivo(arquivo) for arquivo in self.entradas(nome)}
+
+    def motivo_execucao(self, nome):
+        """
+        Indica por que a etapa precisa ser executada
+
+        Returns:
+            str: Motivo, ou None se a etapa está atualizada
+        """
+        definicao = self.etapas[nome]
+        if self.forcar:
+            return 'execução forçada'
+        if not definicao['saidas']:
+            return 'etapa sem saídas'
+        saidas = [_expandir([padrao], self.pasta) for padrao in definicao['saidas']]
+        if not all(saidas):
+            return 'saídas ausentes'
+        if not _expandir(definicao['entradas'], self.pasta):
+            return 'entradas ausentes'
+        entradas = self.entradas(nome)
+        saida_mais_antiga = min(os.path.getmtime(arquivo) for arquivos in saidas for arquivo in arquivos)
+        if max(os.path.getmtime(arquivo) for arquivo in entradas) <= saida_mais_antiga:
+            return None
+        if self.estado.get(nome) == self.hashes_entradas(nome):
+            return None
+        return 'entradas alteradas'
+
+    def _executar_etapa(self, nome, arquivo_contadores):
+        # Os contadores da etapa (participantes, linhas lidas, cache...) são gravados pelo script ao terminar
+        ambiente = {**os.environ, telemetria.VARIAVEL_AMBIENTE: str(arquivo_contadores)}
+        if self.perfil:
+            ambiente[VARIAVEL_AMBIENTE] = self.perfil
+        inicio = time.perf_counter()
+        processo = subprocess.run([sys.executable, self.etapas[nome]['script']], cwd=self.pasta, env=ambiente,
+                                  stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        return processo.returncode, processo.stdout, time.perf_counter() - inicio
+
+    def _saidas_gravadas(self, nome):
+        arquivos = [Path(arquivo) for arquivo in _expandir(self.etapas[nome]['saidas'], self.pasta)]
+        return {'arquivos_gravados': len(arquivos),
+                'bytes_gravados': sum(arquivo.stat().st_size for arquivo in arquivos if arquivo.is_file())}
+
+    def executar(self, alvos=None, simular=False):
+        """
+        Executa as etapas necessárias para os alvos (None = todas)
+
+        Uma etapa só começa quando as etapas das quais depende terminaram, e só
+        é avaliada (pular ou executar) nesse momento, para enxergar as saídas
+        recém-produzidas. Se uma etapa falhar, as que dependem dela não são executadas.
+
+        Args:
+            alvos (list): Etapas desejadas
+            simular (bool): Apenas informa o que seria executado (considerando as etapas anteriores
+                como atualizadas)
+
+        Returns:
+            dict: {etapa: 'executada', 'pulada', 'falhou' ou 'não executada'}
+        """
+        selecionadas = selecionar_etapas(alvos, self.etapas)
+        deps = {nome: [dep for dep in anteriores if dep in selecionadas]
+                for nome, anteriores in dependencias(self.etapas).items() if nome in selecionadas}
+        situacao = {}
+        em_execucao = {}
+        duracoes = {}
+        contadores = {}
+        inicio = time.time()
+        pasta_contadores = tempfile.TemporaryDirectory(prefix='pipeline_telemetria_')
+
+        with pasta_contadores, ThreadPoolExecutor(max_workers=self.n_processos) as executor:
+            while len(situacao) < len(selecionadas):
+                prontas = [nome for nome in selecionadas
+                           if nome not in situacao and nome not in em_execucao.values()
+                           and all(dep in situacao for dep in deps[nome])]
+                for nome in prontas:
+                    if any(situacao[dep] in ('falhou', 'não executada') for dep in deps[nome]):
+                        situacao[nome] = 'não executada'
+                        print(f"[{nome}] não executada: uma etapa anterior falhou")
+                        continue
+                    motivo = self.motivo_execucao(nome)
+                    if motivo is None:
+                        situacao[nome] = 'pulada'
+                        print(f"[{nome}] atualizada, pulando")
+                    elif simular:
+                        situacao[nome] = 'executada'
+                        print(f"[{nome}] seria executada ({motivo})")
+                    else:
+                        print(f"[{nome}] executando {self.etapas[nome]['script']} ({motivo})")
+                        arquivo_contadores = Path(pasta_contadores.name) / f'{nome}.json'
+                        em_execucao[executor.submit(self._executar_etapa, nome, arquivo_contadores)] = nome
+
+                if not em_execucao:
+                    continue
+                concluidas, _ = wait(list(em_execucao), return_when=FIRST_COMPLETED)
+                for futuro in concluidas:
+                    nome = em_execucao.pop(futuro)
+                    codigo, saida, duracao = futuro.result()
+                    duracoes[nome] = duracao
+                    contadores[nome] = telemetria.ler_contadores(Path(pasta_contadores.name) / f'{nome}.json')
+                    if codigo == 0:
+                        situacao[nome] = 'executada'
+                        contadores[nome].update(self._saidas_gravadas(nome))
+                        self.estado[nome] = self.hashes_entradas(nome)
+                        print(f"[{nome}] concluída em {duracao:.1f}s")
+                        # O produto de uma etapa sem saídas é o que ela imprime
+                        if not self.etapas[nome]['saidas']:
+                            print(saida)
+                    else:
+                        situacao[nome] = 'falhou'
+                        self.estado.pop(nome, None)
+                        print(f"[{nome}] FALHOU (código {codigo}) após {duracao:.1f}s. Saída:\n{saida}")
+
+        if not simular:
+            self.caminho_estado.write_text(json.dumps(self.estado, indent=2, sort_keys=True))
+            self.ultima_telemetria = self.montar_telemetria(situacao, duracoes, contadores, inicio)
+            caminho_json, caminho_prom = telemetria.gravar_telemetria(self.ultima_telemetria, self.pasta)
+            print(f"Telemetria salva em: {caminho_json} e {caminho_prom}")
+        return situacao
+
+    def montar_telemetria(self, situacao, duracoes, contadores, inicio):
+        """
+        Monta a telemetria de uma execução (ver telemetria.gravar_telemetria)
+
+        Returns:
+            dict: 'inicio', 'fim', 'fim_timestamp', 'segundos', 'sucesso', 'falhas' (etapas que falharam
+            ou não foram executadas), 'etapas' ({etapa: 'situacao', 'segundos', 'contadores'}) e 'totais'
+        """
+        fim = time.time()
+        etapas = {nome: {'situacao': situacao[nome], 'segundos': duracoes.get(nome, 0.0),
+                         'contadores': contadores.get(nome, {})}
+                  for nome in self.etapas if nome in situacao}
+        falhas = [nome for nome, resultado in situacao.items() if resultado in ('falhou', 'não executada')]
+        return {
+            'inicio': datetime.fromtimestamp(inicio).isoformat(timespec='seconds'),
+            'fim': datetime.fromtimestamp(fim).isoformat(timespec='seconds'),
+            'fim_timestamp': fim,
+            'segundos': fim - inicio,
+            'sucesso': not falhas,
+            'falhas': falhas,
+            'etapas': etapas,
+            'totais': telemetria.totalizar(etapas)
+        }
+
+def executar_em_memoria(pasta_dados='data', output_path=None, formato_saida='xlsx', n_processos=1):
+    """
+    Executa o pipeline inteiro em um único processo, passando DataFrames de uma etapa para a seguinte
+
+    Nada é gravado além do relatório final (e apenas se `output_path` for informado):
+    os arquivos combinados, o analises.csv e os caches não são criados. Útil em
+    notebooks ou para encadear o pipeline em outro programa.
+
+    Args:
+        pasta_dados (str): Pasta com os arquivos T{n}_{id}_sternberg.csv
+        output_path (str): Relatório da análise completa (None = não grava)
+        formato_saida (str): 'xlsx' ou 'csv'/'parquet' (ver relatorios.EscritorRelatorio)
+        n_processos (int): Número de processos da bateria de testes
+
+    Returns:
+        dict: 'dados_combinados' ({id: DataFrame}), 'dataset' (SternbergDataset com os trials),
+        'metricas' (conteúdo de analises.csv), 'anova' e 'descritivas' (de anova.calcular_anovas)
+        e 'tabelas' (da análise completa)
+    """
+    # Importados aqui para que a execução por processos não carregue as bibliotecas de análise
+    from combine_sternberg_data import combinar_dados
+    from analises import calcular_metricas_dataset
+    from dataset_sternberg import SternbergDataset
+    from anova import calcular_anovas
+    from analise_completa_todas_variaveis import analisar_todas_variaveis
+    from resumo_resultados import resumir_tabelas
+    from relatorios import EscritorRelatorio
+    from perfil_execucao import etapa, gravar_relatorio_perfil
+
+    with etapa('combinar'):
+        dados_combinados = combinar_dados(pasta_dados)
+    if not dados_combinados:
+        raise ValueError(f"Nenhum arquivo de dados encontrado em {pasta_dados}")
+    with etapa('analises'):
+        dataset = SternbergDataset.de_dados_combinados(dados_combinados)
+        metricas = calcular_metricas_dataset(dataset)
+    if metricas is None:
+        raise ValueError("Nenhuma métrica pôde ser calculada")
+    with etapa('anova'):
+        anova, descritivas = calcular_anovas(metricas, 'id')
+    with etapa('analise_completa'):
+        tabelas = analisar_todas_variaveis(metricas, 'id', n_processos=n_processos)
+    resumir_tabelas(tabelas)
+
+    if output_path is not None:
+        with EscritorRelatorio(output_path, formato_saida) as escritor:
+            for nome, tabela in tabelas.items():
+                escritor.adicionar_planilha(nome, tabela)
+        print(f"\nRelatório salvo em: {escritor.caminho}")
+        gravar_relatorio_perfil(escritor.caminho)
+
+    return {'dados_combinados': dados_combinados, 'dataset': dataset, 'metricas': metricas, 'anova': anova,
+            'descritivas': descritivas, 'tabelas': tabelas}
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Executa o pipeline Sternberg refazendo apenas as etapas desatualizadas")
+    parser.add_argument('alvos', nargs='*',
+                        help=f"Etapas desejadas, com as etapas das quais dependem (padrão: todas: {', '.join(ETAPAS_PIPELINE)})")
+    parser.add_argument('--processos', type=int, default=2,
+                        help="Número máximo de etapas executadas ao mesmo tempo (padrão: 2)")
+    parser.add_argument('--forcar', action='store_true',
+                        help="Executa todas as etapas selecionadas, mesmo as atualizadas")
+    parser.add_argument('--simular', '--dry-run', action='store_true',
+                        help="Apenas mostra quais etapas seriam executadas")
+    parser.add_argument('--perfil', '--profile', nargs='?', const='tempo', default=None, help=AJUDA_PERFIL)
+    args = parser.parse_args()
+    if args.perfil:
+        # Validado aqui, antes de qualquer etapa, em vez de falhar em cada processo
+        interpretar_opcoes(args.perfil)
+
+    situacao = Pipeline(n_processos=args.processos, forcar=args.forcar,
+                        perfil=args.perfil).executar(args.alvos, simular=args.simular)
+
+    print("\nResumo:")
+    for nome, resultado in situacao.items():
+        print(f"  {nome}: {resultado}")
+    return 1 if any(resultado in ('falhou', 'não executada') for resultado in situacao.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+from pathlib import Path
+from perfil_execucao import etapa
+
+# Formatos de saída dos relatórios: uma pasta de trabalho Excel ou um arquivo por planilha
+FORMATOS_SAIDA = ['xlsx', 'csv', 'parquet']
+
+# Limite do Excel para o nome de uma planilha
+TAMANHO_MAXIMO_NOME_PLANILHA = 31
+
+# Linhas convertidas por vez ao gravar uma planilha Excel
+TAMANHO_LOTE_LINHAS = 10000
+
+VALORES_INFINITOS = {float('inf'): 'inf', float('-inf'): '-inf'}
+
+def verificar_formato_saida(formato):
+    """
+    Verifica se o formato de saída é suportado (útil antes de uma análise longa)
+
+    Raises:
+        ValueError: Formato desconhecido
+        ImportError: Parquet sem o pacote pyarrow instalado
+    """
+    if formato not in FORMATOS_SAIDA:
+        raise ValueError(f"Formato de saída inválido: {formato} (opções: {', '.join(FORMATOS_SAIDA)})")
+    if formato == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("A saída em Parquet requer o pacote pyarrow (pip install pyarrow)")
+
+def nome_planilha(nome, usados, tamanho_maximo=TAMANHO_MAXIMO_NOME_PLANILHA):
+    """
+    Nome único e legível para uma planilha do relatório
+
+    Nomes acima do limite são encurtados antes do último trecho após '_', que
+    é mantido (Desc_mean_rt_correct_by_length_2 -> Desc_mean_rt_correct_by_lengt_2),
+    para que variáveis que diferem só no final não recebam o mesmo nome. Um
+    nome já usado (sem diferenciar maiúsculas, como no Excel) recebe ~2, ~3...
+
+    Args:
+        nome (str): Nome desejado
+        usados (set): Nomes já usados, em minúsculas (atualizado com o nome escolhido)
+        tamanho_maximo (int): Limite de caracteres (None = sem limite)
+
+    Returns:
+        str: Nome da planilha
+    """
+    if tamanho_maximo and len(nome) > tamanho_maximo:
+        inicio, separador, final = nome.rpartition('_')
+        if separador and len(final) < tamanho_maximo // 2:
+            nome = inicio[:tamanho_maximo - len(final) - 1] + separador + final
+        else:
+            nome = nome[:tamanho_maximo]
+    candidato = nome
+    repeticao = 2
+    while candidato.lower() in usados:
+        marca = f'~{repeticao}'
+        candidato = (nome[:tamanho_maximo - len(marca)] if tamanho_maximo else nome) + marca
+        repeticao += 1
+    usados.add(candidato.lower())
+    return candidato
+
+class EscritorRelatorio:
+    """
+    Grava as tabelas de um relatório em Excel, CSV ou Parquet.
+
+    Em Excel, a pasta de trabalho é aberta em modo somente escrita do openpyxl:
+    as linhas são enviadas ao arquivo à medida que são adicionadas, sem manter
+    células em memória, e o custo de cada planilha não cresce com o número de
+    planilhas já gravadas. Em CSV/Parquet, cada planilha vira um arquivo
+    <nome>.<formato> dentro de uma pasta com o nome do relatório.
+
+    Uso:
+        with EscritorRelatorio('resultados.xlsx') as escritor:
+            escritor.adicionar_planilha('ANOVA', anova_df)
+    """
+
+    def __init__(self, caminho, formato='xlsx'):
+        verificar_formato_saida(formato)
+        self.formato = formato
+        self.planilhas = []
+        self._nomes_usados = set()
+        if formato == 'xlsx':
+            # Importado aqui: o openpyxl só é necessário (e só custa tempo de importação) na saída em Excel
+            from openpyxl import Workbook
+            self.caminho = Path(caminho).with_suffix('.xlsx')
+            self._pasta_trabalho = Workbook(write_only=True)
+        else:
+            self.caminho = Path(caminho).with_suffix('')
+            self.caminho.mkdir(parents=True, exist_ok=True)
+
+    def adicionar_planilha(self, nome, tabela, index=False):
+        """
+        Grava uma tabela como uma planilha (ou arquivo) do relatório
+
+        Args:
+            nome (str): Nome da planilha (ver nome_planilha; limitado a 31 caracteres no Excel)
+            tabela (pd.DataFrame): Dados a gravar
+            index (bool): Se o índice da tabela deve ser gravado como coluna(s)
+        """
+        with etapa(f'gravacao_{self.formato}'):
+            self._gravar_planilha(nome, tabela, index)
+
+    def _gravar_planilha(self, nome, tabela, index):
+        if index:
+            tabela = tabela.reset_index()
+        nome = nome_planilha(nome, self._nomes_usados,
+                             TAMANHO_MAXIMO_NOME_PLANILHA if self.formato == 'xlsx' else None)
+        self.planilhas.append(nome)
+
+        if self.formato == 'csv':
+            tabela.to_csv(self.caminho / f'{nome}.csv', index=False)
+            return
+        if self.formato == 'parquet':
+            tabela.to_parquet(self.caminho / f'{nome}.parquet', index=False)
+            return
+
+        planilha = self._pasta_trabalho.create_sheet(title=nome)
+        planilha.append([str(coluna) for coluna in tabela.columns])
+        for inicio in range(0, len(tabela), TAMANHO_LOTE_LINHAS):
+            lote = tabela.iloc[inicio:inicio + TAMANHO_LOTE_LINHAS]
+            # Valores ausentes viram células vazias e infinitos viram o texto 'inf'/'-inf', como em
+            # DataFrame.to_excel (o openpyxl gravaria infinitos como células vazias)
+            valores = lote.astype(object).where(lote.notna(), None).replace(VALORES_INFINITOS)
+            for linha in valores.itertuples(index=False, name=None):
+                planilha.append(linha)
+
+    def fechar(self):
+        """
+        Conclui a gravação do relatório
+
+        Returns:
+            Path: Arquivo Excel ou pasta com os arquivos CSV/Parquet
+        """
+        if self.formato == 'xlsx':
+            with etapa('gravacao_xlsx'):
+                self._pasta_trabalho.save(self.caminho)
+        return self.caminho
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, rastreamento):
+        # Em caso de erro, não grava uma pasta de trabalho incompleta
+        if tipo_excecao is None:
+            self.fechar()
+        return False
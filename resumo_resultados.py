@@ -1,30 +1,81 @@
+import argparse
+from pathlib import Path
 import pandas as pd
+from base_resultados import BaseResultados
 
-# Ler os resultados
-df_anova = pd.read_excel('analise_completa_todas_variaveis.xlsx', sheet_name='ANOVA')
-df_posthoc = pd.read_excel('analise_completa_todas_variaveis.xlsx', sheet_name='PostHoc')
-
-print('RESUMO DOS RESULTADOS SIGNIFICATIVOS')
-print('='*50)
-print(f'Total de variáveis analisadas: {len(df_anova)}')
-
-# Filtrar resultados significativos
-significativos = df_anova[df_anova['significativo'] == 'Sim']
-print(f'Variáveis com ANOVA significativa: {len(significativos)}')
-print()
-
-print('VARIÁVEIS COM DIFERENÇAS SIGNIFICATIVAS:')
-print('-'*50)
-for _, row in significativos.iterrows():
-    print(f'{row["Variavel"]}: F={row["F"]:.3f}, p={row["p_value"]:.4f}, η²={row["partial_eta_squared"]:.4f} ({row["tamanho_efeito"]})')
-
-print()
-print('COMPARAÇÕES POST-HOC SIGNIFICATIVAS:')
-print('-'*50)
-posthoc_significativos = df_posthoc[df_posthoc['Significativo'] == 'Sim']
-print(f'Total de comparações post-hoc: {len(df_posthoc)}')
-print(f'Comparações significativas: {len(posthoc_significativos)}')
-print()
-
-for _, row in posthoc_significativos.iterrows():
-    print(f'{row["Variavel"]} - {row["Comparacao"]}: p={row["P_corrigido"]:.3f}, Cohen\'s d={row["Tamanho_efeito"]:.3f}')
+BASE_PADRAO = 'analise_completa_todas_variaveis.sqlite'
+
+def imprimir_resumo(total_anova, significativos, total_posthoc, posthoc_significativos):
+    """
+    Imprime o resumo das ANOVAs e comparações post-hoc significativas
+
+    Args:
+        total_anova (int): Número de variáveis analisadas
+        significativos (pd.DataFrame): Linhas significativas da tabela ANOVA
+        total_posthoc (int): Número de comparações post-hoc
+        posthoc_significativos (pd.DataFrame): Linhas significativas da tabela PostHoc
+    """
+    print('RESUMO DOS RESULTADOS SIGNIFICATIVOS')
+    print('='*50)
+    print(f'Total de variáveis analisadas: {total_anova}')
+    print(f'Variáveis com ANOVA significativa: {len(significativos)}')
+    print()
+
+    print('VARIÁVEIS COM DIFERENÇAS SIGNIFICATIVAS:')
+    print('-'*50)
+    for _, row in significativos.iterrows():
+        print(f'{row["Variavel"]}: F={row["F"]:.3f}, p={row["p_value"]:.4f}, η²={row["partial_eta_squared"]:.4f} ({row["tamanho_efeito"]})')
+
+    print()
+    print('COMPARAÇÕES POST-HOC SIGNIFICATIVAS:')
+    print('-'*50)
+    print(f'Total de comparações post-hoc: {total_posthoc}')
+    print(f'Comparações significativas: {len(posthoc_significativos)}')
+    print()
+
+    for _, row in posthoc_significativos.iterrows():
+        print(f'{row["Variavel"]} - {row["Comparacao"]}: p={row["P_corrigido"]:.3f}, Cohen\'s d={row["Tamanho_efeito"]:.3f}')
+
+def resumir_tabelas(tabelas):
+    """
+    Imprime o resumo a partir das tabelas em memória (ver analise_completa_todas_variaveis.analisar_todas_variaveis)
+    """
+    anova = tabelas.get('ANOVA', pd.DataFrame(columns=['significativo']))
+    posthoc = tabelas.get('PostHoc', pd.DataFrame(columns=['Significativo']))
+    imprimir_resumo(len(anova), anova[anova['significativo'] == 'Sim'],
+                    len(posthoc), posthoc[posthoc['Significativo'] == 'Sim'])
+
+def main():
+    """
+    Resume os resultados significativos gravados pela análise completa
+    """
+    parser = argparse.ArgumentParser(description="Resumo dos resultados significativos da análise completa")
+    parser.add_argument('--base', default=BASE_PADRAO,
+                        help=f"Base de resultados gravada por analise_completa_todas_variaveis.py (padrão: {BASE_PADRAO})")
+    parser.add_argument('--variaveis', '--variables', default=None,
+                        help="Padrões das variáveis, separados por vírgula (ex.: 'accuracy_*')")
+    parser.add_argument('--efeito-minimo', type=float, default=None,
+                        help="η² parcial mínimo das ANOVAs listadas")
+    parser.add_argument('--d-minimo', type=float, default=None,
+                        help="|d de Cohen| mínimo das comparações post-hoc listadas")
+    parser.add_argument('--comparacao', default=None,
+                        help="Comparações post-hoc, separadas por vírgula (ex.: 'T0 vs T2')")
+    args = parser.parse_args()
+
+    if not Path(args.base).exists():
+        print(f"ERRO: Base de resultados não encontrada: {args.base}")
+        print("Por favor, execute primeiro analise_completa_todas_variaveis.py.")
+        return
+
+    with BaseResultados(args.base) as base:
+        total_anova = len(base.consultar('ANOVA', variaveis=args.variaveis))
+        significativos = base.consultar('ANOVA', significativo=True, efeito_minimo=args.efeito_minimo,
+                                        variaveis=args.variaveis)
+        total_posthoc = len(base.consultar('PostHoc', variaveis=args.variaveis, comparacao=args.comparacao))
+        posthoc_significativos = base.consultar('PostHoc', significativo=True, efeito_minimo=args.d_minimo,
+                                                variaveis=args.variaveis, comparacao=args.comparacao)
+
+    imprimir_resumo(total_anova, significativos, total_posthoc, posthoc_significativos)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import atexit
+import json
+import os
+import tempfile
+from pathlib import Path
+
+# Arquivo em que um script grava seus contadores ao terminar. Definida por pipeline.py para cada etapa;
+# sem ela os contadores ficam apenas em memória (ver contadores())
+VARIAVEL_AMBIENTE = 'STERNBERG_TELEMETRIA'
+
+# Arquivos de telemetria gravados ao final de cada execução do pipeline
+ARQUIVO_TELEMETRIA = 'pipeline_telemetria.json'
+ARQUIVO_PROMETHEUS = 'pipeline_telemetria.prom'
+
+PREFIXO_PROMETHEUS = 'sternberg_pipeline'
+
+# Contadores de uma etapa e como são combinados nos totais da execução: participantes e variáveis
+# são os mesmos vistos por várias etapas (máximo); o resto é somado
+CONTADORES = {
+    'participantes': max,
+    'variaveis': max,
+    'arquivos_lidos': sum,
+    'linhas_lidas': sum,
+    'arquivos_gravados': sum,
+    'bytes_gravados': sum,
+    'cache_acertos': sum,
+    'cache_recalculos': sum,
+    'falhas': sum
+}
+
+DESCRICOES_PROMETHEUS = {
+    'participantes': 'Participantes processados',
+    'variaveis': 'Variaveis analisadas',
+    'arquivos_lidos': 'Arquivos de dados lidos',
+    'linhas_lidas': 'Linhas de dados lidas',
+    'arquivos_gravados': 'Arquivos gravados',
+    'bytes_gravados': 'Bytes gravados nas saidas',
+    'cache_acertos': 'Resultados reaproveitados do cache',
+    'cache_recalculos': 'Resultados recalculados (ausentes do cache)',
+    'falhas': 'Participantes ou variaveis que nao puderam ser processados'
+}
+
+_contadores = {}
+
+def contar(nome, quantidade=1):
+    """
+    Soma `quantidade` ao contador `nome` desta execução (ver CONTADORES)
+    """
+    _contadores[nome] = _contadores.get(nome, 0) + quantidade
+
+def registrar_cache(cache):
+    """
+    Registra os acertos e recálculos de um CacheResultados (sem efeito com o cache desligado)
+    """
+    if cache.ativo:
+        contar('cache_acertos', cache.hits)
+        contar('cache_recalculos', cache.misses)
+
+def contadores():
+    return dict(_contadores)
+
+def _gravar_atomico(caminho, conteudo):
+    # Coletores (como o textfile do node_exporter) nunca devem ler um arquivo pela metade
+    caminho = Path(caminho)
+    descritor, temporario = tempfile.mkstemp(dir=caminho.parent, prefix=f'.{caminho.name}.', suffix='.tmp')
+    with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)
+
+def gravar_contadores(caminho=None):
+    """
+    Grava os contadores deste processo em JSON (por padrão no arquivo indicado por STERNBERG_TELEMETRIA)
+
+    Returns:
+        Path: Arquivo gravado, ou None se não houver destino
+    """
+    caminho = caminho or os.environ.get(VARIAVEL_AMBIENTE)
+    if not caminho:
+        return None
+    _gravar_atomico(caminho, json.dumps(_contadores, sort_keys=True))
+    return Path(caminho)
+
+def ler_contadores(caminho):
+    """
+    Lê os contadores gravados por gravar_contadores
+
+    Returns:
+        dict: Contadores, vazio se o arquivo não existir (etapa que terminou antes de gravá-los)
+    """
+    caminho = Path(caminho)
+    if not caminho.exists():
+        return {}
+    return json.loads(caminho.read_text(encoding='utf-8'))
+
+def totalizar(etapas):
+    """
+    Combina os contadores das etapas nos totais da execução (ver CONTADORES)
+
+    Args:
+        etapas (dict): {etapa: {'contadores': {...}, ...}}
+
+    Returns:
+        dict: Totais, com 'cache_taxa_acerto' calculada a partir das somas
+    """
+    totais = {}
+    for nome, combinar in CONTADORES.items():
+        valores = [etapa['contadores'][nome] for etapa in etapas.values() if nome in etapa['contadores']]
+        totais[nome] = combinar(valores) if valores else 0
+    consultas = totais['cache_acertos'] + totais['cache_recalculos']
+    totais['cache_taxa_acerto'] = totais['cache_acertos'] / consultas if consultas else 0.0
+    return totais
+
+def _rotulos(**rotulos):
+    def escapar(valor):
+        return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{nome}="{escapar(valor)}"' for nome, valor in rotulos.items()) + '}'
+
+def formatar_prometheus(telemetria):
+    """
+    Converte a telemetria de uma execução para o formato textfile do Prometheus
+
+    Args:
+        telemetria (dict): Telemetria montada por pipeline.Pipeline.executar
+
+    Returns:
+        str: Métricas no formato de exposição em texto (uma família por métrica, com HELP e TYPE)
+    """
+    linhas = []
+    def familia(nome, descricao, amostras):
+        nome = f'{PREFIXO_PROMETHEUS}_{nome}'
+        linhas.append(f'# HELP {nome} {descricao}')
+        linhas.append(f'# TYPE {nome} gauge')
+        for rotulos, valor in amostras:
+            linhas.append(f'{nome}{rotulos} {valor}')
+
+    etapas = telemetria['etapas']
+    familia('ultima_execucao_timestamp_segundos', 'Fim da ultima execucao (Unix)',
+            [('', telemetria['fim_timestamp'])])
+    familia('duracao_segundos', 'Duracao total da execucao', [('', telemetria['segundos'])])
+    familia('sucesso', '1 se todas as etapas selecionadas terminaram sem falha', [('', int(telemetria['sucesso']))])
+    familia('etapa_duracao_segundos', 'Duracao de cada etapa (0 se pulada)',
+            [(_rotulos(etapa=nome), etapa['segundos']) for nome, etapa in etapas.items()])
+    familia('etapa_situacao', 'Situacao de cada etapa (1 na situacao atual)',
+            [(_rotulos(etapa=nome, situacao=etapa['situacao']), 1) for nome, etapa in etapas.items()])
+    for contador, descricao in DESCRICOES_PROMETHEUS.items():
+        amostras = [(_rotulos(etapa=nome), etapa['contadores'][contador]) for nome, etapa in etapas.items()
+                    if contador in etapa['contadores']]
+        if amostras:
+            familia(f'etapa_{contador}', f'{descricao}, por etapa', amostras)
+    familia('cache_taxa_acerto', 'Fracao dos resultados reaproveitados do cache na execucao',
+            [('', telemetria['totais']['cache_taxa_acerto'])])
+    return '\n'.join(linhas) + '\n'
+
+def gravar_telemetria(telemetria, pasta='.'):
+    """
+    Grava a telemetria de uma execução em JSON e no formato textfile do Prometheus
+
+    Returns:
+        tuple: (caminho do JSON, caminho do arquivo .prom)
+    """
+    caminho_json = Path(pasta) / ARQUIVO_TELEMETRIA
+    caminho_prom = Path(pasta) / ARQUIVO_PROMETHEUS
+    _gravar_atomico(caminho_json, json.dumps(telemetria, indent=2, ensure_ascii=False))
+    _gravar_atomico(caminho_prom, formatar_prometheus(telemetria))
+    return caminho_json, caminho_prom
+
+# Executado pelo pipeline: os contadores são gravados ao final do processo, mesmo que o script falhe
+if os.environ.get(VARIAVEL_AMBIENTE):
+    atexit.register(gravar_contadores)